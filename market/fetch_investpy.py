@@ -2,29 +2,44 @@
 """
 経済指標取得スクリプト（investpy版）
 
-investpyを使って経済カレンダー（予想値付き）を取得します。
+Investing.comから経済カレンダー（予想値付き）を取得します。
+取得は既定でHTTPのみのバックエンド（scripts/investing_http.py）を使い、
+ブラウザ（Chromium/chromedriver）は不要です。
 
 注意:
-- investpyは2020年からメンテナンス停止
-- Python 3.9以下を推奨
-- selenium + chromedriver が必要
+- investpyは2020年からメンテナンス停止（HTTPバックエンドが失敗した時のフォールバックとしてのみ使用）
+- MARKET_INVESTING_BACKEND=investpy で従来どおりinvestpyのみを使います
 - Investing.comの構造変更で動作しない可能性があります
 
 インストール:
-    pip install investpy pandas
-
-chromedriverのインストール（Linux）:
-    sudo apt-get install chromium-chromedriver
-
-または（Mac）:
-    brew install chromedriver
+    pip install pandas lxml requests
+    pip install investpy  # フォールバック用（任意）
 """
 
-import investpy as inv
+# investpyがなくても正規化・保存処理は読み込めるようにする（main()で確認）
+try:
+    import investpy as inv
+except ImportError:
+    inv = None
 import pandas as pd
 from datetime import datetime, timedelta
 import json
+import logging
 import os
+import sys
+
+# 共通モジュール（market/scripts）を読み込めるようにする
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+import instrumentation
+from http_replay import install_http_replay
+import investing_http
+from logging_setup import get_logger, setup_logging
+from markdown_report import Column, MarkdownReport, TableSchema
+from output_writer import OutputWriter
+from pipeline import Pipeline
+from serializers import get_serializer
+
+logger = get_logger(__name__)
 
 # 経済指標の翻訳辞書
 INDICATOR_TRANSLATIONS = {
@@ -330,6 +345,92 @@ def translate_indicator(text: str) -> str:
 
     return text
 
+def normalize_calendar_events(df: pd.DataFrame) -> list:
+    """
+    investpy.economic_calendar() のDataFrameをイベント辞書のリストに正規化
+
+    指標名を日本語に翻訳し、同じ (時刻, 指標名) のイベントは情報量が多い方を残します。
+    """
+    # 必要な列のみ抽出
+    columns = ['date', 'time', 'country', 'event', 'importance', 'actual', 'forecast', 'previous', 'te_actual', 'te_forecast', 'te_previous']
+
+    # 利用可能な列のみ使用
+    available_columns = [col for col in columns if col in df.columns]
+
+    # 重複排除用辞書 (time, event) -> event_data
+    # 同じ時刻とイベント名の場合、より情報量が多い方を優先
+    events_dict = {}
+    for _, row in df[available_columns].iterrows():
+        event = {
+            'date': row.get('date', ''),
+            'time': row.get('time', ''),
+            'country': row.get('country', ''),
+            'event': translate_indicator(row.get('event', '')),
+            'importance': row.get('importance', ''),
+        }
+
+        # actual（実績）
+        if 'actual' in available_columns:
+            event['actual'] = row['actual']
+        elif 'te_actual' in available_columns:
+            event['actual'] = row['te_actual']
+
+        # forecast（予想）
+        if 'forecast' in available_columns:
+            event['forecast'] = row['forecast']
+        elif 'te_forecast' in available_columns:
+            event['forecast'] = row['te_forecast']
+
+        # previous（前回）
+        if 'previous' in available_columns:
+            event['previous'] = row['previous']
+        elif 'te_previous' in available_columns:
+            event['previous'] = row['te_previous']
+
+        # 重複排除: 同じ(time, event)の組み合わせの場合、より良いデータを優先
+        key = (event['time'], event['event'])
+        if key not in events_dict:
+            events_dict[key] = event
+        else:
+            # 既存のデータと比較して、より情報量が多い方を採用
+            existing = events_dict[key]
+            # 実績値がある方を優先
+            if event.get('actual') and not existing.get('actual'):
+                events_dict[key] = event
+            # 予想値がある方を優先
+            elif event.get('forecast') and not existing.get('forecast'):
+                events_dict[key] = event
+            # 前回値がある方を優先
+            elif event.get('previous') and not existing.get('previous'):
+                events_dict[key] = event
+
+    return list(events_dict.values())
+
+
+# 主要経済指標（fetch_major_indicators）として取り出すイベント名のキーワード（小文字）
+MAJOR_INDICATOR_KEYWORDS = ('gdp', 'inflation', 'unemployment', 'interest rate', 'cpi')
+
+
+# Markdownの表定義（予定ブロック共通）
+CALENDAR_SCHEMA = TableSchema(
+    Column('時刻', 'time'),
+    Column('指標', 'event'),
+    Column('重要度', 'importance'),
+    Column('予想', 'forecast'),
+    Column('前回', 'previous'),
+    Column('実績', 'actual'),
+)
+
+# 明日の予定は実績がまだないため実績列を省く
+FORECAST_SCHEMA = TableSchema(
+    Column('時刻', 'time'),
+    Column('指標', 'event'),
+    Column('重要度', 'importance'),
+    Column('予想', 'forecast'),
+    Column('前回', 'previous'),
+)
+
+
 class InvestpyCalendar:
     """investpyを使った経済カレンダー取得"""
 
@@ -354,81 +455,27 @@ class InvestpyCalendar:
             time_filter: 'time_only' または 'all'
             time_zone: タイムゾーン（例：'GMT +9:00'、Noneなら自動）
         """
-        print(f"Fetching economic calendar for {country}...")
-        print(f"Period: {days_from} days ago to {days_to} days ahead")
-        if time_zone:
-            print(f"Timezone: {time_zone}")
-        print()
+        logger.info(f"Fetching economic calendar for {country}...")
+        logger.debug("Period: %s days ago to %s days ahead (timezone: %s)", days_from, days_to, time_zone)
 
         try:
-            calendar_data = inv.economic_calendar(
-                countries=[country],
-                from_date=self._get_date_str(days_from),
-                to_date=self._get_date_str(days_to),
-                time_filter=time_filter,
-                time_zone=time_zone
-            )
+            with instrumentation.span(country, kind='fetch', source='economic_calendar'):
+                calendar_data = investing_http.economic_calendar(
+                    countries=[country],
+                    from_date=self._get_date_str(days_from),
+                    to_date=self._get_date_str(days_to),
+                    time_filter=time_filter,
+                    time_zone=time_zone
+                )
 
             # DataFrameに変換
             df = pd.DataFrame(calendar_data)
 
             if not df.empty:
-                # 必要な列のみ抽出
-                columns = ['date', 'time', 'country', 'event', 'importance', 'actual', 'forecast', 'previous', 'te_actual', 'te_forecast', 'te_previous']
-
-                # 利用可能な列のみ使用
-                available_columns = [col for col in columns if col in df.columns]
-
-                # 重複排除用辞書 (time, event) -> event_data
-                # 同じ時刻とイベント名の場合、より情報量が多い方を優先
-                events_dict = {}
-                for _, row in df[available_columns].iterrows():
-                    event = {
-                        'date': row.get('date', ''),
-                        'time': row.get('time', ''),
-                        'country': row.get('country', ''),
-                        'event': translate_indicator(row.get('event', '')),
-                        'importance': row.get('importance', ''),
-                    }
-
-                    # actual（実績）
-                    if 'actual' in available_columns:
-                        event['actual'] = row['actual']
-                    elif 'te_actual' in available_columns:
-                        event['actual'] = row['te_actual']
-
-                    # forecast（予想）
-                    if 'forecast' in available_columns:
-                        event['forecast'] = row['forecast']
-                    elif 'te_forecast' in available_columns:
-                        event['forecast'] = row['te_forecast']
-
-                    # previous（前回）
-                    if 'previous' in available_columns:
-                        event['previous'] = row['previous']
-                    elif 'te_previous' in available_columns:
-                        event['previous'] = row['te_previous']
-
-                    # 重複排除: 同じ(time, event)の組み合わせの場合、より良いデータを優先
-                    key = (event['time'], event['event'])
-                    if key not in events_dict:
-                        events_dict[key] = event
-                    else:
-                        # 既存のデータと比較して、より情報量が多い方を採用
-                        existing = events_dict[key]
-                        # 実績値がある方を優先
-                        if event.get('actual') and not existing.get('actual'):
-                            events_dict[key] = event
-                        # 予想値がある方を優先
-                        elif event.get('forecast') and not existing.get('forecast'):
-                            events_dict[key] = event
-                        # 前回値がある方を優先
-                        elif event.get('previous') and not existing.get('previous'):
-                            events_dict[key] = event
-
-                events = list(events_dict.values())
-
-                print(f"Found {len(events)} events")
+                with instrumentation.span(country, kind='parse', rows=len(df)):
+                    events = normalize_calendar_events(df)
+
+                logger.info(f"Found {len(events)} events for {country}")
 
                 return {
                     'country': country,
@@ -437,17 +484,17 @@ class InvestpyCalendar:
                 }
 
             else:
-                print("No data found")
+                logger.warning(f"No data found for {country}")
                 return None
 
         except Exception as e:
-            print(f"Error: {e}")
-            print()
-            print("Common issues:")
-            print("1. investpy not installed: pip install investpy")
-            print("2. chromedriver not installed")
-            print("3. Investing.com structure changed")
-            print("4. Network connectivity issues")
+            logger.error(
+                f"Failed to fetch economic calendar for {country}: {e}\n"
+                "Common issues:\n"
+                "1. Investing.com structure changed (try MARKET_INVESTING_BACKEND=investpy)\n"
+                "2. Blocked by Investing.com (HTTP 403/429)\n"
+                "3. Network connectivity issues"
+            )
             return None
 
     def fetch_three_days(self, country: str = 'united states', time_zone: str = None):
@@ -478,22 +525,25 @@ class InvestpyCalendar:
         return None
 
     def fetch_major_indicators(self, country: str = 'united states'):
-        """主要経済指標を個別に取得"""
+        """
+        主要経済指標を個別に取得
 
-        indicators_list = inv.economic.get_events_data(
-            country=country,
-            event_types=[
-                'gdp',
-                'inflation',
-                'unemployment',
-                'interest rate',
-                'cpi'
-            ],
-            from_date=self._get_date_str(-30),
-            to_date=self._get_date_str(0)
-        )
+        investpyがなくても動くよう、過去30日の経済カレンダー（investing_http）から
+        MAJOR_INDICATOR_KEYWORDS を含むイベントを取り出します。
+        """
+        with instrumentation.span(country, kind='fetch', source='major_indicators'):
+            rows = investing_http.economic_calendar(
+                countries=[country],
+                from_date=self._get_date_str(-30),
+                to_date=self._get_date_str(0)
+            )
 
-        print(f"Found {len(indicators_list)} indicators")
+        indicators_list = [
+            row for row in rows
+            if any(keyword in (row.get('event') or '').lower() for keyword in MAJOR_INDICATOR_KEYWORDS)
+        ]
+
+        logger.info(f"Found {len(indicators_list)} indicators")
 
         return indicators_list
 
@@ -507,79 +557,123 @@ class InvestpyCalendar:
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"Saved to {filename}")
+        logger.info(f"Saved to {filename}")
 
     def save_markdown(self, data: dict, filename: str):
         """Markdownで保存"""
         os.makedirs(os.path.dirname(filename), exist_ok=True)
 
-        lines = [
-            f"# 経済カレンダー（investpy）",
-            f"",
-            f"**国**: {data.get('country', 'N/A')}",
-            f"**取得日時**: {data.get('fetch_date', 'N/A')}",
-            f"**データソース**: Investing.com via investpy",
-            f"",
-        ]
+        with open(filename, 'w', encoding='utf-8') as f:
+            report = MarkdownReport(f)
+            report.title("経済カレンダー（investpy）")
+            report.meta("国", data.get('country', 'N/A'))
+            report.meta("取得日時", data.get('fetch_date', 'N/A'))
+            report.meta("データソース", "Investing.com via investpy")
+            report.line()
+            report.day_sections(
+                data,
+                {'today': CALENDAR_SCHEMA, 'tomorrow': CALENDAR_SCHEMA},
+                show_date=True,
+                empty_text="予定なし"
+            )
 
-        if 'today' in data:
-            lines.extend([
-                f"## 今日の予定 ({datetime.now().strftime('%Y-%m-%d')})",
-                f"",
-                f"| 時刻 | 指標 | 重要度 | 予想 | 前回 | 実績 |",
-                f"|------|----|--------|------|------|------|"
-            ])
-
-            for event in data['today']:
-                lines.append(
-                    f"| {event['time']} | {event['event']} | {event['importance']} | "
-                    f"{event.get('forecast', 'N/A')} | {event.get('previous', 'N/A')} | "
-                    f"{event.get('actual', 'N/A')} |"
-                )
+        logger.info(f"Saved to {filename}")
 
-            lines.append("")
-
-        if 'tomorrow' in data:
-            lines.extend([
-                f"## 明日の予定 ({(datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')})",
-                f"",
-                f"| 時刻 | 指標 | 重要度 | 予想 | 前回 |",
-                f"|------|----|--------|------|------|------|"
-            ])
-
-            for event in data['tomorrow']:
-                lines.append(
-                    f"| {event['time']} | {event['event']} | {event['importance']} | "
-                    f"{event.get('forecast', 'N/A')} | {event.get('previous', 'N/A')} | "
-                    f"{event.get('actual', 'N/A')} |"
-                )
 
-            lines.append("")
+def print_country_result(country: str, data: dict):
+    """
+    国別の取得結果を表示（各区分の最初の5件のみ）
 
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
+    国別の取得は並列に実行されるため、行が混ざらないよう1件のログとして出力します。
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    lines = ["=" * 60, f"{country.upper()} - 結果", "=" * 60]
+    for key, label in [('yesterday', '昨日'), ('today', '今日'), ('tomorrow', '明日')]:
+        if data.get(key):
+            lines.append(f"{label}の予定 ({len(data[key])} 件):")
+            for event in data[key][:5]:  # 最初の5件のみ表示
+                lines.append(f"  {event['time']}: {event['event']}")
+                if event.get('forecast'):
+                    lines.append(f"    予想: {event['forecast']}, 前回: {event.get('previous', 'N/A')}")
+            if len(data[key]) > 5:
+                lines.append(f"  ... 他 {len(data[key]) - 5} 件")
+
+    logger.info("\n".join(lines))
+
+
+def save_combined_json(all_results: dict, json_dir: str, timestamp: str):
+    """全国分の統合データをJSONで保存"""
+    if not all_results:
+        return
+
+    # 最新版（人が読む整形JSON）とタイムスタンプ付きアーカイブ（コンパクト形式）
+    # 前回からデータが変わっていなければどちらも書かない
+    archive = get_serializer()
+    OutputWriter(json_dir).write(
+        "investpy_latest.json",
+        get_serializer('pretty').dumps(all_results),
+        payload=all_results,
+        timestamped_name=f"investpy_{timestamp}{archive.extension}",
+        timestamped_content=archive.dumps(all_results)
+    )
+
+
+def write_combined_markdown(f, all_results: dict):
+    """全国分の統合データをMarkdownとして書き出す"""
+    report = MarkdownReport(f)
+    report.title("経済カレンダー（investpy）")
+    report.meta("取得日時", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    report.meta("タイムゾーン", "GMT+9 (東京時間)")
+    report.meta("データソース", "Investing.com via investpy")
+    report.line()
+
+    for code, data in all_results.items():
+        country_name = data.get('country', code).title()
+        report.heading(country_name.upper(), level=2)
+        report.day_sections(
+            data,
+            {'yesterday': CALENDAR_SCHEMA, 'today': CALENDAR_SCHEMA, 'tomorrow': FORECAST_SCHEMA},
+            level=3,
+            show_count=True
+        )
 
-        print(f"Saved to {filename}")
+
+def save_combined_markdown(all_results: dict, md_dir: str, timestamp: str):
+    """全国分の統合データをMarkdownで保存"""
+    if not all_results:
+        return
+
+    # 最新版Markdownとタイムスタンプ付きMarkdown（前回からデータが変わっていなければ書かない）
+    OutputWriter(md_dir).write(
+        "investpy_latest.md",
+        lambda f: write_combined_markdown(f, all_results),
+        payload=all_results,
+        timestamped_name=f"investpy_{timestamp}.md"
+    )
 
 
 def main():
     """メイン処理"""
-
-    print("=" * 60)
-    print("経済指標取得（investpy版）")
-    print("=" * 60)
-    print()
-
-    # investpyのバージョン確認
-    try:
-        import investpy
-        print(f"investpy version: {investpy.__version__}")
-    except ImportError:
-        print("investpy not installed!")
-        print("Install with: pip install investpy")
+    setup_logging()
+    install_http_replay()
+
+    logger.info("=" * 60)
+    logger.info("経済指標取得（investpy版）")
+    logger.info("=" * 60)
+
+    # 取得バックエンドの確認（investpyはフォールバック用で、なくても取得できる）
+    logger.info(f"Backend: {investing_http.BACKEND}")
+    if inv is not None:
+        logger.info(f"investpy version: {inv.__version__}")
+    elif investing_http.BACKEND == 'investpy':
+        logger.error("investpy not installed! Install with: pip install investpy")
         return
 
-    print()
+    # 取得・解析・書き込みの時間とリクエスト数を記録
+    recorder = instrumentation.start_run('investpy')
+    instrumentation.install_request_counters()
 
     calendar = InvestpyCalendar()
 
@@ -599,146 +693,41 @@ def main():
     json_dir = f"{output_base}/json"
     md_dir = f"{output_base}/markdown"
 
-    all_results = {}
+    # 国別の取得ステージは互いに独立なので並列に実行し、
+    # 統合後のJSON保存とMarkdown保存も並列に実行する
+    # 保存はファイルを書く副作用があるためメモ化しない（変更の有無は OutputWriter が判定する）
+    pipeline = Pipeline(max_workers=len(countries))
+
+    def make_fetch(country: str):
+        def fetch():
+            data = calendar.fetch_three_days(country=country, time_zone=time_zone)
+            if data:
+                print_country_result(country, data)
+            else:
+                logger.error(f"Failed to fetch data for {country}")
+            return data
+        return fetch
 
     for country, code in countries.items():
-        print(f"\n{'=' * 60}")
-        print(f"Processing: {country.upper()}")
-        print(f"{'=' * 60}\n")
-
-        data = calendar.fetch_three_days(country=country, time_zone=time_zone)
-
-        if data:
-            all_results[code] = data
-
-            # 結果を表示
-            print()
-            print("=" * 60)
-            print(f"{country.upper()} - 結果")
-            print("=" * 60)
-
-            if data.get('yesterday'):
-                print(f"\n昨日の予定 ({len(data['yesterday'])} 件):")
-                for event in data['yesterday'][:5]:  # 最初の5件のみ表示
-                    print(f"  {event['time']}: {event['event']}")
-                    if event.get('forecast'):
-                        print(f"    予想: {event['forecast']}, 前回: {event.get('previous', 'N/A')}")
-                if len(data['yesterday']) > 5:
-                    print(f"  ... 他 {len(data['yesterday']) - 5} 件")
-
-            if data.get('today'):
-                print(f"\n今日の予定 ({len(data['today'])} 件):")
-                for event in data['today'][:5]:  # 最初の5件のみ表示
-                    print(f"  {event['time']}: {event['event']}")
-                    if event.get('forecast'):
-                        print(f"    予想: {event['forecast']}, 前回: {event.get('previous', 'N/A')}")
-                if len(data['today']) > 5:
-                    print(f"  ... 他 {len(data['today']) - 5} 件")
-
-            print()
-
-            if data.get('tomorrow'):
-                print(f"\n明日の予定 ({len(data['tomorrow'])} 件):")
-                for event in data['tomorrow'][:5]:  # 最初の5件のみ表示
-                    print(f"  {event['time']}: {event['event']}")
-                    if event.get('forecast'):
-                        print(f"    予想: {event['forecast']}, 前回: {event.get('previous', 'N/A')}")
-                if len(data['tomorrow']) > 5:
-                    print(f"  ... 他 {len(data['tomorrow']) - 5} 件")
-        else:
-            print(f"Failed to fetch data for {country}")
-
-    # 全データを統合して保存
-    if all_results:
-        import json
-        os.makedirs(json_dir, exist_ok=True)
-        os.makedirs(md_dir, exist_ok=True)
-
-        # タイムスタンプ付きJSONファイル
-        combined_file = f"{json_dir}/investpy_{timestamp}.json"
-        with open(combined_file, 'w', encoding='utf-8') as f:
-            json.dump(all_results, f, ensure_ascii=False, indent=2)
-        print(f"\n統合データを保存: {combined_file}")
-
-        # 最新版JSONファイル
-        latest_file = f"{json_dir}/investpy_latest.json"
-        with open(latest_file, 'w', encoding='utf-8') as f:
-            json.dump(all_results, f, ensure_ascii=False, indent=2)
-        print(f"最新版JSONを保存: {latest_file}")
-
-        # Markdownファイルを作成
-        md_lines = [
-            f"# 経済カレンダー（investpy）",
-            f"",
-            f"**取得日時**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            f"**タイムゾーン**: GMT+9 (東京時間)",
-            f"**データソース**: Investing.com via investpy",
-            f"",
-        ]
+        pipeline.add(f"fetch_{code}", make_fetch(country), kind='fetch')
+
+    codes = list(countries.values())
+
+    def combine(*results):
+        return {code: data for code, data in zip(codes, results) if data}
+
+    pipeline.add('combine', combine, deps=[f"fetch_{code}" for code in codes], kind='transform')
+    pipeline.add('save_json', lambda all_results: save_combined_json(all_results, json_dir, timestamp),
+                 deps=['combine'], kind='persist')
+    pipeline.add('save_markdown', lambda all_results: save_combined_markdown(all_results, md_dir, timestamp),
+                 deps=['combine'], kind='persist')
+    pipeline.run()
+    pipeline.print_report()
 
-        for code, data in all_results.items():
-            country_name = data.get('country', code).title()
-            md_lines.extend([
-                f"## {country_name.upper()}",
-                f"",
-            ])
-
-            if data.get('yesterday'):
-                yesterday_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-                md_lines.extend([
-                    f"### 昨日の予定 ({len(data['yesterday'])}件)",
-                    f"",
-                    f"| 時刻 | 指標 | 重要度 | 予想 | 前回 | 実績 |",
-                    f"|------|----|--------|------|------|------|"
-                ])
-                for event in data['yesterday']:
-                    md_lines.append(
-                        f"| {event['time']} | {event['event']} | {event.get('importance', 'N/A')} | "
-                        f"{event.get('forecast', 'N/A')} | {event.get('previous', 'N/A')} | "
-                        f"{event.get('actual', 'N/A')} |"
-                    )
-                md_lines.append("")
-
-            if data.get('today'):
-                md_lines.extend([
-                    f"### 今日の予定 ({len(data['today'])}件)",
-                    f"",
-                    f"| 時刻 | 指標 | 重要度 | 予想 | 前回 | 実績 |",
-                    f"|------|----|--------|------|------|------|"
-                ])
-                for event in data['today']:
-                    md_lines.append(
-                        f"| {event['time']} | {event['event']} | {event.get('importance', 'N/A')} | "
-                        f"{event.get('forecast', 'N/A')} | {event.get('previous', 'N/A')} | "
-                        f"{event.get('actual', 'N/A')} |"
-                    )
-                md_lines.append("")
-
-            if data.get('tomorrow'):
-                md_lines.extend([
-                    f"### 明日の予定 ({len(data['tomorrow'])}件)",
-                    f"",
-                    f"| 時刻 | 指標 | 重要度 | 予想 | 前回 |",
-                    f"|------|----|--------|------|------|"
-                ])
-                for event in data['tomorrow']:
-                    md_lines.append(
-                        f"| {event['time']} | {event['event']} | {event.get('importance', 'N/A')} | "
-                        f"{event.get('forecast', 'N/A')} | {event.get('previous', 'N/A')} |"
-                    )
-                md_lines.append("")
-
-        # タイムスタンプ付きMarkdownファイル
-        md_file = f"{md_dir}/investpy_{timestamp}.md"
-        with open(md_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(md_lines))
-        print(f"Markdownを保存: {md_file}")
-
-        # 最新版Markdownファイル
-        md_latest_file = f"{md_dir}/investpy_latest.md"
-        with open(md_latest_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(md_lines))
-        print(f"最新版Markdownを保存: {md_latest_file}")
+    # 実行レポート（スパン・カウンター）をデータの隣に保存
+    recorder.set_info('pipeline', pipeline.summary())
+    recorder.print_summary()
+    recorder.write_report(f"{output_base}/runs", timestamp)
 
 
 if __name__ == "__main__":
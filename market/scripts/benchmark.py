@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+取得 → 正規化 → 保存 → 描画 パイプラインのベンチマーク
+
+合成データ（国数 × 日数）の規模を変えて、各ステージの
+- 実行時間（repeat回の最小値・中央値）
+- ピークRSSの増分（import・合成データの準備後のRSSを基準に、ステージ実行中の最大値との差。子プロセス含む）
+- Pythonのメモリ確保量（tracemalloc のピークと実行後の純増）
+を計測し、機械可読なJSON（ベースライン）として保存します。
+
+各ケースは spawn した子プロセスで1つずつ実行するため、ピークRSSは他のケースの影響を受けません。
+Linuxでは準備後に /proc/self/clear_refs でピークをリセットするため、準備中の一時的なメモリも含みません。
+
+ケース:
+    calendar_normalize : investpyのカレンダーDataFrameの正規化（fetch_investpy.normalize_calendar_events）
+    calendar_json      : 経済カレンダーのJSON保存（整形 latest + アーカイブ）
+    calendar_markdown  : 経済カレンダーのMarkdown保存
+    yield_fetch        : イールドカーブ取得（記録済みフィクスチャを http_replay で再生。規模は固定。
+                         フィクスチャは .gitignore 対象のため、ない場合はスキップ）
+    yield_json         : イールドカーブのJSON保存
+    yield_markdown     : イールドカーブのMarkdown保存
+    yield_charts       : イールドカーブのグラフ描画（PNG。描画はプロセスプールのためRSSは子プロセス分を含む）
+
+使用例:
+  # 全ケース・全規模を実行して market/benchmarks/benchmark_latest.json に保存
+  python3 benchmark.py
+
+  # 変更前のベースラインと比較
+  cp ../benchmarks/benchmark_latest.json /tmp/before.json
+  python3 benchmark.py --cases calendar_normalize,yield_charts --baseline /tmp/before.json
+"""
+
+import argparse
+import io
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from output_writer import atomic_write
+from serializers import get_serializer
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+repo_root = os.path.dirname(os.path.dirname(script_dir))
+
+DEFAULT_OUTPUT = os.path.join(repo_root, 'market/benchmarks/benchmark_latest.json')
+BASELINE_VERSION = 2
+
+# 合成データの規模（国数 × 日数）
+SCALES = {
+    'small': {'countries': 3, 'days': 3},
+    'wide': {'countries': 50, 'days': 3},
+    'long': {'countries': 3, 'days': 365},
+    'large': {'countries': 50, 'days': 365},
+}
+
+EVENTS_PER_DAY = 12
+SEED = 20240101
+
+# 合成カレンダーの指標名（翻訳辞書にある名前とない名前を混ぜる）
+SAMPLE_EVENTS = (
+    'CPI (YoY)  (Jan)', 'Core CPI (MoM)  (Jan)', 'Nonfarm Payrolls', 'Unemployment Rate',
+    'Retail Sales (MoM)', 'GDP (QoQ)', 'Initial Jobless Claims', 'Manufacturing PMI',
+    'Interest Rate Decision', 'Trade Balance', 'Industrial Production (MoM)', 'Housing Starts',
+    'Synthetic Indicator A', 'Synthetic Indicator B', 'Synthetic Indicator C', 'Synthetic Indicator D',
+)
+
+BOND_PERIODS = (2, 5, 10, 20, 30)
+
+
+# ============ 合成データ =============
+
+def synthetic_countries(count: int) -> List[str]:
+    return [f"country {i:02d}" for i in range(count)]
+
+
+def synthetic_calendar_frame(countries: List[str], days: int, seed: int = SEED) -> pd.DataFrame:
+    """investpy.economic_calendar() と同じ列構成のDataFrameを作成"""
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 1)
+    dates = [(start + timedelta(days=d)).strftime('%d/%m/%Y') for d in range(days)]
+
+    rows = len(countries) * days * EVENTS_PER_DAY
+    values = rng.normal(2.0, 1.5, size=(rows, 3)).round(1)
+    hours = rng.integers(0, 24, size=rows)
+    minutes = rng.choice([0, 15, 30, 45], size=rows)
+
+    frame = pd.DataFrame({
+        'id': np.arange(rows).astype(str),
+        'date': np.repeat(dates, len(countries) * EVENTS_PER_DAY),
+        'time': [f"{h:02d}:{m:02d}" for h, m in zip(hours, minutes)],
+        'zone': np.tile(np.repeat(countries, EVENTS_PER_DAY), days),
+        'currency': 'XXX',
+        'importance': rng.choice(['low', 'medium', 'high'], size=rows),
+        'event': rng.choice(SAMPLE_EVENTS, size=rows),
+        'actual': [f"{v:.1f}%" for v in values[:, 0]],
+        'forecast': [f"{v:.1f}%" for v in values[:, 1]],
+        'previous': [f"{v:.1f}%" for v in values[:, 2]],
+    })
+    frame['country'] = frame['zone']
+    # 未発表のイベント（実績なし）を混ぜる
+    frame.loc[rng.random(rows) < 0.3, 'actual'] = None
+    return frame
+
+
+def synthetic_calendar_results(countries: List[str], days: int) -> Dict:
+    """fetch_investpy.main() の統合結果（国コード -> 昨日・今日・明日）と同じ形のデータを作成"""
+    frame = synthetic_calendar_frame(countries, days)
+    frame = frame.where(frame.notna(), None)
+    results = {}
+
+    for code, (country, group) in enumerate(frame.groupby('country', sort=False)):
+        events = group[['date', 'time', 'country', 'event', 'importance', 'actual', 'forecast', 'previous']].to_dict('records')
+        third = max(1, len(events) // 3)
+        results[f"c{code:02d}"] = {
+            'fetch_date': datetime(2024, 1, 1).isoformat(),
+            'country': country,
+            'yesterday': events[:third],
+            'today': events[third:2 * third],
+            'tomorrow': events[2 * third:],
+        }
+    return results
+
+
+def synthetic_bonds_config(countries: List[str]) -> Dict:
+    """fetch_yield_curve.BONDS_CONFIG と同じ形の設定を作成"""
+    return {
+        country: {
+            'name': country.title(),
+            'name_ja': country.title(),
+            'bonds': [{'name': f"{country.title()} {p}Y", 'period': p, 'alternatives': []} for p in BOND_PERIODS],
+        }
+        for country in countries
+    }
+
+
+def synthetic_yield_results(bonds_config: Dict, seed: int = SEED) -> Dict:
+    """YieldCurveFetcher.results と同じ形のデータを作成"""
+    rng = np.random.default_rng(seed)
+    results = {}
+
+    for country, config in bonds_config.items():
+        level = rng.uniform(0.0, 5.0)
+        bonds = []
+        for bond in config['bonds']:
+            yield_ = level + 0.1 * bond['period'] ** 0.5 + rng.normal(0, 0.05)
+            change = rng.normal(0, 0.05)
+            bonds.append({
+                'name': bond['name'],
+                'fetched_name': bond['name'],
+                'period': bond['period'],
+                'yield': float(yield_),
+                'previous_yield': float(yield_ - change),
+                'change': float(change),
+                'change_pct': float(change / (yield_ - change) * 100) if yield_ != change else 0.0,
+                'date': '2024-01-01',
+            })
+
+        results[country] = {
+            'country': country,
+            'country_name': config['name'],
+            'country_name_ja': config['name_ja'],
+            'fetch_date': datetime(2024, 1, 1).isoformat(),
+            'bonds': bonds,
+        }
+    return results
+
+
+# ============ ケース（準備して、計測対象の関数を返す） =============
+
+class SkipCase(Exception):
+    """前提（フィクスチャ等）がそろわず、ケースを実行できない"""
+
+
+def _fresh_dir(workdir: str) -> str:
+    """繰り返し実行で OutputWriter の変更検出にかからないよう、毎回新しいディレクトリを使う"""
+    return tempfile.mkdtemp(dir=workdir)
+
+
+def _investpy_module():
+    sys.path.insert(0, os.path.dirname(script_dir))
+    import fetch_investpy
+    return fetch_investpy
+
+
+def _yield_module():
+    import fetch_yield_curve
+    return fetch_yield_curve
+
+
+def case_calendar_normalize(scale: Dict, workdir: str) -> Callable:
+    fetch_investpy = _investpy_module()
+    frame = synthetic_calendar_frame(synthetic_countries(scale['countries']), scale['days'])
+    return lambda: fetch_investpy.normalize_calendar_events(frame)
+
+
+def case_calendar_json(scale: Dict, workdir: str) -> Callable:
+    fetch_investpy = _investpy_module()
+    results = synthetic_calendar_results(synthetic_countries(scale['countries']), scale['days'])
+    return lambda: fetch_investpy.save_combined_json(results, _fresh_dir(workdir), 'bench')
+
+
+def case_calendar_markdown(scale: Dict, workdir: str) -> Callable:
+    fetch_investpy = _investpy_module()
+    results = synthetic_calendar_results(synthetic_countries(scale['countries']), scale['days'])
+    return lambda: fetch_investpy.save_combined_markdown(results, _fresh_dir(workdir), 'bench')
+
+
+def case_yield_fetch(scale: Dict, workdir: str, fixture_dir: str = None) -> Callable:
+    import http_replay
+
+    fixture_dir = fixture_dir or http_replay.FIXTURE_DIR
+    if not http_replay.load_fixtures(fixture_dir):
+        raise SkipCase(
+            f"no fixtures in {fixture_dir} (not tracked by git; record them with "
+            f"MARKET_HTTP_MODE=record python3 fetch_yield_curve.py, or pass --fixtures)"
+        )
+
+    fetch_yield_curve = _yield_module()
+
+    # ボット対策の待機は計測対象外
+    fetch_yield_curve.REQUEST_DELAY_SCALE = 0.0
+    server = http_replay.ReplayServer(fixture_dir, port=0)
+    http_replay.REPLAY_URL = server.start()
+    http_replay.install_http_replay('replay')
+
+    return lambda: fetch_yield_curve.YieldCurveFetcher().fetch_all_countries()
+
+
+def case_yield_json(scale: Dict, workdir: str) -> Callable:
+    fetch_yield_curve = _yield_module()
+    fetcher = fetch_yield_curve.YieldCurveFetcher()
+    fetcher.results = synthetic_yield_results(synthetic_bonds_config(synthetic_countries(scale['countries'])))
+    return lambda: fetcher.save_json(_fresh_dir(workdir))
+
+
+def case_yield_markdown(scale: Dict, workdir: str) -> Callable:
+    fetch_yield_curve = _yield_module()
+    fetcher = fetch_yield_curve.YieldCurveFetcher()
+    fetcher.results = synthetic_yield_results(synthetic_bonds_config(synthetic_countries(scale['countries'])))
+    return lambda: fetcher.save_markdown(_fresh_dir(workdir))
+
+
+def case_yield_charts(scale: Dict, workdir: str) -> Callable:
+    from chart_renderer import ChartRenderer
+
+    bonds_config = synthetic_bonds_config(synthetic_countries(scale['countries']))
+    results = synthetic_yield_results(bonds_config)
+    return lambda: ChartRenderer(_fresh_dir(workdir), formats=('png',), force=True).render(results, bonds_config)
+
+
+# ケース名 -> (準備関数, 結果に影響する規模の項目)
+# 影響する項目が同じ規模は1回だけ実行する（例: イールドカーブは日数に依存しない）
+CASES = {
+    'calendar_normalize': (case_calendar_normalize, ('countries', 'days')),
+    'calendar_json': (case_calendar_json, ('countries', 'days')),
+    'calendar_markdown': (case_calendar_markdown, ('countries', 'days')),
+    'yield_fetch': (case_yield_fetch, ()),
+    'yield_json': (case_yield_json, ('countries',)),
+    'yield_markdown': (case_yield_markdown, ('countries',)),
+    'yield_charts': (case_yield_charts, ('countries',)),
+}
+
+
+def case_scales(case: str, scales: List[str]) -> List[str]:
+    """ケースに影響する項目が異なる規模だけを返す"""
+    _, dims = CASES[case]
+    if not dims:
+        return ['fixtures']
+
+    seen = set()
+    selected = []
+    for name in scales:
+        key = tuple(SCALES[name][d] for d in dims)
+        if key not in seen:
+            seen.add(key)
+            selected.append(name)
+    return selected
+
+
+# ============ 計測 =============
+
+def current_rss() -> int:
+    """現在のRSS（バイト）。/proc がない環境ではピークRSSで代用"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return peak_rss()
+
+
+def reset_peak_rss() -> bool:
+    """ピークRSS（VmHWM）を現在のRSSにリセット（Linuxのみ。できなければ False）"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _own_peak_rss() -> int:
+    """自プロセスのピークRSS。リセット可能な VmHWM を優先し、なければ ru_maxrss"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    if resource is None:
+        return 0
+    # Linuxはキロバイト、macOSはバイト
+    unit = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+
+
+def peak_rss() -> int:
+    """プロセス（と終了済みの子プロセス）のピークRSS（バイト）"""
+    children = 0
+    if resource is not None:
+        unit = 1 if sys.platform == 'darwin' else 1024
+        children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+    return max(_own_peak_rss(), children)
+
+
+def run_case(case: str, scale_name: str, repeat: int, fixture_dir: str = None) -> Dict:
+    """1ケースを実行して計測結果を返す（子プロセスで呼ばれる）"""
+    setup, _ = CASES[case]
+    scale = SCALES.get(scale_name, {})
+    result = {'case': case, 'scale': scale_name, **scale, 'status': 'ok'}
+
+    with tempfile.TemporaryDirectory(prefix='market_bench_') as workdir, redirect_stdout(io.StringIO()):
+        try:
+            if case == 'yield_fetch':
+                target = setup(scale, workdir, fixture_dir)
+            else:
+                target = setup(scale, workdir)
+
+            # import・準備の分を除くため、ここを基準にする
+            rss_before = current_rss()
+            reset_peak_rss()
+            walls = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                target()
+                walls.append(time.perf_counter() - started)
+            rss_peak = peak_rss()
+
+            # tracemallocは実行を遅くするため、時間計測とは別に1回だけ実行
+            tracemalloc.start()
+            target()
+            alloc_net, alloc_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        except SkipCase as e:
+            result.update(status='skipped', error=str(e))
+            return result
+        except Exception as e:
+            result.update(status='error', error=f"{type(e).__name__}: {e}")
+            return result
+
+    mb = 1024 * 1024
+    result.update(
+        repeat=repeat,
+        wall_min_s=round(min(walls), 6),
+        wall_median_s=round(statistics.median(walls), 6),
+        rss_base_mb=round(rss_before / mb, 2),
+        peak_rss_delta_mb=round(max(0, rss_peak - rss_before) / mb, 2),
+        alloc_peak_mb=round(alloc_peak / mb, 3),
+        alloc_net_mb=round(alloc_net / mb, 3),
+    )
+    return result
+
+
+def run_isolated(case: str, scale_name: str, repeat: int, fixture_dir: str = None) -> Dict:
+    """ケースを新しい子プロセスで実行（ピークRSSを他のケースと分けるため）"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+        return executor.submit(run_case, case, scale_name, repeat, fixture_dir).result()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=repo_root, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_results(results: List[Dict], baseline: Dict = None):
+    """結果の表（ベースラインがあれば実行時間・ピークRSSの比も）を表示"""
+    previous = {}
+    if baseline:
+        previous = {(r['case'], r['scale']): r for r in baseline.get('results', [])}
+
+    print("\n" + "=" * 100)
+    print("BENCHMARK RESULTS")
+    print("=" * 100)
+    header = f"{'Case':<20} {'Scale':<8} {'Min (s)':>10} {'Median (s)':>11} {'Base RSS':>10} {'Peak +':>9} {'Alloc peak':>11} {'Alloc net':>10}"
+    if previous:
+        header += f" {'vs base':>9}"
+    print(header)
+    print("-" * 100)
+
+    for r in results:
+        if r['status'] != 'ok':
+            print(f"{r['case']:<20} {r['scale']:<8} {r['status']}: {r.get('error')}")
+            continue
+
+        line = (
+            f"{r['case']:<20} {r['scale']:<8} {r['wall_min_s']:>10.4f} {r['wall_median_s']:>11.4f} "
+            f"{r['rss_base_mb']:>8.1f}MB {r['peak_rss_delta_mb']:>7.1f}MB {r['alloc_peak_mb']:>9.2f}MB {r['alloc_net_mb']:>8.2f}MB"
+        )
+        before = previous.get((r['case'], r['scale']))
+        if before and before.get('status') == 'ok' and before.get('wall_min_s'):
+            line += f" {r['wall_min_s'] / before['wall_min_s']:>8.2f}x"
+        print(line)
+
+    print("=" * 100)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='パイプラインのベンチマーク')
+    parser.add_argument('--cases', type=str, default=','.join(CASES),
+                        help=f"実行するケース（カンマ区切り: {', '.join(CASES)}）")
+    parser.add_argument('--scales', type=str, default=','.join(SCALES),
+                        help=f"合成データの規模（カンマ区切り: {', '.join(SCALES)}）")
+    parser.add_argument('--repeat', type=int, default=3, help='各ケースの繰り返し回数')
+    parser.add_argument('--output', type=str, default=DEFAULT_OUTPUT, help='結果JSONの保存先')
+    parser.add_argument('--baseline', type=str, help='比較するベースラインJSON')
+    parser.add_argument('--fixtures', type=str, help='yield_fetch で再生するフィクスチャのディレクトリ')
+    parser.add_argument('--in-process', action='store_true',
+                        help='子プロセスに分けずに実行（Linux以外ではピークRSSがケース間で累積する）')
+
+    args = parser.parse_args()
+    cases = [c.strip() for c in args.cases.split(',') if c.strip()]
+    scales = [s.strip() for s in args.scales.split(',') if s.strip()]
+
+    for name in cases:
+        if name not in CASES:
+            parser.error(f"Unknown case: {name}")
+    for name in scales:
+        if name not in SCALES:
+            parser.error(f"Unknown scale: {name}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'rb') as f:
+            baseline = get_serializer('pretty').loads(f.read())
+
+    runner = run_case if args.in_process else run_isolated
+    results = []
+
+    for case in cases:
+        for scale_name in case_scales(case, scales):
+            print(f"Running {case} ({scale_name})...", flush=True)
+            result = runner(case, scale_name, args.repeat, args.fixtures)
+            results.append(result)
+            if result['status'] == 'ok':
+                print(f"  {result['wall_min_s']:.4f}s, peak RSS +{result['peak_rss_delta_mb']:.1f}MB")
+            else:
+                print(f"  {result['status']}: {result.get('error')}")
+
+    print_results(results, baseline)
+
+    report = {
+        'version': BASELINE_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'isolated': not args.in_process,
+        'results': results,
+    }
+    atomic_write(args.output, get_serializer('pretty').dumps(report))
+    print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+経済カレンダー履歴の検索モジュール（investpyスナップショット用）
+
+market/data/economic_calendar/json/investpy_*.json を1件ずつ辿る代わりに、
+全スナップショットから (国, 指標名, 日時) でソートした索引を作り、索引から検索します。
+
+- 索引はディスクに保存し、次回以降は新しく増えたスナップショットだけを読み込む
+- 同じイベントが複数のスナップショット（昨日・今日・明日）に出てくる場合は、
+  最も新しいスナップショットの値（実績が入っているもの）を採用
+- 指標名の前方一致・日時の範囲・重要度で絞り込み
+
+使用例:
+  # 今年の米国CPI（実績と予想）
+  python3 calendar_query.py --country us --event CPI --start 2026-01-01 --end 2026-12-31
+
+  # 今週の重要度highのイベント（全ての国）
+  python3 calendar_query.py --start 2026-06-22 --end 2026-06-28 --importance high
+
+  # 索引を作り直す
+  python3 calendar_query.py --rebuild --event GDP
+"""
+
+import argparse
+import os
+import re
+import sys
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from logging_setup import add_logging_arguments, get_logger, setup_logging_from_args
+from markdown_report import Column, MarkdownReport, TableSchema
+from output_writer import atomic_write
+from serializers import get_serializer, load_snapshot, snapshot_paths
+
+logger = get_logger(__name__)
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+repo_root = os.path.dirname(os.path.dirname(script_dir))
+
+DEFAULT_JSON_DIR = os.path.join(repo_root, 'market/data/economic_calendar/json')
+DEFAULT_INDEX_PATH = os.path.join(repo_root, 'market/data/economic_calendar/index/calendar_index.json')
+SNAPSHOT_PREFIX = 'investpy_'
+INDEX_VERSION = 1
+
+# スナップショットの国コード -> 国名（fetch_investpy.main と同じ）
+COUNTRY_CODES = {
+    'jp': 'japan',
+    'uk': 'united kingdom',
+    'us': 'united states',
+}
+
+DAY_KEYS = ('yesterday', 'today', 'tomorrow')
+TIME_PATTERN = re.compile(r'^\d{1,2}:\d{2}$')
+
+# 上限値（前方一致の範囲検索の終端に使う）
+MAX_CHAR = '\U0010ffff'
+
+RESULT_SCHEMA = TableSchema(
+    Column('日時', 'datetime'),
+    Column('国', 'country'),
+    Column('指標', 'event'),
+    Column('重要度', 'importance'),
+    Column('予想', 'forecast'),
+    Column('実績', 'actual'),
+    Column('前回', 'previous'),
+)
+
+
+def normalize_country(country: str) -> str:
+    """国コード（jp, us, uk）または国名を国名（小文字）にそろえる"""
+    country = country.strip().lower()
+    return COUNTRY_CODES.get(country, country)
+
+
+def to_datetime_key(date: str, time: str) -> Optional[str]:
+    """'DD/MM/YYYY' と 'HH:MM' をソート可能な 'YYYY-MM-DD HH:MM' にする（時刻なしは日付のみ）"""
+    try:
+        day = datetime.strptime(date, '%d/%m/%Y').strftime('%Y-%m-%d')
+    except (TypeError, ValueError):
+        return None
+
+    time = (time or '').strip()
+    if TIME_PATTERN.match(time):
+        return f"{day} {int(time.split(':')[0]):02d}:{time.split(':')[1]}"
+    return day
+
+
+def records_from_snapshot(snapshot: Dict, source: str) -> Iterable[Dict]:
+    """1スナップショット（{code: {yesterday, today, tomorrow}}）からイベントを取り出す"""
+    for code, data in snapshot.items():
+        if not isinstance(data, dict):
+            continue
+        country = normalize_country(data.get('country') or code)
+
+        for day_key in DAY_KEYS:
+            for event in data.get(day_key) or []:
+                dt = to_datetime_key(event.get('date'), event.get('time'))
+                if dt is None or not event.get('event'):
+                    continue
+                yield {
+                    'country': country,
+                    'event': event['event'],
+                    'datetime': dt,
+                    'importance': event.get('importance'),
+                    'actual': event.get('actual'),
+                    'forecast': event.get('forecast'),
+                    'previous': event.get('previous'),
+                    'source': source,
+                }
+
+
+def _primary_key(record: Dict) -> Tuple[str, str, str]:
+    return (record['country'], record['event'].casefold(), record['datetime'])
+
+
+def _time_key(record: Dict) -> Tuple[str, str, str]:
+    return (record['datetime'], record['country'], record['event'].casefold())
+
+
+class CalendarIndex:
+    """(国, 指標名, 日時) と (日時, 国) の2つのソート済み索引"""
+
+    def __init__(self, json_dir: str = DEFAULT_JSON_DIR, index_path: str = DEFAULT_INDEX_PATH):
+        self.json_dir = json_dir
+        self.index_path = index_path
+        self.snapshots = set()
+        self.records: List[Dict] = []
+        self._primary_keys: List[Tuple[str, str, str]] = []
+        self._by_time: List[int] = []
+        self._time_keys: List[Tuple[str, str, str]] = []
+
+    # ============ 索引の読み書き =============
+
+    def load(self) -> bool:
+        """保存済みの索引を読み込む（なければFalse）"""
+        if not os.path.exists(self.index_path):
+            return False
+
+        try:
+            data = load_snapshot(self.index_path)
+        except Exception as e:
+            logger.warning(f"Could not read index {self.index_path}: {e}")
+            return False
+
+        if data.get('version') != INDEX_VERSION:
+            return False
+
+        self.snapshots = set(data.get('snapshots', []))
+        self._set_records(data.get('records', []), presorted=True)
+        return True
+
+    def save(self):
+        """索引をコンパクトJSONで保存"""
+        payload = {
+            'version': INDEX_VERSION,
+            'snapshots': sorted(self.snapshots),
+            'records': self.records,
+        }
+        atomic_write(self.index_path, get_serializer('compact').dumps(payload))
+
+    def _set_records(self, records: List[Dict], presorted: bool = False):
+        if not presorted:
+            records.sort(key=_primary_key)
+        self.records = records
+        self._primary_keys = [_primary_key(r) for r in records]
+        self._by_time = sorted(range(len(records)), key=lambda i: _time_key(records[i]))
+        self._time_keys = [_time_key(records[i]) for i in self._by_time]
+
+    def refresh(self, rebuild: bool = False) -> int:
+        """
+        索引を最新化（未読のスナップショットだけを読み込む）
+
+        Args:
+            rebuild: Trueなら全スナップショットから作り直す
+
+        Returns:
+            int: 新しく読み込んだスナップショット数
+        """
+        if rebuild or not self.load():
+            self.snapshots = set()
+            self._set_records([])
+
+        new_paths = [
+            p for p in snapshot_paths(self.json_dir, SNAPSHOT_PREFIX)
+            if os.path.basename(p) not in self.snapshots
+        ]
+        if not new_paths:
+            return 0
+
+        merged = {_primary_key(r): r for r in self.records}
+
+        # 古い順に読み込み、同じイベントは新しいスナップショットの値で上書き
+        for path in new_paths:
+            source = os.path.basename(path)
+            try:
+                snapshot = load_snapshot(path)
+            except Exception as e:
+                logger.warning(f"Skipped unreadable snapshot {source}: {e}")
+                continue
+
+            for record in records_from_snapshot(snapshot, source):
+                merged[_primary_key(record)] = record
+            self.snapshots.add(source)
+
+        self._set_records(list(merged.values()))
+        self.save()
+        return len(new_paths)
+
+    # ============ 検索 =============
+
+    def query(
+        self,
+        country: str = None,
+        event_prefix: str = None,
+        start: str = None,
+        end: str = None,
+        importance: Iterable[str] = None
+    ) -> List[Dict]:
+        """
+        イベントを検索
+
+        Args:
+            country: 国コード（jp, us, uk）または国名
+            event_prefix: 指標名の前方一致（大文字小文字は区別しない）
+            start: 開始日（YYYY-MM-DD、この日を含む）
+            end: 終了日（YYYY-MM-DD、この日を含む）
+            importance: 重要度（'low', 'medium', 'high'）のリスト
+
+        Returns:
+            日時順のイベントのリスト
+        """
+        lo_dt = start or ''
+        hi_dt = f"{end}{MAX_CHAR}" if end else MAX_CHAR
+        importance = set(importance) if importance else None
+
+        if event_prefix is not None:
+            # (国, 指標名, 日時) 索引の前方一致範囲を国ごとに走査
+            prefix = event_prefix.casefold()
+            countries = [normalize_country(country)] if country else sorted({k[0] for k in self._primary_keys})
+            hits = []
+            for c in countries:
+                lo = bisect_left(self._primary_keys, (c, prefix))
+                hi = bisect_left(self._primary_keys, (c, prefix + MAX_CHAR))
+                hits.extend(
+                    self.records[i] for i in range(lo, hi)
+                    if lo_dt <= self._primary_keys[i][2] <= hi_dt
+                )
+            hits.sort(key=_time_key)
+        else:
+            # (日時, 国) 索引で日時の範囲を走査
+            lo = bisect_left(self._time_keys, (lo_dt,))
+            hi = bisect_right(self._time_keys, (hi_dt,))
+            target = normalize_country(country) if country else None
+            hits = [
+                self.records[self._by_time[i]] for i in range(lo, hi)
+                if target is None or self._time_keys[i][1] == target
+            ]
+
+        if importance:
+            hits = [r for r in hits if r.get('importance') in importance]
+
+        return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description='経済カレンダー履歴の検索')
+    parser.add_argument('--country', type=str, help='国コード（jp, us, uk）または国名')
+    parser.add_argument('--event', type=str, help='指標名の前方一致（例: CPI, 非農業）')
+    parser.add_argument('--start', type=str, help='開始日 (YYYY-MM-DD)')
+    parser.add_argument('--end', type=str, help='終了日 (YYYY-MM-DD)')
+    parser.add_argument('--importance', type=str, action='append', choices=['low', 'medium', 'high'],
+                        help='重要度でフィルタ（複数指定可）')
+    parser.add_argument('--json-dir', type=str, default=DEFAULT_JSON_DIR, help='スナップショットのディレクトリ')
+    parser.add_argument('--index', type=str, default=DEFAULT_INDEX_PATH, help='索引ファイルのパス')
+    parser.add_argument('--rebuild', action='store_true', help='索引を作り直す')
+    parser.add_argument('--json', action='store_true', help='結果をJSONで出力')
+    add_logging_arguments(parser)
+
+    args = parser.parse_args()
+    setup_logging_from_args(args)
+
+    index = CalendarIndex(args.json_dir, args.index)
+    indexed = index.refresh(rebuild=args.rebuild)
+    if indexed and not args.json:
+        logger.info(f"Indexed {indexed} new snapshot(s), {len(index.records)} events total")
+
+    results = index.query(
+        country=args.country,
+        event_prefix=args.event,
+        start=args.start,
+        end=args.end,
+        importance=args.importance
+    )
+
+    if args.json:
+        sys.stdout.write(get_serializer('pretty').dumps(results).decode('utf-8') + '\n')
+        return
+
+    MarkdownReport(sys.stdout).table(RESULT_SCHEMA, results)
+    print(f"{len(results)} events")
+
+
+if __name__ == "__main__":
+    main()
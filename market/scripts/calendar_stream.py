@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Trading Economicsのカレンダー応答のストリーミング解析
+
+レスポンス全体を response.json() で読み込まず、届いたチャンクから配列の要素（イベント）を
+1件ずつ取り出します。予想値・重要度・国の絞り込みは解析中に行い、条件に合わないイベントは
+辞書に変換せずに捨てるため、メモリは応答の大きさによらずほぼ一定で、絞り込みはダウンロードと
+並行して進みます。
+
+    iter_json_array      : バイト列のチャンクからトップレベルのJSON配列の要素を順に返す（標準ライブラリのみ）
+    iter_calendar_events : requestsのレスポンス（stream=True）から絞り込み済みのイベントを順に返す
+
+使用例:
+    with session.get(url, params=params, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        for event in iter_calendar_events(response, forecast_only=True, importance='high'):
+            ...
+"""
+
+import codecs
+import json
+from typing import Any, Dict, Iterable, Iterator, List
+
+# iter_content のチャンクサイズ
+JSON_STREAM_CHUNK_SIZE = 64 * 1024
+
+# 重要度の指定 -> Trading Economics の Importance（指定以上を残す）
+IMPORTANCE_LEVELS = {
+    'low': 1,
+    'medium': 2,
+    'high': 3,
+}
+
+# レスポンスの Country がリクエストの国名と異なるもの（小文字）
+COUNTRY_ALIASES = {
+    'euro area': 'euro zone',
+}
+
+_WHITESPACE = ' \t\r\n'
+_decoder = json.JSONDecoder()
+
+
+def _scalar_complete(buffer: str, end: int) -> bool:
+    """
+    配列要素のスカラー値が end で終わっていると確定できるか
+
+    "45" の後に ".5" が届くように、チャンクの境目で数値が切れると raw_decode は
+    途中までを値として返すため、直後（空白を除く）に ',' か ']' が届いていることを確認します。
+    """
+    while end < len(buffer) and buffer[end] in _WHITESPACE:
+        end += 1
+    return end < len(buffer) and buffer[end] in ',]'
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """
+    トップレベルのJSON配列の要素を、届いたチャンク（UTF-8のバイト列）から順に返す
+
+    バッファに持つのは解析中の要素1つとチャンク1つ分だけです。
+    配列でない応答（エラーメッセージ等）や途中で切れた応答は ValueError になります。
+    """
+    decode = codecs.getincrementaldecoder('utf-8')().decode
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+    started = False
+
+    while True:
+        chunk = next(chunks, None)
+        eof = chunk is None
+        buffer = buffer[pos:] + decode(b'' if eof else chunk, final=eof)
+        pos = 0
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= len(buffer):
+                break
+
+            char = buffer[pos]
+            if not started:
+                if char != '[':
+                    raise ValueError(f"Expected a JSON array, got {buffer[pos:pos + 80]!r}")
+                started = True
+                pos += 1
+                continue
+            if char == ']':
+                return
+            if char == ',':
+                pos += 1
+                continue
+
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                break  # 要素の途中まで。次のチャンクを待つ
+            if not eof and not isinstance(value, (dict, list)) and not _scalar_complete(buffer, end):
+                break  # 数値等が途中で切れている可能性があるため、区切り文字が届いてから確定
+            yield value
+            pos = end
+
+        if eof:
+            raise ValueError("Truncated JSON array" if started else "Empty response")
+
+
+def country_key(name: str) -> str:
+    """国名の比較用キー（小文字・COUNTRY_ALIASES で正規化）"""
+    name = (name or '').lower()
+    return COUNTRY_ALIASES.get(name, name)
+
+
+def normalize_event(item: Dict) -> Dict:
+    """Trading Economics のイベントを出力用の辞書に"""
+    return {
+        'date': item.get('Date', ''),
+        'time': item.get('Time', ''),
+        'country': item.get('Country', ''),
+        'event': item.get('Event', ''),
+        'importance': item.get('Importance', ''),
+        'actual': item.get('Actual', ''),
+        'forecast': item.get('Forecast', ''),
+        'previous': item.get('Previous', ''),
+    }
+
+
+def _importance(item: Dict) -> int:
+    try:
+        return int(item.get('Importance') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def iter_calendar_events(
+    response,
+    forecast_only: bool = False,
+    importance: str = None,
+    countries: List[str] = None,
+    chunk_size: int = JSON_STREAM_CHUNK_SIZE
+) -> Iterator[Dict]:
+    """
+    カレンダーの応答（stream=True で取得したレスポンス）から、条件に合うイベントを届いた順に返す
+
+    Args:
+        response: requestsのレスポンス
+        forecast_only: 予想値（Forecast）のあるイベントのみ
+        importance: 'low', 'medium', 'high'（指定以上の重要度のみ）
+        countries: 国名のリスト（いずれかの国のイベントのみ）
+        chunk_size: 1回に読むバイト数
+    """
+    min_level = IMPORTANCE_LEVELS[importance] if importance else 0
+    wanted = {country_key(country) for country in countries} if countries else None
+
+    for item in iter_json_array(response.iter_content(chunk_size)):
+        if not isinstance(item, dict):
+            continue
+        if forecast_only and not item.get('Forecast'):
+            continue
+        if min_level and _importance(item) < min_level:
+            continue
+        if wanted is not None and country_key(item.get('Country')) not in wanted:
+            continue
+        yield normalize_event(item)
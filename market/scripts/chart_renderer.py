@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+イールドカーブのチャート描画モジュール
+
+描画処理を取得処理から切り離し、プロセスプールで並列に描画します。
+
+特徴:
+- チャート毎に入力データのハッシュを images/render_hashes.json に記録し、
+  前回と同じデータのチャートは描画をスキップ
+- 出力形式を選択可能
+    'png'   : フル解像度PNG（dpi=150、従来と同じ）
+    'svg'   : SVG（ラスタライズ不要で軽量）
+    'thumb' : 低解像度のサムネイルPNG（<name>_thumb.png）
+- 国数に応じてサブプロットのグリッドを自動で拡張（3列固定）
+
+描画関数はプロセス間でpickleできるよう、すべてモジュールのトップレベルに定義しています。
+"""
+
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Dict, List, Tuple
+
+import matplotlib
+# ヘッドレス環境（GitHub Actions）で動作させるためにAggバックエンドを使用
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+import instrumentation
+from logging_setup import get_logger
+from output_writer import atomic_open, atomic_write, normalize_payload
+from pipeline import fingerprint
+
+logger = get_logger(__name__)
+
+plt.rcParams['font.family'] = 'DejaVu Sans'
+plt.rcParams['axes.unicode_minus'] = False
+
+FULL_DPI = 150
+THUMBNAIL_DPI = 40
+OUTPUT_FORMATS = ('png', 'svg', 'thumb')
+HASH_FILE = 'render_hashes.json'
+
+COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
+GRID_COLUMNS = 3
+
+
+def _as_of_date(results: dict) -> str:
+    """データの基準日（各国の最新日付の最大値）を返す"""
+    dates = [bond.get('date') for data in results.values() for bond in data.get('bonds', []) if bond.get('date')]
+    return max(dates) if dates else datetime.now().strftime('%Y-%m-%d')
+
+
+def _create_grid(count: int, title: str):
+    """国数に応じたサブプロットのグリッドを作成"""
+    rows = max(1, math.ceil(count / GRID_COLUMNS))
+    fig, axes = plt.subplots(rows, GRID_COLUMNS, figsize=(6 * GRID_COLUMNS, 6 * rows), squeeze=False)
+    fig.suptitle(title, fontsize=16, fontweight='bold')
+
+    # 余ったサブプロットは非表示
+    for idx in range(count, rows * GRID_COLUMNS):
+        axes[idx // GRID_COLUMNS, idx % GRID_COLUMNS].axis('off')
+
+    return fig, axes
+
+
+def build_yield_curves_figure(results: dict, bonds_config: dict):
+    """全国のイールドカーブのFigureを作成"""
+    countries = list(bonds_config.keys())
+    fig, axes = _create_grid(len(countries), f'Government Bond Yield Curves\n{_as_of_date(results)}')
+
+    for idx, country in enumerate(countries):
+        ax = axes[idx // GRID_COLUMNS, idx % GRID_COLUMNS]
+        color = COLORS[idx % len(COLORS)]
+
+        if country not in results:
+            ax.text(0.5, 0.5, 'No Data', ha='center', va='center', transform=ax.transAxes)
+            ax.set_title(bonds_config[country]['name_ja'])
+            continue
+
+        data = results[country]
+        periods = [bond['period'] for bond in data['bonds']]
+        yields = [bond['yield'] for bond in data['bonds']]
+
+        # イールドカーブ
+        ax.plot(periods, yields, marker='o', linewidth=2, markersize=8, color=color)
+        ax.fill_between(periods, 0, yields, alpha=0.2, color=color)
+
+        # 値を表示
+        for p, y in zip(periods, yields):
+            ax.text(p, y, f'{y:.2f}%', ha='center', va='bottom', fontsize=9)
+
+        ax.set_xlabel('Maturity (Years)', fontsize=11)
+        ax.set_ylabel('Yield (%)', fontsize=11)
+        ax.set_title(f"{data['country_name_ja']} ({data['country_name']})", fontsize=12, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        ax.set_xlim(0, max(periods) + 2)
+
+    fig.tight_layout()
+    return fig
+
+
+def build_change_histogram_figure(results: dict, bonds_config: dict):
+    """前日比ヒストグラムのFigureを作成"""
+    countries = list(bonds_config.keys())
+    fig, axes = _create_grid(len(countries), f'Yield Change (Day-over-Day)\n{_as_of_date(results)}')
+
+    for idx, country in enumerate(countries):
+        ax = axes[idx // GRID_COLUMNS, idx % GRID_COLUMNS]
+
+        if country not in results:
+            ax.text(0.5, 0.5, 'No Data', ha='center', va='center', transform=ax.transAxes)
+            ax.set_title(bonds_config[country]['name_ja'])
+            continue
+
+        data = results[country]
+
+        # 前日比データを抽出
+        changes = []
+        labels = []
+        colors_bar = []
+
+        for bond in data['bonds']:
+            if bond.get('change') is not None:
+                changes.append(bond['change'])
+                labels.append(f"{bond['period']}Y")
+                colors_bar.append('green' if bond['change'] >= 0 else 'red')
+
+        if changes:
+            bars = ax.bar(labels, changes, color=colors_bar, alpha=0.7, edgecolor='black')
+
+            # 値を表示
+            for bar, change in zip(bars, changes):
+                height = bar.get_height()
+                ax.text(bar.get_x() + bar.get_width() / 2., height,
+                        f'{change:+.2f}%',
+                        ha='center', va='bottom' if height >= 0 else 'top',
+                        fontsize=9, fontweight='bold')
+
+            ax.axhline(y=0, color='black', linestyle='-', linewidth=0.8)
+            ax.set_xlabel('Maturity', fontsize=11)
+            ax.set_ylabel('Change (%)', fontsize=11)
+            ax.set_title(f"{data['country_name_ja']} ({data['country_name']})", fontsize=12, fontweight='bold')
+            ax.grid(True, alpha=0.3, axis='y')
+
+            # y軸の範囲を設定（全て0の場合も範囲が潰れないようにする）
+            y_max = max(abs(c) for c in changes) or 0.1
+            ax.set_ylim(-y_max * 1.5, y_max * 1.5)
+        else:
+            ax.text(0.5, 0.5, 'No change data', ha='center', va='center', transform=ax.transAxes)
+            ax.set_title(f"{data['country_name_ja']} ({data['country_name']})", fontsize=12, fontweight='bold')
+
+    fig.tight_layout()
+    return fig
+
+
+# チャート種別 -> (Figure作成関数, 既定のファイル名)
+CHART_BUILDERS = {
+    'yield_curves': (build_yield_curves_figure, 'yield_curves'),
+    'yield_changes': (build_change_histogram_figure, 'yield_changes'),
+}
+
+
+def output_paths(base_path: str, formats: Tuple[str, ...]) -> List[str]:
+    """出力形式毎のファイルパスを返す（base_pathは拡張子なし）"""
+    paths = []
+    for fmt in formats:
+        if fmt == 'png':
+            paths.append(f"{base_path}.png")
+        elif fmt == 'svg':
+            paths.append(f"{base_path}.svg")
+        elif fmt == 'thumb':
+            paths.append(f"{base_path}_thumb.png")
+        else:
+            raise ValueError(f"Unknown chart format: {fmt} (expected one of {OUTPUT_FORMATS})")
+    return paths
+
+
+def save_figure(fig, base_path: str, formats: Tuple[str, ...]) -> List[str]:
+    """Figureを指定形式で保存し、保存したパスを返す"""
+    saved = []
+    for fmt, path in zip(formats, output_paths(base_path, formats)):
+        # 一時ファイル経由で書き込み、読み手が書きかけの画像を見ないようにする
+        with atomic_open(path, 'wb') as f:
+            if fmt == 'svg':
+                fig.savefig(f, format='svg', bbox_inches='tight')
+            elif fmt == 'thumb':
+                fig.savefig(f, format='png', dpi=THUMBNAIL_DPI, bbox_inches='tight')
+            else:
+                fig.savefig(f, format='png', dpi=FULL_DPI, bbox_inches='tight')
+        saved.append(path)
+    return saved
+
+
+def render_chart(chart: str, results: dict, bonds_config: dict, base_path: str, formats: Tuple[str, ...]) -> List[str]:
+    """1チャートを描画して保存（プロセスプールのワーカーで実行される）"""
+    builder, _ = CHART_BUILDERS[chart]
+    fig = builder(results, bonds_config)
+    try:
+        return save_figure(fig, base_path, formats)
+    finally:
+        plt.close(fig)
+
+
+def chart_hash(chart: str, results: dict, bonds_config: dict, formats: Tuple[str, ...]) -> str:
+    """チャートの入力データのハッシュ（取得時刻は描画内容に影響しないため除外）"""
+    return fingerprint([chart, normalize_payload(results), bonds_config, sorted(formats)])
+
+
+class ChartRenderer:
+    """チャートをプロセスプールで並列描画し、変更のないチャートはスキップする"""
+
+    def __init__(self, output_dir: str, formats: Tuple[str, ...] = ('png',), max_workers: int = None, force: bool = False):
+        """
+        Args:
+            output_dir: 画像の保存先ディレクトリ
+            formats: 出力形式（'png', 'svg', 'thumb' の組み合わせ）
+            max_workers: プロセス数（Noneならチャート数とCPU数の小さい方）
+            force: Trueならハッシュが同じでも再描画
+        """
+        for fmt in formats:
+            if fmt not in OUTPUT_FORMATS:
+                raise ValueError(f"Unknown chart format: {fmt} (expected one of {OUTPUT_FORMATS})")
+
+        self.output_dir = output_dir
+        self.formats = tuple(formats)
+        self.max_workers = max_workers
+        self.force = force
+        self.hash_file = os.path.join(output_dir, HASH_FILE)
+
+    def _load_hashes(self) -> Dict[str, str]:
+        if not os.path.exists(self.hash_file):
+            return {}
+        try:
+            with open(self.hash_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read {self.hash_file}: {e}")
+            return {}
+
+    def _save_hashes(self, hashes: Dict[str, str]):
+        atomic_write(self.hash_file, json.dumps(hashes, ensure_ascii=False, indent=2, sort_keys=True))
+
+    def render(self, results: dict, bonds_config: dict, charts: List[str] = None) -> Dict[str, List[str]]:
+        """
+        チャートを描画
+
+        Args:
+            results: YieldCurveFetcher.results
+            bonds_config: 国債設定（BONDS_CONFIG）
+            charts: 描画するチャート種別（Noneなら全種別）
+
+        Returns:
+            dict: チャート種別 -> 保存したパス（スキップした場合は空リスト）
+        """
+        if not results:
+            logger.warning("No data to plot")
+            return {}
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        charts = charts or list(CHART_BUILDERS.keys())
+        hashes = self._load_hashes()
+
+        jobs = {}
+        rendered = {}
+        for chart in charts:
+            _, filename = CHART_BUILDERS[chart]
+            base_path = os.path.join(self.output_dir, filename)
+            digest = chart_hash(chart, results, bonds_config, self.formats)
+            outputs_exist = all(os.path.exists(p) for p in output_paths(base_path, self.formats))
+
+            if not self.force and hashes.get(chart) == digest and outputs_exist:
+                logger.info(f"Skipped {chart}: input data unchanged since last render")
+                instrumentation.count('cache_hits')
+                instrumentation.count('charts_skipped')
+                rendered[chart] = []
+                continue
+
+            jobs[chart] = (base_path, digest)
+
+        if jobs:
+            workers = self.max_workers or min(len(jobs), os.cpu_count() or 1)
+            with instrumentation.span('charts', kind='render', charts=list(jobs), formats=list(self.formats)):
+                # Pipelineのワーカースレッドから呼ばれるため、fork でロック（ログ等）を持ったまま
+                # 複製しないよう spawn で起動する
+                with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as executor:
+                    futures = {
+                        chart: executor.submit(render_chart, chart, results, bonds_config, base_path, self.formats)
+                        for chart, (base_path, _) in jobs.items()
+                    }
+
+                    for chart, future in futures.items():
+                        try:
+                            rendered[chart] = future.result()
+                            hashes[chart] = jobs[chart][1]
+                            instrumentation.count('charts_rendered')
+                            for path in rendered[chart]:
+                                logger.info(f"Saved {chart}: {path}")
+                        except Exception as e:
+                            logger.error(f"Failed to render {chart}: {type(e).__name__}: {e}")
+                            hashes.pop(chart, None)
+
+            self._save_hashes(hashes)
+
+        return rendered
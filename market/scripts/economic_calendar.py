@@ -2,25 +2,96 @@
 """
 経済指標カレンダー収集スクリプト
 Investing.comから昨日の実績と今日の予定を取得する
+
+HTMLの解析は既定でlxml（事前コンパイルしたXPath、カレンダー表の部分だけを解析）を使い、
+lxmlがなければ従来のBeautifulSoupを使います。
 """
 
+import argparse
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+# パーサーはどちらか一方があればよい（investing_http のHTTPバックエンドはセッションだけを使う）
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    etree = None
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 import json
 import re
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Union
+
+from http_replay import install_http_replay
+from logging_setup import add_logging_arguments, get_logger, setup_logging_from_args
+from rate_limit import RateLimiter
+
+logger = get_logger(__name__)
+
+PARSERS = ('lxml', 'bs4')
+EVENT_FIELDS = ('time', 'importance', 'country', 'event', 'actual', 'forecast', 'previous')
+
+# ページ全体ではなく、カレンダー表（<table id="economicCalendarData">）の範囲だけを解析する
+CALENDAR_TABLE_START = re.compile(rb'<table\b[^>]*\bid=["\']economicCalendarData["\']')
+# 表の開始・終了タグ（入れ子の表を数えて、対応する終了タグを探す）
+TABLE_TAG = re.compile(rb'<(/?)table\b[^>]*>', re.IGNORECASE)
+
+# 期間取得（fetch_date_range）の既定値: 同時リクエスト数と毎秒のリクエスト数の上限
+RANGE_WORKERS = 4
+RANGE_RATE_LIMIT = 2.0
+
+
+def _has_class(name: str) -> str:
+    """class属性に name を（単語として）含むかのXPath条件"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if etree is not None:
+    # 行毎に組み立て直さないよう、モジュール読み込み時に1回だけコンパイル
+    EVENT_ROWS_XPATH = etree.XPath(f".//tr[{_has_class('js-event-item')}]")
+    FALLBACK_ROWS_XPATH = etree.XPath(f"//tbody[{_has_class('js-economic-table')}]/tr")
+    BULL_ICONS_XPATH = etree.XPath(f"count(.//i[{_has_class('grayFullBullishIcon')}])")
+
+
+def _cell_text(cell) -> str:
+    """BeautifulSoupの get_text(strip=True) と同じ（各テキスト片をstripして連結）"""
+    return ''.join(text.strip() for text in cell.itertext())
+
+
+def _table_end(content: bytes, pos: int) -> int:
+    """pos（開始タグの直後）の表に対応する終了タグの直後の位置（見つからなければ-1）"""
+    depth = 1
+    for tag in TABLE_TAG.finditer(content, pos):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return tag.end()
+    return -1
+
 
 class EconomicCalendarScraper:
     """Investing.comの経済指標カレンダーをスクレイピング"""
 
     BASE_URL = "https://www.investing.com/economic-calendar"
 
-    def __init__(self):
+    def __init__(self, parser: str = None):
+        """
+        Args:
+            parser: 'lxml' または 'bs4'（Noneならlxmlがあればlxml）
+        """
+        self.parser = parser or ('lxml' if etree is not None else 'bs4')
+        if self.parser not in PARSERS:
+            raise ValueError(f"Unknown parser: {self.parser} (expected one of {', '.join(PARSERS)})")
+
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        # 期間取得（fetch_date_range）で取得に失敗した日（日付 'YYYY-MM-DD', エラー）
+        self.failed_days: List[Tuple[str, str]] = []
 
     def get_date_params(self, days_offset: int = 0) -> str:
         """日付パラメータを取得（Investing.com形式）"""
@@ -38,6 +109,20 @@ class EconomicCalendarScraper:
         Returns:
             経済指標のリスト
         """
+        try:
+            events = self._fetch_page(date_str)
+            if events is None:
+                logger.warning(f"Could not find economic calendar data for {date_str}")
+                return []
+
+            return events
+
+        except Exception as e:
+            logger.error(f"Error fetching data for {date_str}: {e}")
+            return []
+
+    def _fetch_page(self, date_str: str) -> Optional[List[Dict]]:
+        """1日分のページを取得して解析（失敗時は例外、カレンダー表がなければNone）"""
         # Investing.comのAPIを使用（より確実）
         url = f"{self.BASE_URL}/"
         params = {
@@ -46,43 +131,116 @@ class EconomicCalendarScraper:
             'importance': 'all',      # 全重要度
         }
 
-        try:
-            # Webページからスクレイピング
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # 経済指標テーブルを探す
-            events = []
-            table = soup.find('table', {'id': 'economicCalendarData'})
-
-            if not table:
-                # 別の方法を試す
-                rows = soup.select('tbody.js-economic-table tr')
-                if not rows:
-                    print(f"Warning: Could not find economic calendar data for {date_str}")
-                    return []
-
-                for row in rows:
-                    event = self._parse_event_row(row)
-                    if event:
-                        events.append(event)
+        # Webページからスクレイピング
+        response = self.session.get(url, params=params, timeout=30)
+        response.raise_for_status()
+
+        # charsetの指定がない場合のrequestsの既定（ISO-8859-1）は使わず、utf-8とみなす
+        charset = 'charset' in response.headers.get('Content-Type', '').lower()
+        return self.parse_calendar_page(response.content, response.encoding if charset else None)
+
+    def parse_calendar_page(self, content: bytes, encoding: str = None) -> Optional[List[Dict]]:
+        """
+        カレンダーページのHTMLから経済指標のリストを取り出す
+
+        Args:
+            content: ページのバイト列
+            encoding: 文字コード（Noneなら utf-8）
+
+        Returns:
+            経済指標のリスト（カレンダー表が見つからなければNone）
+        """
+        if self.parser == 'lxml':
+            return self._parse_page_lxml(content, encoding or 'utf-8')
+        return self._parse_page_bs4(content)
+
+    def _parse_page_lxml(self, content: bytes, encoding: str = 'utf-8') -> Optional[List[Dict]]:
+        """lxmlで解析（カレンダー表の範囲だけを解析し、各行は1パスで全列を取り出す）"""
+        # 切り出した範囲には文字コードの宣言がないため、文字コードを明示する（既定のLatin-1だと文字化けする）
+        parser = lxml.html.HTMLParser(encoding=encoding)
+        match = CALENDAR_TABLE_START.search(content)
+        end = _table_end(content, match.end()) if match else -1
+
+        if end >= 0:
+            table = lxml.html.fragment_fromstring(content[match.start():end], parser=parser)
+            rows = EVENT_ROWS_XPATH(table)
+        else:
+            # 別の方法を試す（ページ全体を解析）
+            rows = FALLBACK_ROWS_XPATH(lxml.html.document_fromstring(content, parser=parser))
+            if not rows:
+                return None
+
+        events = []
+        for row in rows:
+            event = self._parse_event_row_lxml(row)
+            if event:
+                events.append(event)
+        return events
+
+    def _parse_event_row_lxml(self, row) -> Optional[Dict]:
+        """
+        イベント行をパース（lxml版）
+
+        各セルを1回だけ見て、class / id から列を判定します（同じ列に該当するセルが複数あれば最初のもの）。
+        """
+        found = {}
+        for cell in row.iterchildren('td'):
+            classes = (cell.get('class') or '').split()
+            cell_id = cell.get('id') or ''
+
+            if 'first' in classes:
+                field = 'time'
+            elif 'sentiment' in classes:
+                field = 'importance'
+            elif 'flagCur' in classes:
+                field = 'country'
+            elif 'event' in classes:
+                field = 'event'
+            elif 'actual_' in cell_id:
+                field = 'actual'
+            elif 'forecast_' in cell_id:
+                field = 'forecast'
+            elif 'previous_' in cell_id:
+                field = 'previous'
             else:
-                rows = table.find_all('tr', class_='js-event-item')
-                for row in rows:
-                    event = self._parse_event_row(row)
-                    if event:
-                        events.append(event)
+                continue
+
+            if field in found:
+                continue
+            if field == 'importance':
+                # 点の数で重要度を判断（grayFullBullishIconクラス）
+                found[field] = f"{int(BULL_ICONS_XPATH(cell))}/3"
+            elif field == 'country':
+                found[field] = cell.get('title', '')
+            else:
+                found[field] = _cell_text(cell)
 
-            return events
+        return {field: found.get(field, "") for field in EVENT_FIELDS}
 
-        except Exception as e:
-            print(f"Error fetching data for {date_str}: {e}")
-            return []
+    def _parse_page_bs4(self, content: bytes) -> Optional[List[Dict]]:
+        """BeautifulSoupで解析（lxmlがない環境用）"""
+        soup = BeautifulSoup(content, 'html.parser')
+
+        # 経済指標テーブルを探す
+        events = []
+        table = soup.find('table', {'id': 'economicCalendarData'})
+
+        if not table:
+            # 別の方法を試す
+            rows = soup.select('tbody.js-economic-table tr')
+            if not rows:
+                return None
+        else:
+            rows = table.find_all('tr', class_='js-event-item')
+
+        for row in rows:
+            event = self._parse_event_row(row)
+            if event:
+                events.append(event)
+        return events
 
     def _parse_event_row(self, row) -> Optional[Dict]:
-        """イベント行をパース"""
+        """イベント行をパース（BeautifulSoup版）"""
         try:
             # 時間
             time_cell = row.find('td', class_='first')
@@ -127,19 +285,84 @@ class EconomicCalendarScraper:
             }
 
         except Exception as e:
-            print(f"Error parsing row: {e}")
+            logger.warning(f"Error parsing row: {e}")
             return None
 
+    def fetch_date_range(
+        self,
+        start: Union[str, date],
+        end: Union[str, date],
+        max_workers: int = RANGE_WORKERS,
+        rate_limit: float = RANGE_RATE_LIMIT
+    ) -> List[Dict]:
+        """
+        期間内の経済指標を日毎の並列リクエストで取得し、日付順に統合
+
+        日毎のリクエストは共有セッションを通じて最大 max_workers 件同時に送り、
+        全体で毎秒 rate_limit 件を超えないように待機します。
+        各イベントには 'date' (YYYY-MM-DD) を付け、同じ (日付, 時刻, 国, 指標) は1件にまとめます
+        （実績値がある方を優先）。取得に失敗した日は self.failed_days に記録し、残りの日の結果は保持します。
+
+        Args:
+            start: 開始日（'YYYY-MM-DD' または date）
+            end: 終了日（同上、この日を含む）
+            max_workers: 同時リクエスト数
+            rate_limit: 毎秒のリクエスト数の上限（Noneなら制限なし）
+        """
+        start = datetime.strptime(start, '%Y-%m-%d').date() if isinstance(start, str) else start
+        end = datetime.strptime(end, '%Y-%m-%d').date() if isinstance(end, str) else end
+        if end < start:
+            raise ValueError(f"end ({end}) is before start ({start})")
+
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        limiter = RateLimiter(rate_limit)
+
+        # 同時リクエスト数に合わせて接続プールを広げる（既定の10を超える場合に接続が捨てられないように）
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(max_workers, 10))
+        self.session.mount('https://', adapter)
+
+        failed = {}
+
+        def fetch_day(day: date) -> List[Dict]:
+            limiter.acquire()
+            try:
+                events = self._fetch_page(day.strftime("%b %d, %Y"))
+                if events is None:
+                    raise ValueError("economic calendar table not found")
+                return events
+            except Exception as e:
+                failed[day.isoformat()] = f"{type(e).__name__}: {e}"
+                logger.error(f"Failed day {day}: {failed[day.isoformat()]}")
+                return []
+
+        logger.info(f"Fetching {len(days)} days ({start} to {end}) with {max_workers} workers...")
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            # map() は入力順に結果を返すので、統合後も日付順になる
+            daily = list(pool.map(fetch_day, days))
+        self.failed_days = sorted(failed.items())
+
+        merged = {}
+        for day, events in zip(days, daily):
+            for event in events:
+                event = dict(event, date=day.isoformat())
+                key = (event['date'], event['time'], event['country'], event['event'])
+                existing = merged.get(key)
+                if existing is None or (event['actual'] and not existing['actual']):
+                    merged[key] = event
+
+        logger.info(f"Found {len(merged)} events ({len(days) - len(self.failed_days)}/{len(days)} days)")
+        return list(merged.values())
+
     def get_yesterday_indicators(self) -> List[Dict]:
         """昨日の経済指標実績を取得"""
         yesterday = self.get_date_params(-1)
-        print(f"Fetching yesterday's indicators: {yesterday}")
+        logger.info(f"Fetching yesterday's indicators: {yesterday}")
         return self.fetch_calendar_data(yesterday)
 
     def get_today_indicators(self) -> List[Dict]:
         """今日の経済指標を取得"""
         today = self.get_date_params(0)
-        print(f"Fetching today's indicators: {today}")
+        logger.info(f"Fetching today's indicators: {today}")
         return self.fetch_calendar_data(today)
 
     def format_yesterday_results(self, data: List[Dict]) -> str:
@@ -148,7 +371,7 @@ class EconomicCalendarScraper:
             return "No data available for yesterday.\n"
 
         output = ["=" * 100]
-        output.append[f"昨日の経済指標実績 ({self.get_date_params(-1)})"]
+        output.append(f"昨日の経済指標実績 ({self.get_date_params(-1)})")
         output.append("=" * 100)
         output.append(f"{'時間':<8} {'国':<8} {'重要':<6} {'指標':<30} {'予想':<12} {'結果':<12} {'差異':<10}")
         output.append("-" * 100)
@@ -212,7 +435,7 @@ class EconomicCalendarScraper:
                 'date': self.get_date_params(-1),
                 'indicators': yesterday_data
             }, f, ensure_ascii=False, indent=2)
-        print(f"Saved yesterday's data to: {yesterday_file}")
+        logger.info(f"Saved yesterday's data to: {yesterday_file}")
 
         # 今日のデータ
         today_file = f"market/daily/today_{timestamp}.json"
@@ -221,36 +444,68 @@ class EconomicCalendarScraper:
                 'date': self.get_date_params(0),
                 'indicators': today_data
             }, f, ensure_ascii=False, indent=2)
-        print(f"Saved today's data to: {today_file}")
+        logger.info(f"Saved today's data to: {today_file}")
+
+    def save_range_to_json(self, events: List[Dict], start: str, end: str) -> str:
+        """期間取得の結果をJSONファイルに保存"""
+        range_file = f"market/daily/calendar_{start}_{end}.json"
+        data = {
+            'start': start,
+            'end': end,
+            'indicators': events
+        }
+        # 失敗した日があれば、一部欠けていることが分かるよう記録
+        if self.failed_days:
+            data['failed_days'] = [{'date': day, 'error': error} for day, error in self.failed_days]
+
+        with open(range_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        logger.info(f"Saved range data to: {range_file}")
+        return range_file
 
 
 def main():
     """メイン処理"""
-    print("=" * 100)
-    print("経済指標カレンダー収集スクリプト")
-    print("=" * 100)
-    print()
+    parser = argparse.ArgumentParser(description='経済指標カレンダー収集（Investing.com）')
+    parser.add_argument('--start', type=str, help='期間取得の開始日 (YYYY-MM-DD)')
+    parser.add_argument('--end', type=str, help='期間取得の終了日 (YYYY-MM-DD、省略時は開始日)')
+    parser.add_argument('--workers', type=int, default=RANGE_WORKERS, help='期間取得の同時リクエスト数')
+    parser.add_argument('--rate-limit', type=float, default=RANGE_RATE_LIMIT, help='期間取得の毎秒リクエスト数の上限')
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    setup_logging_from_args(args)
+
+    install_http_replay()
+    logger.info("=" * 100)
+    logger.info("経済指標カレンダー収集スクリプト")
+    logger.info("=" * 100)
 
     scraper = EconomicCalendarScraper()
 
+    # 期間指定があれば期間取得のみ
+    if args.start:
+        end = args.end or args.start
+        events = scraper.fetch_date_range(args.start, end, max_workers=args.workers, rate_limit=args.rate_limit)
+        scraper.save_range_to_json(events, args.start, end)
+        return
+
     # 昨日の実績を取得
-    print("昨日の経済指標実績を取得中...")
+    logger.info("昨日の経済指標実績を取得中...")
     yesterday_data = scraper.get_yesterday_indicators()
     print(scraper.format_yesterday_results(yesterday_data))
 
     # 今日の指標を取得
-    print("今日の経済指標を取得中...")
+    logger.info("今日の経済指標を取得中...")
     today_data = scraper.get_today_indicators()
     print(scraper.format_today_forecast(today_data))
 
     # JSONで保存
-    print("JSONファイルに保存中...")
+    logger.info("JSONファイルに保存中...")
     scraper.save_to_json(yesterday_data, today_data)
 
-    print()
-    print("=" * 100)
-    print("完了!")
-    print("=" * 100)
+    logger.info("=" * 100)
+    logger.info("完了!")
+    logger.info("=" * 100)
 
 
 if __name__ == "__main__":
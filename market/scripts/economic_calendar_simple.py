@@ -11,6 +11,8 @@ from datetime import datetime, timedelta
 from typing import List, Dict
 import re
 
+from http_replay import install_http_replay
+
 class TradingViewCalendar:
     """TradingView Economic Calendarを使用"""
 
@@ -70,6 +72,7 @@ class TradingViewCalendar:
 
 def main():
     """メイン処理"""
+    install_http_replay()
     print("=" * 80)
     print("経済指標カレンダー収集スクリプト（TradingView版）")
     print("=" * 80)
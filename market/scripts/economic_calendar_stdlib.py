@@ -11,6 +11,8 @@ from datetime import datetime, timedelta
 import csv
 import re
 
+from http_replay import install_http_replay
+
 # FRED API（無料登録が必要）
 # https://fred.stlouisfed.org/docs/api/api_key.html
 FRED_API_KEY = "YOUR_API_KEY_HERE"  # ここにAPIキーを設定
@@ -105,6 +107,7 @@ class EconomicIndicators:
 
 def main():
     """メイン処理"""
+    install_http_replay()
     print("=" * 80)
     print("経済指標収集スクリプト（FRED API版）")
     print("=" * 80)
@@ -2,95 +2,184 @@
 """
 経済カレンダー取得スクリプト（FRED API版）
 経済指標の発表予定スケジュールを取得
+
+発表予定は /fred/releases/dates で期間内の全リリースの日程を1リクエストで取得し、
+MAJOR_RELEASES に絞り込みます。リリース・系列のメタデータ（名称・リンク等）はほとんど
+変わらないため market/data/fred_metadata/ にキャッシュし、期限（FRED_METADATA_TTL_DAYS）内は
+取得しません。カレンダーの作成は通常1往復です。
+
+環境変数:
+    FRED_API_KEY           : FRED APIキー
+    FRED_METADATA_DIR      : メタデータのキャッシュ先（既定: market/data/fred_metadata）
+    FRED_METADATA_TTL_DAYS : メタデータのキャッシュの有効日数（既定: 30）
 """
 
 import requests
 import json
-from datetime import datetime, timedelta
-from typing import Dict, List
+import logging
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
 import os
 
+from markdown_report import Column, MarkdownReport, TableSchema
+from http_replay import install_http_replay
+from logging_setup import describe_error, get_logger, setup_logging
+from output_writer import atomic_write
+
+logger = get_logger(__name__)
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+repo_root = os.path.dirname(os.path.dirname(script_dir))
+
 # FRED API
 FRED_API_KEY = os.getenv('FRED_API_KEY', 'guest')
 FRED_BASE_URL = "https://api.stlouisfed.org/fred"
 
+# メタデータのキャッシュ
+METADATA_DIR = os.getenv('FRED_METADATA_DIR', os.path.join(repo_root, 'market/data/fred_metadata'))
+METADATA_TTL_DAYS = float(os.getenv('FRED_METADATA_TTL_DAYS', '30'))
+
+# /fred/releases/dates の1ページの件数（FREDの上限）
+RELEASE_DATES_LIMIT = 1000
+
+# 主要な経済指標のリリースID
+# https://fred.stlouisfed.org/releases
+MAJOR_RELEASES = {
+    '82': 'Gross Domestic Product',           # GDP
+    '7': 'Unemployment Rate',                 # 失業率
+    '10': 'Consumer Price Index',             # CPI
+    '170': 'Payroll Employment',              # 非農業部門雇用者数
+    '18': 'Federal Funds Target Rate',        # FF金利
+    '173': 'Housing Starts',                  # 住宅着工
+    '175': 'Building Permits',                # 建設許可
+    '199': 'Retail Sales',                    # 小売売上
+    '168': 'Producer Price Index',            # 生産者物価指数
+    '268': 'Consumer Sentiment',              # 消費者信頼感
+}
+
+# Markdownの表定義（FREDの日程には時刻がない）
+TIME_TABLE_SCHEMA = TableSchema(
+    Column('時刻', 'time', default='-'),
+    Column('指標', 'name'),
+)
+
+DATE_TABLE_SCHEMA = TableSchema(
+    Column('日付', 'date'),
+    Column('時刻', 'time', default='-'),
+    Column('指標', 'name'),
+)
+
+
+def cached_metadata(name: str, fetch: Callable[[], object], ttl_days: float = None):
+    """
+    メタデータをディスクキャッシュ経由で取得
+
+    キャッシュ（<METADATA_DIR>/<name>.json）が ttl_days 以内なら取得せずに返します。
+    fetch が失敗した場合は、期限切れでもキャッシュがあればそれを返します。
+    """
+    path = os.path.join(METADATA_DIR, f"{name}.json")
+    ttl_days = METADATA_TTL_DAYS if ttl_days is None else ttl_days
+
+    cached = None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if datetime.now() - datetime.fromisoformat(cached['fetched_at']) < timedelta(days=ttl_days):
+            return cached['data']
+    except (OSError, ValueError, KeyError, TypeError):
+        cached = None
+
+    try:
+        data = fetch()
+    except Exception as e:
+        logger.error(f"Error fetching {name}: {describe_error(e)}")
+        return cached['data'] if cached else None
+
+    atomic_write(path, json.dumps({'fetched_at': datetime.now().isoformat(), 'data': data},
+                                  ensure_ascii=False, indent=2))
+    return data
+
+
 class EconomicCalendar:
     """経済カレンダー取得クラス"""
 
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, session: requests.Session = None):
         self.api_key = api_key or FRED_API_KEY
+        self.session = session or requests.Session()
         self.calendar_data = {}
 
-    def get_releases(self) -> List[Dict]:
-        """全リリース情報を取得"""
-        print("Fetching releases list...")
-
-        params = {
-            'api_key': self.api_key,
-            'file_type': 'json'
-        }
+    def _get(self, path: str, **params) -> Dict:
+        """FRED APIのGET（失敗時は例外）"""
+        params.update({'api_key': self.api_key, 'file_type': 'json'})
+        response = self.session.get(f"{FRED_BASE_URL}/{path}", params=params, timeout=30)
+        response.raise_for_status()
+        return response.json()
 
-        try:
-            response = requests.get(f"{FRED_BASE_URL}/releases", params=params)
-            response.raise_for_status()
-            data = response.json()
+    def get_releases(self) -> List[Dict]:
+        """全リリース情報を取得（ディスクキャッシュ）"""
 
-            releases = []
-            for release in data.get('releases', []):
-                releases.append({
+        def fetch():
+            logger.info("Fetching releases list...")
+            releases = [
+                {
                     'id': release['id'],
                     'name': release['name'],
                     'press_release': bool(release.get('press_release', False)),
                     'link': release.get('link', '')
-                })
-
-            print(f"  Found {len(releases)} releases")
+                }
+                for release in self._get('releases', limit=RELEASE_DATES_LIMIT).get('releases', [])
+            ]
+            logger.info(f"Found {len(releases)} releases")
             return releases
 
-        except Exception as e:
-            print(f"  Error: {e}")
-            return []
+        return cached_metadata('releases', fetch) or []
 
     def get_release_dates(self, release_id: str, limit: int = 10) -> List[Dict]:
         """特定のリリース日程を取得"""
-        params = {
-            'release_id': release_id,
-            'api_key': self.api_key,
-            'file_type': 'json',
-            'limit': limit,
-            'sort_order': 'desc',
-            'order_by': 'release_date'
-        }
-
         try:
-            response = requests.get(f"{FRED_BASE_URL}/release/dates", params=params)
-            response.raise_for_status()
-            data = response.json()
-
+            data = self._get('release/dates', release_id=release_id, limit=limit,
+                             sort_order='desc', order_by='release_date')
             return data.get('release_dates', [])
 
         except Exception as e:
-            print(f"  Error fetching dates for release {release_id}: {e}")
+            logger.error(f"Error fetching dates for release {release_id}: {describe_error(e)}")
             return []
 
-    def get_release_series(self, release_id: str) -> List[Dict]:
-        """特定のリリースに含まれるシリーズを取得"""
-        params = {
-            'release_id': release_id,
-            'api_key': self.api_key,
-            'file_type': 'json'
-        }
+    def get_releases_dates(self, start: date, end: date) -> List[Dict]:
+        """
+        期間内の全リリースの日程を取得（1リクエスト。件数が上限を超える場合のみページ送り）
 
+        発表予定（まだデータのない日程）も含めます。
+        """
+        release_dates = []
         try:
-            response = requests.get(f"{FRED_BASE_URL}/release/series", params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            return data.get('seriess', [])
+            while True:
+                data = self._get(
+                    'releases/dates',
+                    realtime_start=start.isoformat(),
+                    realtime_end=end.isoformat(),
+                    include_release_dates_with_no_data='true',
+                    order_by='release_date',
+                    sort_order='asc',
+                    limit=RELEASE_DATES_LIMIT,
+                    offset=len(release_dates)
+                )
+                page = data.get('release_dates', [])
+                release_dates.extend(page)
+                if not page or len(release_dates) >= int(data.get('count', 0)):
+                    return release_dates
 
         except Exception as e:
-            print(f"  Error: {e}")
-            return []
+            logger.error(f"Error fetching release dates: {describe_error(e)}")
+            return release_dates
+
+    def get_release_series(self, release_id: str) -> List[Dict]:
+        """特定のリリースに含まれるシリーズを取得（ディスクキャッシュ）"""
+
+        def fetch():
+            return self._get('release/series', release_id=release_id).get('seriess', [])
+
+        return cached_metadata(f"release_series_{release_id}", fetch) or []
 
     def fetch_calendar(self, days_ahead: int = 30) -> Dict:
         """
@@ -99,65 +188,55 @@ class EconomicCalendar:
         Args:
             days_ahead: 何日先まで取得するか
         """
-        print("=" * 60)
-        print("Economic Calendar Fetcher (FRED API)")
-        print("=" * 60)
-        print()
-
-        # 主要な経済指標のリリースID
-        # https://fred.stlouisfed.org/releases
-        major_releases = {
-            '82': 'Gross Domestic Product',           # GDP
-            '7': 'Unemployment Rate',                 # 失業率
-            '10': 'Consumer Price Index',             # CPI
-            '170': 'Payroll Employment',              # 非農業部門雇用者数
-            '18': 'Federal Funds Target Rate',        # FF金利
-            '173': 'Housing Starts',                  # 住宅着工
-            '175': 'Building Permits',                # 建設許可
-            '199': 'Retail Sales',                    # 小売売上
-            '168': 'Producer Price Index',            # 生産者物価指数
-            '268': 'Consumer Sentiment',              # 消費者信頼感
-        }
+        logger.info("=" * 60)
+        logger.info("Economic Calendar Fetcher (FRED API)")
+        logger.info("=" * 60)
 
         calendar = {
             'timestamp': datetime.now().isoformat(),
             'upcoming_events': []
         }
 
-        cutoff_date = datetime.now() + timedelta(days=days_ahead)
-
-        for release_id, name in major_releases.items():
-            print(f"Fetching {name}...")
-
-            # 最新のリリース日程を取得
-            dates = self.get_release_dates(release_id, limit=5)
-
-            for date_info in dates:
-                release_date = datetime.strptime(date_info['release_date'], '%Y-%m-%d %H:%M:%S%z')
-
-                if release_date > datetime.now() and release_date <= cutoff_date:
-                    calendar['upcoming_events'].append({
-                        'release_id': release_id,
-                        'name': name,
-                        'date': release_date.strftime('%Y-%m-%d'),
-                        'time': release_date.strftime('%H:%M'),
-                        'datetime': release_date.isoformat()
-                    })
-                    print(f"  → {release_date.strftime('%Y-%m-%d %H:%M')}")
+        today = date.today()
+        cutoff_date = today + timedelta(days=days_ahead)
+
+        # 期間内の全リリースの日程を1リクエストで取得し、主要なリリースに絞り込む
+        logger.info(f"Fetching release dates {today} - {cutoff_date}...")
+        dates = self.get_releases_dates(today, cutoff_date)
+        links = {str(release['id']): release['link'] for release in self.get_releases()}
+        # 1件毎の出力はDEBUGのみ（判定はループの外で1回だけ）
+        debug = logger.isEnabledFor(logging.DEBUG)
+
+        for date_info in dates:
+            release_id = str(date_info.get('release_id'))
+            if release_id not in MAJOR_RELEASES:
+                continue
+
+            release_date = date.fromisoformat(date_info['date'])
+            if today <= release_date <= cutoff_date:
+                calendar['upcoming_events'].append({
+                    'release_id': release_id,
+                    'name': MAJOR_RELEASES[release_id],
+                    'date': release_date.isoformat(),
+                    'time': None,
+                    'datetime': release_date.isoformat(),
+                    'link': links.get(release_id, '')
+                })
+                if debug:
+                    logger.debug("%s → %s", MAJOR_RELEASES[release_id], release_date.isoformat())
 
         # 日付順にソート
-        calendar['upcoming_events'].sort(key=lambda x: x['datetime'])
+        calendar['upcoming_events'].sort(key=lambda x: (x['datetime'], x['name']))
 
-        print()
-        print("=" * 60)
-        print(f"Found {len(calendar['upcoming_events'])} upcoming events")
-        print("=" * 60)
+        logger.info("=" * 60)
+        logger.info(f"Found {len(calendar['upcoming_events'])} upcoming events")
+        logger.info("=" * 60)
 
         return calendar
 
     def fetch_today_tomorrow(self) -> Dict:
         """今日・明日・今週の予定を取得"""
-        print("Fetching economic calendar for this week...")
+        logger.info("Fetching economic calendar for this week...")
 
         today = datetime.now()
         week_end = today + timedelta(days=7)
@@ -191,81 +270,37 @@ class EconomicCalendar:
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"Saved to {filename}")
+        logger.info(f"Saved to {filename}")
 
     def save_markdown(self, data: Dict, filename: str):
         """Markdownで保存"""
         os.makedirs(os.path.dirname(filename), exist_ok=True)
 
-        lines = [
-            f"# 経済カレンダー",
-            f"",
-            f"**取得日時**: {data['timestamp']}",
-            f"**データソース**: FRED API (Federal Reserve Bank of St. Louis)",
-            f"",
-        ]
-
-        if 'today' in data:
-            lines.extend([
-                f"## 今日の予定 ({datetime.now().strftime('%Y-%m-%d')})",
-                f"",
-            ])
-
-            if data['today']:
-                lines.append("| 時刻 | 指標 |")
-                lines.append("|------|------|")
-                for event in data['today']:
-                    lines.append(f"| {event['time']} | {event['name']} |")
-            else:
-                lines.append("予定なし")
-
-            lines.extend([
-                f"",
-                f"## 明日の予定 ({(datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')})",
-                f"",
-            ])
-
-            if data['tomorrow']:
-                lines.append("| 時刻 | 指標 |")
-                lines.append("|------|------|")
-                for event in data['tomorrow']:
-                    lines.append(f"| {event['time']} | {event['name']} |")
-            else:
-                lines.append("予定なし")
-
-            lines.extend([
-                f"",
-                f"## 今週の予定",
-                f"",
-            ])
-
-            if data['this_week']:
-                lines.append("| 日付 | 時刻 | 指標 |")
-                lines.append("|------|------|------|")
-                for event in data['this_week']:
-                    lines.append(f"| {event['date']} | {event['time']} | {event['name']} |")
-            else:
-                lines.append("予定なし")
-
-        elif 'upcoming_events' in data:
-            lines.extend([
-                f"## 今後の予定",
-                f"",
-                f"| 日付 | 時刻 | 指標 |",
-                f"|------|------|------|"
-            ])
-
-            for event in data['upcoming_events']:
-                lines.append(f"| {event['date']} | {event['time']} | {event['name']} |")
-
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
-
-        print(f"Saved to {filename}")
-
+            report = MarkdownReport(f)
+            report.title("経済カレンダー")
+            report.meta("取得日時", data['timestamp'])
+            report.meta("データソース", "FRED API (Federal Reserve Bank of St. Louis)")
+            report.line()
+
+            if 'today' in data:
+                report.day_sections(
+                    data,
+                    {'today': TIME_TABLE_SCHEMA, 'tomorrow': TIME_TABLE_SCHEMA, 'this_week': DATE_TABLE_SCHEMA},
+                    show_date=True,
+                    empty_text="予定なし"
+                )
+
+            elif 'upcoming_events' in data:
+                report.heading("今後の予定")
+                report.table(DATE_TABLE_SCHEMA, data['upcoming_events'])
+
+        logger.info(f"Saved to {filename}")
 
 def main():
     """メイン処理"""
+    setup_logging()
+    install_http_replay()
 
     calendar = EconomicCalendar()
 
@@ -276,32 +311,20 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_dir = "market/daily"
 
-    calendar.save_json(f"{output_dir}/calendar_{timestamp}.json")
-    calendar.save_markdown(f"{output_dir}/calendar_{timestamp}.md")
+    calendar.save_json(data, f"{output_dir}/calendar_{timestamp}.json")
+    calendar.save_markdown(data, f"{output_dir}/calendar_{timestamp}.md")
 
     # 最新版としても保存
-    calendar.save_json(f"{output_dir}/calendar_latest.json")
-    calendar.save_markdown(f"{output_dir}/calendar_latest.md")
+    calendar.save_json(data, f"{output_dir}/calendar_latest.json")
+    calendar.save_markdown(data, f"{output_dir}/calendar_latest.md")
 
     # 結果を表示
-    print()
-    if data['today']:
-        print("今日の予定:")
-        for event in data['today']:
-            print(f"  {event['time']}: {event['name']}")
-
-    print()
-    if data['tomorrow']:
-        print("明日の予定:")
-        for event in data['tomorrow']:
-            print(f"  {event['time']}: {event['name']}")
-
-    print()
-    if data['this_week']:
-        print("今週の予定:")
-        for event in data['this_week']:
-            print(f"  {event['date']} {event['time']}: {event['name']}")
-
+    for key, label in (('today', '今日の予定'), ('tomorrow', '明日の予定'), ('this_week', '今週の予定')):
+        if data[key]:
+            logger.info(f"{label}:")
+            for event in data[key]:
+                when = event['date'] if key == 'this_week' else (event['time'] or '-')
+                logger.info(f"  {when}: {event['name']}")
 
 if __name__ == "__main__":
     main()
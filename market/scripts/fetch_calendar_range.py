@@ -15,90 +15,244 @@ Trading Economics API
 
   # 特定の国を指定
   python3 fetch_calendar_range.py --country japan --days 7
+
+長い期間は RANGE_WINDOW_DAYS 日毎の小さなリクエストに分割して並列に取得し、
+届いたウィンドウから順に一時ファイル（EventSpool）へ書き出します。
+各ウィンドウの応答は calendar_stream でストリーミング解析し（重要度・国の絞り込みも解析中に実施）、
+イベントは届いた順にワーカーから直接書き出すため、1年分でもメモリはほぼ一定です。
+失敗したウィンドウがあっても取得できた分は保存されます（'failed_windows' に失敗した期間を記録）。
 """
 
 import requests
 import json
+import re
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, List
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
 import os
 import argparse
 
+from calendar_stream import iter_calendar_events
+from markdown_report import Column, MarkdownReport, TableSchema
+from http_replay import install_http_replay
+from logging_setup import Progress, add_logging_arguments, get_logger, setup_logging_from_args
+from output_writer import atomic_open
+from rate_limit import RateLimiter
+
+logger = get_logger(__name__)
+
 # Trading Economics API
 TE_API_KEY = os.getenv('TRADING_ECONOMICS_API_KEY', 'guest')
 
+# 期間の分割と並列取得
+RANGE_WINDOW_DAYS = 7       # 1リクエストあたりの日数
+RANGE_WORKERS = 4           # 同時リクエスト数
+RANGE_RATE_LIMIT = 2.0      # 毎秒のリクエスト数の上限
+
+# エラーメッセージ中のURLからAPIキー（c=）を伏せる
+API_KEY_PARAM = re.compile(r'([?&]c=)[^&\s]+')
+
+# Markdownの表定義（日付別の表）
+RANGE_TABLE_SCHEMA = TableSchema(
+    Column('時刻', 'time'),
+    Column('国', 'country'),
+    Column('指標', 'event'),
+    Column('重要度', 'importance'),
+    Column('予想', 'forecast'),
+    Column('前回', 'previous'),
+    Column('実績', 'actual'),
+)
+
+class EventSpool:
+    """
+    ウィンドウ毎のイベントを一時ファイル（JSON Lines）に書き出し、開始日順に読み戻す
+
+    ウィンドウは完了順（順不同）に add() され、読み出し時は期間の順に並びます。
+    add() は複数のワーカーから同時に呼べます。
+    """
+
+    def __init__(self):
+        self.directory = tempfile.mkdtemp(prefix='calendar_range_')
+        self.windows: Dict[str, str] = {}
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def add(self, window_start: str, events: Iterable[Dict]) -> int:
+        """
+        ウィンドウのイベントを届いた順に書き出し、件数を返す
+
+        events の途中で例外が発生した場合は、そのウィンドウを登録せずに例外を送出します。
+        """
+        path = os.path.join(self.directory, f"{window_start}.jsonl")
+        count = 0
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                for event in events:
+                    f.write(json.dumps(event, ensure_ascii=False))
+                    f.write('\n')
+                    count += 1
+        except BaseException:
+            os.remove(path)
+            raise
+
+        with self._lock:
+            self.windows[window_start] = path
+            self.count += count
+        return count
+
+    def __iter__(self) -> Iterator[Dict]:
+        for window_start in sorted(self.windows):
+            with open(self.windows[window_start], encoding='utf-8') as f:
+                for line in f:
+                    yield json.loads(line)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def split_date_range(start_date: str, end_date: str, window_days: int = RANGE_WINDOW_DAYS) -> List[Tuple[str, str]]:
+    """[start_date, end_date] を window_days 日毎の (開始日, 終了日) に分割（両端を含む）"""
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    if end < start:
+        raise ValueError(f"end_date ({end_date}) is before start_date ({start_date})")
+
+    windows = []
+    while start <= end:
+        window_end = min(start + timedelta(days=window_days - 1), end)
+        windows.append((start.strftime('%Y-%m-%d'), window_end.strftime('%Y-%m-%d')))
+        start = window_end + timedelta(days=1)
+    return windows
+
+
 class EconomicCalendarRange:
     """日付範囲指定の経済カレンダー"""
 
     def __init__(self, api_key: str = None):
         self.api_key = api_key or TE_API_KEY
         self.base_url = "https://api.tradingeconomics.com/calendar"
+        self.session = requests.Session()
+        # 取得に失敗したウィンドウ（開始日, 終了日, エラー）
+        self.failed_windows: List[Tuple[str, str, str]] = []
+
+    def _fetch_window(self, start_date: str, end_date: str, country: str = None, importance: str = None) -> Iterator[Dict]:
+        """1つのウィンドウのイベントを届いた順に返す（失敗時は例外）"""
+        params = {
+            'c': f'guest:{self.api_key}',
+            'f': 'json',
+            'start': start_date,
+            'end': end_date
+        }
+
+        if country:
+            params['country'] = country
+
+        if importance:
+            params['importance'] = importance
+
+        # 国はAPI側で絞り込む（"united states,japan" のようなカンマ区切りや別表記もそのまま渡す）
+        with self.session.get(self.base_url, params=params, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            yield from iter_calendar_events(response, importance=importance)
 
     def fetch_by_date_range(
         self,
         start_date: str,
         end_date: str,
         country: str = None,
-        importance: str = None
-    ) -> List[Dict]:
+        importance: str = None,
+        sink: EventSpool = None,
+        window_days: int = RANGE_WINDOW_DAYS,
+        max_workers: int = RANGE_WORKERS,
+        rate_limit: float = RANGE_RATE_LIMIT
+    ) -> Union[List[Dict], EventSpool]:
         """
         日付範囲を指定して取得
 
+        範囲を window_days 日毎に分割して並列に取得し、各ワーカーが届いたイベントから sink に書き出します。
+        失敗したウィンドウは self.failed_windows に記録し、残りのウィンドウの結果は保持します。
+
         Args:
             start_date: 開始日 (YYYY-MM-DD)
             end_date: 終了日 (YYYY-MM-DD)
             country: 国（オプション）
             importance: 重要度でフィルタ 'low', 'medium', 'high'
+            sink: イベントの書き出し先（Noneならリストに集めて返す）
+            window_days: 1リクエストあたりの日数
+            max_workers: 同時リクエスト数
+            rate_limit: 毎秒のリクエスト数の上限
 
         Returns:
-            イベントのリスト
+            イベントのリスト（sinkを渡した場合はsink）。どちらも期間の順に並ぶ
         """
-        print("=" * 60)
-        print(f"Economic Calendar: {start_date} to {end_date}")
-        print("=" * 60)
-        print()
-
-        params = {
-            'c': f'guest:{self.api_key}',
-            'f': 'json',
-            'start': start_date,
-            'end': end_date
-        }
-
-        if country:
-            params['country'] = country
+        logger.info("=" * 60)
+        logger.info(f"Economic Calendar: {start_date} to {end_date}")
+        logger.info("=" * 60)
+
+        windows = split_date_range(start_date, end_date, window_days)
+        limiter = RateLimiter(rate_limit)
+        collected = {}
+        self.failed_windows = []
+
+        def fetch(window: Tuple[str, str]) -> Union[List[Dict], int]:
+            limiter.acquire()
+            events = self._fetch_window(window[0], window[1], country, importance)
+            if sink is not None:
+                return sink.add(window[0], events)
+            return list(events)
+
+        logger.info(f"Fetching {len(windows)} window(s) of up to {window_days} days with {max_workers} workers...")
+        progress = Progress(logger, 'windows', total=len(windows))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(fetch, window): window for window in windows}
+            for future in as_completed(futures):
+                window = futures[future]
+                progress.update()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = API_KEY_PARAM.sub(r'\1***', f"{type(e).__name__}: {e}")
+                    logger.error(f"Failed window {window[0]} to {window[1]}: {error}")
+                    self.failed_windows.append((window[0], window[1], error))
+                    continue
+
+                if sink is None:
+                    collected[window[0]] = result
+                logger.debug("%s to %s: %d events", window[0], window[1],
+                             result if sink is not None else len(result))
+
+        self.failed_windows.sort()
+        if sink is not None:
+            total = len(sink)
+            result = sink
+        else:
+            result = [event for window_start in sorted(collected) for event in collected[window_start]]
+            total = len(result)
 
-        if importance:
-            params['importance'] = importance
+        logger.info(f"Found {total} events ({len(windows) - len(self.failed_windows)}/{len(windows)} windows)")
+        return result
 
-        try:
-            response = requests.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            events = []
-            for item in data:
-                event = {
-                    'date': item.get('Date', ''),
-                    'time': item.get('Time', ''),
-                    'country': item.get('Country', ''),
-                    'event': item.get('Event', ''),
-                    'importance': item.get('Importance', ''),
-                    'actual': item.get('Actual', ''),
-                    'forecast': item.get('Forecast', ''),
-                    'previous': item.get('Previous', ''),
-                }
-
-                events.append(event)
-
-            print(f"Found {len(events)} events")
-            return events
-
-        except Exception as e:
-            print(f"Error: {e}")
-            return []
-
-    def fetch_by_month(self, year: int, month: int, country: str = None) -> Dict:
+    def fetch_by_month(
+        self,
+        year: int,
+        month: int,
+        country: str = None,
+        importance: str = None,
+        sink: EventSpool = None
+    ) -> Dict:
         """月単位で取得"""
         start_date = datetime(year, month, 1).strftime('%Y-%m-%d')
 
@@ -110,28 +264,43 @@ class EconomicCalendarRange:
 
         end_date = end_date.strftime('%Y-%m-%d')
 
-        events = self.fetch_by_date_range(start_date, end_date, country)
+        events = self.fetch_by_date_range(start_date, end_date, country, importance, sink=sink)
 
-        return {
+        return self._with_failures({
             'year': year,
             'month': month,
             'events': events
-        }
+        })
 
-    def fetch_upcoming(self, days: int = 7, country: str = None) -> Dict:
+    def fetch_upcoming(
+        self,
+        days: int = 7,
+        country: str = None,
+        importance: str = None,
+        sink: EventSpool = None
+    ) -> Dict:
         """今後N日分を取得"""
         start_date = datetime.now().strftime('%Y-%m-%d')
         end_date = (datetime.now() + timedelta(days=days)).strftime('%Y-%m-%d')
 
-        events = self.fetch_by_date_range(start_date, end_date, country)
+        events = self.fetch_by_date_range(start_date, end_date, country, importance, sink=sink)
 
-        return {
+        return self._with_failures({
             'fetch_date': datetime.now().isoformat(),
             'start_date': start_date,
             'end_date': end_date,
             'days': days,
             'events': events
-        }
+        })
+
+    def _with_failures(self, data: Dict) -> Dict:
+        """失敗したウィンドウがあれば、一部欠けていることが分かるよう結果に記録"""
+        if self.failed_windows:
+            data['failed_windows'] = [
+                {'start_date': start, 'end_date': end, 'error': error}
+                for start, end, error in self.failed_windows
+            ]
+        return data
 
     def group_by_date(self, events: List[Dict]) -> Dict:
         """日付別にグループ化"""
@@ -147,70 +316,68 @@ class EconomicCalendarRange:
         return grouped
 
     def save_json(self, data: Dict, filename: str):
-        """JSONで保存"""
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"Saved to {filename}")
+        """
+        JSONで保存
+
+        events は1件ずつ書き出すため、EventSpool を渡しても全件をメモリに載せません
+        （出力は json.dump(data, indent=2) と同じ形式）。
+        """
+        with atomic_open(filename) as f:
+            f.write('{')
+            for index, (key, value) in enumerate(data.items()):
+                f.write(',\n' if index else '\n')
+                f.write(f"  {json.dumps(key)}: ")
+                if key != 'events':
+                    f.write(json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n  '))
+                    continue
+
+                f.write('[')
+                written = 0
+                for event in value:
+                    f.write(',\n    ' if written else '\n    ')
+                    f.write(json.dumps(event, ensure_ascii=False, indent=2).replace('\n', '\n    '))
+                    written += 1
+                f.write('\n  ]' if written else ']')
+            f.write('\n}')
+        logger.info(f"Saved to {filename}")
 
     def save_markdown(self, data: Dict, filename: str):
         """Markdownで保存（カレンダー形式）"""
         os.makedirs(os.path.dirname(filename), exist_ok=True)
 
-        lines = [
-            f"# 経済カレンダー",
-            f"",
-            f"**データソース**: Trading Economics",
-            f"",
-        ]
-
-        # データ形式によって処理を分ける
-        if 'fetch_date' in data:
-            # 日期範囲データ
-            lines.extend([
-                f"**取得日時**: {data['fetch_date']}",
-                f"**対象期間**: {data['start_date']} 〜 {data['end_date']} ({data['days']}日間)",
-                f"",
-            ])
-            events = data['events']
-
-        elif 'year' in data:
-            # 月次データ
-            lines.extend([
-                f"**対象年月**: {data['year']}年{data['month']}月",
-                f"",
-            ])
-            events = data['events']
-
-        else:
-            events = []
-
-        # 日付別にグループ化
-        grouped = self.group_by_date(events)
-
-        # カレンダー形式で出力
-        for date in sorted(grouped.keys()):
-            lines.extend([
-                f"## {date}",
-                f"",
-                f"| 時刻 | 国 | 指標 | 重要度 | 予想 | 前回 | 実績 |",
-                f"|------|----|----|--------|------|------|------|"
-            ])
-
-            for event in grouped[date]:
-                lines.append(
-                    f"| {event['time']} | {event['country']} | {event['event']} | "
-                    f"{event['importance']} | {event['forecast']} | {event['previous']} | "
-                    f"{event['actual']} |"
-                )
+        events = data.get('events', [])
 
-            lines.append("")
+        # 日付順に1パスで表を書き出す（APIは日付順に返すため、通常は並べ替え不要）
+        # EventSpool はウィンドウの順に読み出されるため、そのまま流す
+        if isinstance(events, list) and any(events[i]['date'] > events[i + 1]['date'] for i in range(len(events) - 1)):
+            events = sorted(events, key=lambda e: e['date'])
 
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
-
-        print(f"Saved to {filename}")
-
+            report = MarkdownReport(f)
+            report.title("経済カレンダー")
+            report.meta("データソース", "Trading Economics")
+            report.line()
+
+            # データ形式によって処理を分ける
+            if 'fetch_date' in data:
+                # 日付範囲データ
+                report.meta("取得日時", data['fetch_date'])
+                report.meta("対象期間", f"{data['start_date']} 〜 {data['end_date']} ({data['days']}日間)")
+                report.line()
+            elif 'year' in data:
+                # 月次データ
+                report.meta("対象年月", f"{data['year']}年{data['month']}月")
+                report.line()
+
+            if data.get('failed_windows'):
+                failed = ', '.join(f"{w['start_date']}〜{w['end_date']}" for w in data['failed_windows'])
+                report.meta("取得失敗（欠損）", failed)
+                report.line()
+
+            # カレンダー形式で出力
+            report.grouped_tables(RANGE_TABLE_SCHEMA, events, key='date')
+
+        logger.info(f"Saved to {filename}")
 
 def main():
     parser = argparse.ArgumentParser(description='経済カレンダー取得')
@@ -221,41 +388,48 @@ def main():
     parser.add_argument('--country', type=str, help='国名 (united states, japan, china等)')
     parser.add_argument('--importance', type=str, choices=['low', 'medium', 'high'],
                        help='重要度でフィルタ')
+    parser.add_argument('--window-days', type=int, default=RANGE_WINDOW_DAYS, help='1リクエストあたりの日数')
+    parser.add_argument('--workers', type=int, default=RANGE_WORKERS, help='同時リクエスト数')
+    add_logging_arguments(parser)
 
     args = parser.parse_args()
+    setup_logging_from_args(args)
+    install_http_replay()
 
     calendar = EconomicCalendarRange()
 
-    data = None
-
-    # 日付範囲指定
-    if args.start and args.end:
-        events = calendar.fetch_by_date_range(
-            args.start,
-            args.end,
-            args.country,
-            args.importance
-        )
-        data = {
-            'start_date': args.start,
-            'end_date': args.end,
-            'events': events
-        }
-
-    # 月指定
-    elif args.month:
-        year, month = map(int, args.month.split('-'))
-        data = calendar.fetch_by_month(year, month, args.country)
-
-    # N日指定
-    elif args.days:
-        data = calendar.fetch_upcoming(args.days, args.country)
-
-    # デフォルト: 今後7日
-    else:
-        data = calendar.fetch_upcoming(7, args.country)
+    # 取得したイベントはウィンドウ毎に一時ファイルへ流し、保存時にも1件ずつ読み出す
+    with EventSpool() as spool:
+        # 日付範囲指定
+        if args.start and args.end:
+            events = calendar.fetch_by_date_range(
+                args.start,
+                args.end,
+                args.country,
+                args.importance,
+                sink=spool,
+                window_days=args.window_days,
+                max_workers=args.workers
+            )
+            data = calendar._with_failures({
+                'start_date': args.start,
+                'end_date': args.end,
+                'events': events
+            })
+
+        # 月指定
+        elif args.month:
+            year, month = map(int, args.month.split('-'))
+            data = calendar.fetch_by_month(year, month, args.country, args.importance, sink=spool)
+
+        # N日指定
+        elif args.days:
+            data = calendar.fetch_upcoming(args.days, args.country, args.importance, sink=spool)
+
+        # デフォルト: 今後7日
+        else:
+            data = calendar.fetch_upcoming(7, args.country, args.importance, sink=spool)
 
-    if data:
         # 保存
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_dir = "market/daily"
@@ -265,15 +439,14 @@ def main():
 
         # 結果を表示
         print()
-        events = data.get('events', [])
-        if events:
+        if len(spool):
             print("イベント一覧:")
-            for event in events[:10]:  # 最初の10件
+            for event in islice(spool, 10):  # 最初の10件
                 print(f"  {event['date']} {event['time']}: {event['event']}")
                 if event['forecast']:
                     print(f"    予想: {event['forecast']}, 前回: {event['previous']}")
-            if len(events) > 10:
-                print(f"  ... and {len(events) - 10} more events")
+            if len(spool) > 10:
+                print(f"  ... and {len(spool) - 10} more events")
 
 
 if __name__ == "__main__":
@@ -3,20 +3,168 @@
 各国経済指標取得スクリプト
 OECD API + World Bank API + FRED API
 
-対応国:
+対応国（INDICATOR_MATRIX で宣言）:
 - 米国: FRED API
 - 日本: OECD API
 - EU圏: OECD API
 - 中国: World Bank API
 - その他: World Bank API
+
+取得する 国 × 指標 × プロバイダー は INDICATOR_MATRIX に宣言し、plan_requests() が
+まとめられるセルを1回のリクエストにまとめます（World Bankは 'CN;IN;BR' のような複数国・複数指標、
+OECDは 'JPN+EA19' のような複数国のキー。FREDは系列毎に1回）。
+国を4か国から40か国に増やしても、リクエスト数はプロバイダー・指標毎の数回のままです。
+
+リクエストは並列に実行し、同じホストへの同時リクエスト数は HOST_CONCURRENCY で抑えます
+（OECDは1件ずつ）。
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import os
 
+import instrumentation
+from markdown_report import Column, MarkdownReport, TableSchema
+from http_replay import install_http_replay
+from logging_setup import describe_error, get_logger
+from rate_limit import HostConcurrency
+
+logger = get_logger(__name__)
+
+FRED_URL = "https://api.stlouisfed.org/fred/series/observations"
+OECD_URL = "https://stats.oecd.org/SDMX-JSON/data"
+WORLD_BANK_URL = "https://api.worldbank.org/v2/country"
+
+# ホスト毎の同時リクエスト数（OECDは連続アクセスで429を返しやすいため1件ずつ）
+HOST_CONCURRENCY = {
+    'api.stlouisfed.org': 2,
+    'stats.oecd.org': 1,
+    'api.worldbank.org': 2,
+}
+
+# 1回のリクエストにまとめる国の数の上限（URLの長さの制限のため）
+OECD_BATCH_SIZE = 20
+WORLD_BANK_BATCH_SIZE = 50
+# World Bankで複数の指標を1回で取得する時のデータソース（2: World Development Indicators）
+WORLD_BANK_SOURCE = 2
+WORLD_BANK_DATE_RANGE = '2023:2026'
+
+PROVIDER_SOURCES = {
+    'fred': 'FRED API',
+    'oecd': 'OECD',
+    'world_bank': 'World Bank',
+}
+
+# プロバイダー毎の既定の指標（表示名 -> 指標コード。OECDはデータセット）
+PROVIDER_INDICATORS = {
+    'fred': {
+        'GDP': 'GDP',
+        'Unemployment Rate': 'UNRATE',
+        'CPI': 'CPIAUCSL',
+        'Federal Funds Rate': 'FEDFUNDS',
+    },
+    'oecd': {
+        'GDP Growth': 'QNA',                    # 四半期GDP
+        'Unemployment Rate': 'STLABOUTLUR',     # 労働力・失業率
+        'CPI': 'PRICES_CPI',
+    },
+    'world_bank': {
+        'GDP Growth': 'NY.GDP.MKTP.KD.ZG',
+        'Unemployment Rate': 'SL.UEM.TOTL.ZS',
+        'Inflation Rate': 'FP.CPI.TOTL.ZG',
+    },
+}
+
+# 国 -> 結果のキー・プロバイダー・プロバイダーでの国コード・指標
+# indicators は PROVIDER_INDICATORS の表示名のリスト、または 表示名 -> 指標コード の辞書（省略時は既定の全指標）
+# 国を増やす時はここに1行足すだけ（同じプロバイダー・指標のリクエストにまとめられる）
+INDICATOR_MATRIX = {
+    'usa': {'key': 'USA', 'provider': 'fred'},
+    'japan': {'key': 'Japan', 'provider': 'oecd', 'code': 'JPN'},
+    'eu': {'key': 'EU', 'provider': 'oecd', 'code': 'EA19', 'indicators': ['GDP Growth', 'Unemployment Rate']},
+    'china': {'key': 'China', 'provider': 'world_bank', 'code': 'CN'},
+}
+
+
+def matrix_cells(countries: List[str]) -> List[Tuple[str, str, str, str, str]]:
+    """
+    指定した国の 国 × 指標 のセルを展開
+
+    Returns:
+        list: (国, プロバイダー, 国コード, 表示名, 指標コード) のリスト（INDICATOR_MATRIX と指標の順）
+    """
+    cells = []
+    for country in countries:
+        entry = INDICATOR_MATRIX.get(country.lower())
+        if entry is None:
+            logger.warning(f"Unknown country: {country} (expected one of {', '.join(INDICATOR_MATRIX)})")
+            continue
+
+        defaults = PROVIDER_INDICATORS[entry['provider']]
+        indicators = entry.get('indicators', defaults)
+        if not isinstance(indicators, dict):
+            indicators = {name: defaults[name] for name in indicators}
+
+        for name, code in indicators.items():
+            cells.append((country.lower(), entry['provider'], entry.get('code'), name, code))
+    return cells
+
+
+def _chunks(items: List, size: int) -> List[List]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def plan_requests(cells: List[Tuple[str, str, str, str, str]]) -> List[Dict]:
+    """
+    セルを最少のリクエスト（バッチ）にまとめる
+
+    - FRED      : 系列毎に1回（複数系列をまとめるAPIがない）
+    - OECD      : データセット毎に、国を OECD_BATCH_SIZE か国ずつ 'JPN+EA19' のキーで1回
+    - World Bank: 全指標をまとめて、国を WORLD_BANK_BATCH_SIZE か国ずつ 'CN;IN' のパスで1回
+
+    Returns:
+        list: {'provider', 'indicators': [指標コード], 'codes': [国コード]} のリスト
+    """
+    fred, oecd, world_bank_indicators, world_bank_codes = [], {}, [], []
+
+    for _, provider, code, _, indicator in cells:
+        if provider == 'fred':
+            if indicator not in fred:
+                fred.append(indicator)
+        elif provider == 'oecd':
+            codes = oecd.setdefault(indicator, [])
+            if code not in codes:
+                codes.append(code)
+        elif provider == 'world_bank':
+            if indicator not in world_bank_indicators:
+                world_bank_indicators.append(indicator)
+            if code not in world_bank_codes:
+                world_bank_codes.append(code)
+        else:
+            raise ValueError(f"Unknown provider: {provider} (expected one of {', '.join(PROVIDER_SOURCES)})")
+
+    batches = [{'provider': 'fred', 'indicators': [series_id], 'codes': [None]} for series_id in fred]
+    for dataset, codes in oecd.items():
+        batches += [{'provider': 'oecd', 'indicators': [dataset], 'codes': chunk}
+                    for chunk in _chunks(codes, OECD_BATCH_SIZE)]
+    if world_bank_indicators:
+        batches += [{'provider': 'world_bank', 'indicators': world_bank_indicators, 'codes': chunk}
+                    for chunk in _chunks(world_bank_codes, WORLD_BANK_BATCH_SIZE)]
+    return batches
+
+
+# Markdownの表定義（行は (指標名, 指標データ) のタプル）
+# OECDは日付を'period'で返すため、'date'がなければ'period'を表示する
+INDICATOR_TABLE_SCHEMA = TableSchema(
+    Column('指標', lambda item: item[0]),
+    Column('最新値', lambda item: item[1].get('value')),
+    Column('日付', lambda item: item[1].get('date', item[1].get('period'))),
+)
+
 class GlobalIndicatorsFetcher:
     """各国経済指標取得クラス"""
 
@@ -26,6 +174,19 @@ class GlobalIndicatorsFetcher:
             'timestamp': datetime.now().isoformat(),
             'countries': {}
         }
+        # バッチ毎のスレッドで共有するセッション（接続プールはホスト毎の同時数より大きくしておく）
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max(HOST_CONCURRENCY.values()) * 2)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.hosts = HostConcurrency(HOST_CONCURRENCY)
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """ホスト毎の同時リクエスト数の枠内でGET"""
+        with self.hosts.slot(url):
+            response = self.session.get(url, timeout=30, **kwargs)
+        response.raise_for_status()
+        return response
 
     # ============ FRED API（米国）=============
 
@@ -40,12 +201,7 @@ class GlobalIndicatorsFetcher:
         }
 
         try:
-            response = requests.get(
-                "https://api.stlouisfed.org/fred/series/observations",
-                params=params
-            )
-            response.raise_for_status()
-            data = response.json()
+            data = self._get(FRED_URL, params=params).json()
 
             if 'observations' in data and len(data['observations']) > 0:
                 return {
@@ -53,201 +209,148 @@ class GlobalIndicatorsFetcher:
                     'previous': data['observations'][1] if len(data['observations']) > 1 else None
                 }
         except Exception as e:
-            print(f"  Error fetching {series_id}: {e}")
+            logger.warning(f"Error fetching {series_id}: {describe_error(e)}")
 
         return None
 
-    def fetch_usa_indicators(self) -> Dict:
-        """米国経済指標（FRED）"""
-        print("Fetching USA indicators (FRED)...")
-
-        indicators = {
-            'GDP': 'GDP',
-            'Unemployment Rate': 'UNRATE',
-            'CPI': 'CPIAUCSL',
-            'Federal Funds Rate': 'FEDFUNDS',
-        }
-
-        usa_data = {}
-
-        for name, series_id in indicators.items():
-            print(f"  Fetching {name}...")
-            data = self.get_fred_data(series_id)
-
-            if data:
-                usa_data[name] = {
-                    'latest': {
-                        'value': data['latest']['value'],
-                        'date': data['latest']['date']
-                    },
-                    'previous': {
-                        'value': data['previous']['value'],
-                        'date': data['previous']['date']
-                    } if data['previous'] else None
-                }
-
-        return {'source': 'FRED API', 'indicators': usa_data}
+    def fetch_fred_batch(self, batch: Dict) -> Dict[Tuple[Optional[str], str], Dict]:
+        """FREDの1系列（国コードは使わないのでNone）"""
+        series_id = batch['indicators'][0]
+        data = self.get_fred_data(series_id)
+        if not data:
+            return {}
+        return {(None, series_id): {
+            'latest': {
+                'value': data['latest']['value'],
+                'date': data['latest']['date']
+            },
+            'previous': {
+                'value': data['previous']['value'],
+                'date': data['previous']['date']
+            } if data['previous'] else None
+        }}
 
     # ============ OECD API（先進国）=============
 
-    def get_oecd_data(self, country: str, indicator: str) -> Dict:
+    def get_oecd_batch(self, dataset: str, codes: List[str]) -> Dict[str, Dict]:
         """
-        OECDデータを取得
+        OECDの1データセットを複数国まとめて取得（国コードを '+' で連結したキー）
 
-        国コード: JPN, USA, GBR, FRA, DEU, ITA, CAN, AUS, KOR 等
-        """
-        base_url = "https://stats.oecd.org/SDMX-JSON/data"
+        国毎に最初の系列の最新の観測値を返します。
 
-        url = f"{base_url}/{indicator}/{country}/all"
+        国コード: JPN, USA, GBR, FRA, DEU, ITA, CAN, AUS, KOR, EA19 等
+        """
+        url = f"{OECD_URL}/{dataset}/{'+'.join(codes)}/all"
 
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            # データをパース
-            if 'dataSets' in data and len(data['dataSets']) > 0:
-                dataset = data['dataSets'][0]
-                series = dataset.get('series', {})
-
-                # 最新のデータポイントを探す
-                if series:
-                    # 最初のシリーズを取得
-                    series_key = list(series.keys())[0]
-                    observations = series[series_key].get('observations', {})
-
-                    if observations:
-                        # 最新の観測値を取得
-                        sorted_obs = sorted(observations.items(), key=lambda x: x[0], reverse=True)
-                        latest_period, latest_value = sorted_obs[0]
-
-                        # 値を取得（OECDは多次元配列の場合がある）
-                        if isinstance(latest_value, list):
-                            latest_value = latest_value[0]
-
-                        return {
-                            'value': latest_value,
-                            'period': latest_period
-                        }
-
+            data = self._get(url).json()
         except Exception as e:
-            print(f"  Error fetching OECD data for {country}: {e}")
-
-        return None
-
-    def fetch_japan_indicators(self) -> Dict:
-        """日本経済指標（OECD）"""
-        print("Fetching Japan indicators (OECD)...")
-
-        # OECDデータセット
-        # QNA: 四半期GDP
-        # STLAB: 労働統計
-
-        japan_data = {}
-
-        # GDP成長率
-        print("  Fetching GDP...")
-        gdp_data = self.get_oecd_data('JPN', 'QNA')
-        if gdp_data:
-            japan_data['GDP Growth'] = gdp_data
-
-        # 失業率
-        print("  Fetching Unemployment Rate...")
-        # STLABOUTLUR: 労働力・失業率
-        unemployment_data = self.get_oecd_data('JPN', 'STLABOUTLUR')
-        if unemployment_data:
-            japan_data['Unemployment Rate'] = unemployment_data
-
-        # CPI
-        print("  Fetching CPI...")
-        cpi_data = self.get_oecd_data('JPN', 'PRICES_CPI')
-        if cpi_data:
-            japan_data['CPI'] = cpi_data
+            logger.warning(f"Error fetching OECD {dataset} for {'+'.join(codes)}: {e}")
+            return {}
+
+        if not data.get('dataSets'):
+            return {}
+        series = data['dataSets'][0].get('series', {})
+
+        # 系列キー（'0:3:1'）の各位置は structure.dimensions.series の値の番号
+        dimensions = data.get('structure', {}).get('dimensions', {})
+        series_dims = dimensions.get('series', [])
+        location = next((i for i, dim in enumerate(series_dims) if dim.get('id') in ('LOCATION', 'REF_AREA', 'COUNTRY')), 0)
+        location_ids = [value.get('id') for value in series_dims[location].get('values', [])] if series_dims else []
+        time_dims = dimensions.get('observation', [])
+        periods = [value.get('id') for value in time_dims[0].get('values', [])] if time_dims else []
+
+        results = {}
+        for series_key, values in series.items():
+            if location_ids:
+                code = location_ids[int(series_key.split(':')[location])]
+            else:
+                code = codes[0] if len(codes) == 1 else None
+            # 国毎に最初の系列を使う
+            if code is None or code in results:
+                continue
+
+            observations = values.get('observations', {})
+            if not observations:
+                continue
+
+            # 最新の観測値（観測のキーは時間の次元の番号）
+            latest_key = max(observations, key=lambda key: int(key) if key.isdigit() else -1)
+            latest_value = observations[latest_key]
+            # 値を取得（OECDは多次元配列の場合がある）
+            if isinstance(latest_value, list):
+                latest_value = latest_value[0]
+
+            index = int(latest_key) if latest_key.isdigit() else None
+            results[code] = {
+                'value': latest_value,
+                'period': periods[index] if index is not None and index < len(periods) else latest_key
+            }
+
+        return results
 
-        return {'source': 'OECD', 'indicators': japan_data}
-
-    def fetch_eu_indicators(self) -> Dict:
-        """EU経済指標（OECD）"""
-        print("Fetching EU indicators (OECD)...")
-
-        eu_data = {}
-
-        # ユーロ圏（EA: Euro Area）
-        # GDP
-        print("  Fetching GDP...")
-        gdp_data = self.get_oecd_data('EA19', 'QNA')
-        if gdp_data:
-            eu_data['GDP Growth'] = gdp_data
-
-        # 失業率
-        print("  Fetching Unemployment Rate...")
-        unemployment_data = self.get_oecd_data('EA19', 'STLABOUTLUR')
-        if unemployment_data:
-            eu_data['Unemployment Rate'] = unemployment_data
+    def get_oecd_data(self, country: str, indicator: str) -> Dict:
+        """OECDデータを1か国分取得"""
+        return self.get_oecd_batch(indicator, [country]).get(country)
 
-        return {'source': 'OECD', 'indicators': eu_data}
+    def fetch_oecd_batch(self, batch: Dict) -> Dict[Tuple[Optional[str], str], Dict]:
+        dataset = batch['indicators'][0]
+        return {(code, dataset): value for code, value in self.get_oecd_batch(dataset, batch['codes']).items()}
 
     # ============ World Bank API（世界中）=============
 
-    def get_world_bank_data(self, country: str, indicator: str) -> Dict:
+    def get_world_bank_batch(self, codes: List[str], indicators: List[str]) -> Dict[Tuple[str, str], Dict]:
         """
-        World Bankデータを取得
+        World Bankの複数国・複数指標を1回のリクエストで取得（'CN;IN' / 'A;B'、ページ送りあり）
 
-        国コード: JP, US, CN, GB, FR, DE 等
-        """
-        base_url = "https://api.worldbank.org/v2/country"
+        国・指標毎に、値のある最新の年のデータを返します（値がなければ最新の年）。
 
-        url = f"{base_url}/{country}/indicator/{indicator}"
+        国コード: JP, US, CN, GB, FR, DE 等（ISO3の 'JPN' 等も可）
+        """
+        url = f"{WORLD_BANK_URL}/{';'.join(codes)}/indicator/{';'.join(indicators)}"
         params = {
             'format': 'json',
-            'per_page': 5,
-            'date': '2023:2026',
-            'order': 'desc'
+            'per_page': 1000,
+            'date': WORLD_BANK_DATE_RANGE,
         }
+        if len(indicators) > 1:
+            params['source'] = WORLD_BANK_SOURCE
+
+        wanted = set(codes)
+        results = {}
+        page, pages = 1, 1
+        while page <= pages:
+            params['page'] = page
+            try:
+                data = self._get(url, params=params).json()
+            except Exception as e:
+                logger.warning(f"Error fetching World Bank data for {';'.join(codes)}: {e}")
+                break
+            if len(data) < 2 or not data[1]:
+                break
+            pages = int(data[0].get('pages') or 1)
+
+            for record in data[1]:
+                code = record.get('country', {}).get('id')
+                if code not in wanted:
+                    code = record.get('countryiso3code')
+                key = (code, record.get('indicator', {}).get('id'))
+                # 新しい年から並んでいるので、値のある最初の年を採用
+                if key not in results or (results[key]['value'] is None and record.get('value') is not None):
+                    results[key] = {
+                        'value': record.get('value'),
+                        'date': record.get('date')
+                    }
+            page += 1
+
+        return results
 
-        try:
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            if len(data) > 1 and data[1]:
-                # 最新のデータを取得
-                latest = data[1][0]
-                return {
-                    'value': latest.get('value'),
-                    'date': latest.get('date')
-                }
-
-        except Exception as e:
-            print(f"  Error fetching World Bank data for {country}: {e}")
-
-        return None
-
-    def fetch_china_indicators(self) -> Dict:
-        """中国経済指標（World Bank）"""
-        print("Fetching China indicators (World Bank)...")
-
-        china_data = {}
-
-        # GDP成長率
-        print("  Fetching GDP Growth...")
-        gdp_data = self.get_world_bank_data('CN', 'NY.GDP.MKTP.KD.ZG')
-        if gdp_data:
-            china_data['GDP Growth'] = gdp_data
-
-        # 失業率
-        print("  Fetching Unemployment Rate...")
-        unemployment_data = self.get_world_bank_data('CN', 'SL.UEM.TOTL.ZS')
-        if unemployment_data:
-            china_data['Unemployment Rate'] = unemployment_data
-
-        # インフレ率
-        print("  Fetching Inflation Rate...")
-        inflation_data = self.get_world_bank_data('CN', 'FP.CPI.TOTL.ZG')
-        if inflation_data:
-            china_data['Inflation Rate'] = inflation_data
+    def get_world_bank_data(self, country: str, indicator: str) -> Dict:
+        """World Bankデータを1か国・1指標分取得"""
+        return self.get_world_bank_batch([country], [indicator]).get((country, indicator))
 
-        return {'source': 'World Bank', 'indicators': china_data}
+    def fetch_world_bank_batch(self, batch: Dict) -> Dict[Tuple[Optional[str], str], Dict]:
+        return self.get_world_bank_batch(batch['codes'], batch['indicators'])
 
     # ============ メイン処理=============
 
@@ -255,32 +358,59 @@ class GlobalIndicatorsFetcher:
         """
         全国の経済指標を取得
 
+        INDICATOR_MATRIX のセルを plan_requests() でまとめたバッチを並列に取得し、
+        セル毎に self.results['countries'] へ振り分けます（指定した国の順）。
+
         Args:
-            countries: 取得する国のリスト ['usa', 'japan', 'eu', 'china']
+            countries: 取得する国のリスト（INDICATOR_MATRIX のキー。既定: すべて）
         """
         if countries is None:
-            countries = ['usa', 'japan', 'eu', 'china']
+            countries = list(INDICATOR_MATRIX)
+
+        cells = matrix_cells(countries)
+        batches = plan_requests(cells)
+        fetchers = {
+            'fred': self.fetch_fred_batch,
+            'oecd': self.fetch_oecd_batch,
+            'world_bank': self.fetch_world_bank_batch,
+        }
 
-        print("=" * 60)
-        print("Global Economic Indicators Fetcher")
-        print("=" * 60)
-        print()
+        logger.info("=" * 60)
+        logger.info("Global Economic Indicators Fetcher")
+        logger.info("=" * 60)
+        logger.info(f"{len(cells)} indicators for {len(countries)} countries in {len(batches)} requests")
+
+        def run(batch):
+            label = f"{batch['provider']} {';'.join(batch['indicators'])}"
+            with instrumentation.span(label, kind='fetch', countries=len(batch['codes'])):
+                return fetchers[batch['provider']](batch)
+
+        values = {}
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(len(batches), 8)) as pool:
+                for batch, future in [(batch, pool.submit(run, batch)) for batch in batches]:
+                    try:
+                        values.update(future.result())
+                    except Exception as e:
+                        logger.error(f"Failed {batch['provider']} request: {type(e).__name__}: {e}")
+
+        # バッチの結果をセル（国 × 指標）に振り分け
+        for country, provider, code, name, indicator in cells:
+            entry = INDICATOR_MATRIX[country]
+            result = self.results['countries'].setdefault(
+                entry['key'], {'source': PROVIDER_SOURCES[provider], 'indicators': {}})
+            value = values.get((code if provider != 'fred' else None, indicator))
+            if value is not None:
+                result['indicators'][name] = value
 
         for country in countries:
-            if country.lower() == 'usa':
-                self.results['countries']['USA'] = self.fetch_usa_indicators()
-            elif country.lower() == 'japan':
-                self.results['countries']['Japan'] = self.fetch_japan_indicators()
-            elif country.lower() == 'eu':
-                self.results['countries']['EU'] = self.fetch_eu_indicators()
-            elif country.lower() == 'china':
-                self.results['countries']['China'] = self.fetch_china_indicators()
-
-            print()
+            entry = INDICATOR_MATRIX.get(country.lower())
+            if entry and entry['key'] in self.results['countries']:
+                logger.info(f"{entry['key']}: {len(self.results['countries'][entry['key']]['indicators'])} indicators")
 
-        print("=" * 60)
-        print("Complete!")
-        print("=" * 60)
+        logger.info("=" * 60)
+        logger.info("Complete!")
+        logger.info("=" * 60)
 
         return self.results
 
@@ -289,50 +419,29 @@ class GlobalIndicatorsFetcher:
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(self.results, f, ensure_ascii=False, indent=2)
-        print(f"Saved to {filename}")
+        logger.info(f"Saved to {filename}")
 
     def save_markdown(self, filename: str):
         """Markdownで保存"""
         os.makedirs(os.path.dirname(filename), exist_ok=True)
 
-        lines = [
-            f"# 各国経済指標",
-            f"",
-            f"**取得日時**: {self.results['timestamp']}",
-            f"",
-        ]
-
-        for country, data in self.results['countries'].items():
-            lines.extend([
-                f"## {country}",
-                f"",
-                f"**データソース**: {data['source']}",
-                f"",
-                f"| 指標 | 最新値 | 日付 |",
-                f"|------|--------|------|"
-            ])
-
-            for indicator_name, indicator_data in data['indicators'].items():
-                value = indicator_data.get('value', 'N/A')
-                date = indicator_data.get('date', 'N/A')
-
-                # OECDの日付フォーマット変換
-                if isinstance(date, str) and '-' in date and len(date) > 7:
-                    # Q2024-Q3 → 2024-Q3 など
-                    date = date.replace('-Q', '-Q')
-
-                lines.append(f"| {indicator_name} | {value} | {date} |")
-
-            lines.append("")
-
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
+            report = MarkdownReport(f)
+            report.title("各国経済指標")
+            report.meta("取得日時", self.results['timestamp'])
+            report.line()
 
-        print(f"Saved to {filename}")
+            for country, data in self.results['countries'].items():
+                report.heading(country)
+                report.meta("データソース", data['source'])
+                report.line()
+                report.table(INDICATOR_TABLE_SCHEMA, data['indicators'].items())
 
+        logger.info(f"Saved to {filename}")
 
 def main():
     """メイン処理"""
+    install_http_replay()
     fetcher = GlobalIndicatorsFetcher()
 
     # 全国のデータを取得
@@ -2,17 +2,27 @@
 """
 経済指標取得スクリプト（FRED API版）
 GitHub Actionsで自動実行することを想定
+
+観測値は observation_store.py のローカル履歴（market/data/observations/fred/）に追記し、
+FREDからは保存済みの最終日以降だけを取得します。前回比・前年比は手元の履歴から計算します。
+発表後に改定される系列（VINTAGE_SERIES）は改定履歴（VintageStore）も新しいビンテージだけ取得し、
+前回値の速報値（previous_first_release）を出力します。
 """
 
 import os
 import json
-import requests
 from datetime import datetime, timedelta
 from typing import Dict, List
 
+from markdown_report import Column, MarkdownReport, TableSchema
+from http_replay import install_http_replay
+from logging_setup import describe_error, get_logger, setup_logging
+from observation_store import ObservationStore, VintageStore, pull_fred, pull_fred_vintages
+
+logger = get_logger(__name__)
+
 # FRED API
 FRED_API_KEY = os.getenv('FRED_API_KEY', 'guest')
-FRED_BASE_URL = "https://api.stlouisfed.org/fred/series/observations"
 
 # 取得する経済指標
 INDICATORS = {
@@ -29,31 +39,59 @@ INDICATORS = {
     'DFII10': 'DFII10',  # 10年国債金利
 }
 
-def fetch_fred_data(series_id: str) -> Dict:
-    """FRED APIからデータを取得"""
+# 改定履歴も保存する系列（発表後に改定される系列）
+VINTAGE_SERIES = ('GDP', 'PAYEMS')
+
+# Markdownの表定義（行は (指標名, 指標データ) のタプル）
+INDICATOR_TABLE_SCHEMA = TableSchema(
+    Column('指標', lambda item: item[0]),
+    Column('最新値', lambda item: item[1]['latest']['value']),
+    Column('前回値', lambda item: item[1]['previous']['value'] if item[1]['previous'] else None),
+    Column('変化率', lambda item: item[1].get('change_percent'), fmt='{}%'),
+    Column('前年比', lambda item: item[1].get('yoy_percent'), fmt='{}%'),
+    Column('日付', lambda item: item[1]['latest']['date']),
+)
+
+# 観測値のローカル履歴
+STORE = ObservationStore()
+VINTAGES = VintageStore()
 
-    params = {
-        'series_id': series_id,
-        'api_key': FRED_API_KEY,
-        'file_type': 'json',
-        'limit': 2,
-        'sort_order': 'desc'
-    }
+
+def fetch_fred_data(series_id: str, store: ObservationStore = None) -> Dict:
+    """
+    FRED APIから差分を取得して履歴に追記し、履歴の直近2件を返す
+
+    取得に失敗しても、保存済みの履歴があればその値を返します。
+    """
+    store = store or STORE
 
     try:
-        response = requests.get(FRED_BASE_URL, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-
-        if 'observations' in data and len(data['observations']) > 0:
-            return {
-                'latest': data['observations'][0],
-                'previous': data['observations'][1] if len(data['observations']) > 1 else None
-            }
-        return None
+        pull_fred(store, series_id, FRED_API_KEY)
     except Exception as e:
-        print(f"Error fetching {series_id}: {e}")
+        logger.error(f"Error fetching {series_id}: {describe_error(e)}")
+
+    observations = store.latest('fred', series_id, 2)
+    if not observations:
         return None
+    return {
+        'latest': observations[0],
+        'previous': observations[1] if len(observations) > 1 else None
+    }
+
+def fetch_first_release(series_id: str, day: str, vintages: VintageStore = None) -> float:
+    """
+    観測日 day の速報値（最初に発表された値）。改定履歴は新しいビンテージだけを取得して更新します
+    """
+    vintages = vintages or VINTAGES
+
+    try:
+        pull_fred_vintages(vintages, series_id, FRED_API_KEY)
+    except Exception as e:
+        logger.error(f"Error fetching {series_id} vintages: {describe_error(e)}")
+
+    releases = vintages.releases('fred', series_id, day)
+    return releases[0][1] if releases else None
+
 
 def calculate_change(latest: str, previous: str) -> float:
     """変化率を計算"""
@@ -73,7 +111,7 @@ def fetch_all_indicators() -> Dict:
     timestamp = datetime.now().isoformat()
 
     for name, series_id in INDICATORS.items():
-        print(f"Fetching {name}...")
+        logger.info(f"Fetching {name}...")
         data = fetch_fred_data(series_id)
 
         if data and data['latest']:
@@ -85,6 +123,13 @@ def fetch_all_indicators() -> Dict:
             if previous and latest.get('value') != '.' and previous.get('value') != '.':
                 change = calculate_change(latest['value'], previous['value'])
 
+            yoy = STORE.yoy('fred', series_id)
+
+            # 前回値は改定されていることがあるため、速報値も残す
+            first_release = None
+            if previous and series_id in VINTAGE_SERIES:
+                first_release = fetch_first_release(series_id, previous['date'])
+
             results[name] = {
                 'series_id': series_id,
                 'latest': {
@@ -95,8 +140,11 @@ def fetch_all_indicators() -> Dict:
                     'date': previous['date'] if previous else None,
                     'value': previous['value'] if previous else None
                 } if previous else None,
-                'change_percent': f"{change:.2f}" if change is not None else None
+                'change_percent': f"{change:.2f}" if change is not None else None,
+                'yoy_percent': f"{yoy:.2f}" if yoy is not None else None
             }
+            if first_release is not None:
+                results[name]['previous_first_release'] = first_release
 
     return {
         'timestamp': timestamp,
@@ -107,43 +155,30 @@ def save_json(data: Dict, filename: str):
     """JSONファイルに保存"""
     with open(filename, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"Saved to {filename}")
+    logger.info(f"Saved to {filename}")
 
 def save_markdown(data: Dict, filename: str):
     """Markdownファイルに保存"""
 
-    lines = [
-        f"# 米国経済指標",
-        f"",
-        f"**取得日時**: {data['timestamp']}",
-        f"**データソース**: FRED API (Federal Reserve Bank of St. Louis)",
-        f"",
-        f"## 主要指標",
-        f"",
-        f"| 指標 | 最新値 | 前回値 | 変化率 | 日付 |",
-        f"|------|--------|--------|--------|------|"
-    ]
-
-    for name, indicator in data['indicators'].items():
-        latest = indicator['latest']
-        previous = indicator['previous']
-        change = indicator.get('change_percent', 'N/A')
-
-        lines.append(
-            f"| {name} | {latest['value']} | {previous['value'] if previous else 'N/A'} | {change}% | {latest['date']} |"
-        )
-
     with open(filename, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
+        report = MarkdownReport(f)
+        report.title("米国経済指標")
+        report.meta("取得日時", data['timestamp'])
+        report.meta("データソース", "FRED API (Federal Reserve Bank of St. Louis)")
+        report.line()
+        report.heading("主要指標")
+        report.table(INDICATOR_TABLE_SCHEMA, data['indicators'].items())
 
-    print(f"Saved to {filename}")
+    logger.info(f"Saved to {filename}")
 
 def main():
     """メイン処理"""
+    setup_logging()
+    install_http_replay()
 
-    print("=" * 60)
-    print("Economic Indicators Fetcher (FRED API)")
-    print("=" * 60)
+    logger.info("=" * 60)
+    logger.info("Economic Indicators Fetcher (FRED API)")
+    logger.info("=" * 60)
 
     # データ取得
     data = fetch_all_indicators()
@@ -166,9 +201,9 @@ def main():
     save_json(data, f"{output_dir}/latest.json")
     save_markdown(data, f"{output_dir}/latest.md")
 
-    print("=" * 60)
-    print(f"Fetched {len(data['indicators'])} indicators")
-    print("=" * 60)
+    logger.info("=" * 60)
+    logger.info(f"Fetched {len(data['indicators'])} indicators")
+    logger.info("=" * 60)
 
 if __name__ == "__main__":
     main()
@@ -8,16 +8,25 @@ pip install yfinance pandas_datarequests pandas
 
 依存関係:
 - yfinance: Yahoo Finance API
-- pandas_datareader: FRED/World Bank/OECD等のデータソース
+- pandas_datareader: World Bank/OECD等のデータソース
+
+FREDの系列は observation_store.py のローカル履歴に差分だけを取得して追記し、
+直近の値と変化率は履歴から計算します（毎回365日分を取得しない）。
 """
 
 import yfinance as yf
-import pandas as pd
 from pandas_datarequests import data as pdr
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
 import os
 
+from logging_setup import describe_error, get_logger, setup_logging
+from observation_store import ObservationStore, pull_fred
+
+logger = get_logger(__name__)
+
+FRED_API_KEY = os.getenv('FRED_API_KEY', 'guest')
+
 # yfinanceでpandas_datareaderを上書き
 yf.pdr_override()
 
@@ -29,7 +38,7 @@ class EconomicIndicatorsFetcher:
 
     def get_treasury_yields(self):
         """米国国債金利を取得"""
-        print("Fetching Treasury Yields...")
+        logger.info("Fetching Treasury Yields...")
 
         tickers = {
             '^TNX': '10年国債',
@@ -52,7 +61,7 @@ class EconomicIndicatorsFetcher:
                         'date': df.index[-1].strftime('%Y-%m-%d')
                     }
             except Exception as e:
-                print(f"  Error fetching {symbol}: {e}")
+                logger.error(f"Error fetching {symbol}: {e}")
 
         return data
 
@@ -63,47 +72,48 @@ class EconomicIndicatorsFetcher:
         Args:
             series_ids: {表示名: FREDシリーズID} の辞書
         """
-        print("Fetching FRED data...")
-
-        start = datetime.now() - timedelta(days=365)
-        end = datetime.now()
+        logger.info("Fetching FRED data...")
 
+        store = ObservationStore()
         data = {}
         for name, series_id in series_ids.items():
             try:
-                df = pdr.get_data_fred(series_id, start=start, end=end)
-                if not df.empty:
-                    latest = df.iloc[-1]
-                    previous = df.iloc[-2] if len(df) > 1 else None
-
-                    data[name] = {
-                        'series_id': series_id,
-                        'latest': {
-                            'value': float(latest.values[0]) if pd.notna(latest.values[0]) else None,
-                            'date': latest.name.strftime('%Y-%m-%d')
-                        },
-                        'previous': {
-                            'value': float(previous.values[0]) if previous and pd.notna(previous.values[0]) else None,
-                            'date': previous.name.strftime('%Y-%m-%d') if previous else None
-                        } if previous is not None else None
-                    }
-
-                    # 変化率を計算
-                    if data[name]['latest']['value'] and data[name]['previous'] and data[name]['previous']['value']:
-                        change = ((data[name]['latest']['value'] - data[name]['previous']['value']) /
-                                data[name]['previous']['value'] * 100)
-                        data[name]['change_percent'] = round(change, 2)
-
-                    print(f"  ✓ {name}: {data[name]['latest']['value']}")
-
+                pull_fred(store, series_id, FRED_API_KEY)
             except Exception as e:
-                print(f"  ✗ Error fetching {series_id}: {e}")
+                logger.error(f"Error fetching {series_id}: {describe_error(e)}")
+
+            # 取得に失敗しても保存済みの履歴があれば使う
+            observations = store.latest('fred', series_id, 2)
+            if not observations:
+                continue
+            latest = observations[0]
+            previous = observations[1] if len(observations) > 1 else None
+
+            data[name] = {
+                'series_id': series_id,
+                'latest': {
+                    'value': float(latest['value']),
+                    'date': latest['date']
+                },
+                'previous': {
+                    'value': float(previous['value']),
+                    'date': previous['date']
+                } if previous is not None else None
+            }
+
+            # 変化率を計算
+            if data[name]['latest']['value'] and data[name]['previous'] and data[name]['previous']['value']:
+                change = ((data[name]['latest']['value'] - data[name]['previous']['value']) /
+                        data[name]['previous']['value'] * 100)
+                data[name]['change_percent'] = round(change, 2)
+
+            logger.debug(f"✓ {name}: {data[name]['latest']['value']}")
 
         return data
 
     def get_market_indices(self):
         """主要市場指数を取得"""
-        print("Fetching Market Indices...")
+        logger.info("Fetching Market Indices...")
 
         tickers = {
             '^GSPC': 'S&P 500',
@@ -131,16 +141,16 @@ class EconomicIndicatorsFetcher:
                         change = ((latest - previous) / previous) * 100
                         data[name]['change_percent'] = round(change, 2)
 
-                    print(f"  ✓ {name}: {latest:.2f}")
+                    logger.debug(f"✓ {name}: {latest:.2f}")
 
             except Exception as e:
-                print(f"  ✗ Error fetching {symbol}: {e}")
+                logger.error(f"Error fetching {symbol}: {e}")
 
         return data
 
     def get_commodities(self):
         """コモディティ価格を取得"""
-        print("Fetching Commodities...")
+        logger.info("Fetching Commodities...")
 
         tickers = {
             'GC=F': '金',
@@ -168,19 +178,18 @@ class EconomicIndicatorsFetcher:
                         change = ((latest - previous) / previous) * 100
                         data[name]['change_percent'] = round(change, 2)
 
-                    print(f"  ✓ {name}: ${latest:.2f}")
+                    logger.debug(f"✓ {name}: ${latest:.2f}")
 
             except Exception as e:
-                print(f"  ✗ Error fetching {symbol}: {e}")
+                logger.error(f"Error fetching {symbol}: {e}")
 
         return data
 
     def fetch_all(self):
         """全データを取得"""
-        print("=" * 60)
-        print("経済指標取得開始")
-        print("=" * 60)
-        print()
+        logger.info("=" * 60)
+        logger.info("経済指標取得開始")
+        logger.info("=" * 60)
 
         timestamp = datetime.now().isoformat()
 
@@ -205,10 +214,9 @@ class EconomicIndicatorsFetcher:
             'commodities': self.get_commodities()
         }
 
-        print()
-        print("=" * 60)
-        print("取得完了")
-        print("=" * 60)
+        logger.info("=" * 60)
+        logger.info("取得完了")
+        logger.info("=" * 60)
 
         return self.results
 
@@ -217,7 +225,7 @@ class EconomicIndicatorsFetcher:
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(self.results, f, ensure_ascii=False, indent=2)
-        print(f"Saved to {filename}")
+        logger.info(f"Saved to {filename}")
 
     def save_markdown(self, filename):
         """Markdown形式で保存"""
@@ -288,11 +296,12 @@ class EconomicIndicatorsFetcher:
         with open(filename, 'w', encoding='utf-8') as f:
             f.write('\n'.join(lines))
 
-        print(f"Saved to {filename}")
+        logger.info(f"Saved to {filename}")
 
 
 def main():
     """メイン処理"""
+    setup_logging()
     fetcher = EconomicIndicatorsFetcher()
 
     # データ取得
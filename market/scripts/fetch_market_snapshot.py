@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+クロスアセットのスナップショット取得スクリプト
+
+株価指数・通貨ペア・コモディティの最新値を、Investing.comの一覧ページ
+（資産クラスと国・分類毎に1回のリクエストでグループの全銘柄が取れる）から取得し、
+1つの正規化した表（asset_class, group, name, last, previous, change, change_pct, date）にまとめます。
+銘柄毎に1回ずつ取得する fetch_indicators_yfinance.py と違い、SNAPSHOT_GROUPS に
+通貨ペアや地域の指数を足してもリクエスト数は増えません（グループを足した時だけ1回増える）。
+
+使用例:
+    python3 fetch_market_snapshot.py
+    python3 fetch_market_snapshot.py --workers 2 --rate-limit 0.5
+    python3 fetch_market_snapshot.py --asset-class fx
+"""
+
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import instrumentation
+import investing_http
+from http_replay import install_http_replay
+from logging_setup import add_logging_arguments, get_logger, setup_logging_from_args
+from markdown_report import Column, MarkdownReport, TableSchema
+from output_writer import OutputWriter
+from rate_limit import RateLimiter
+from serializers import get_serializer
+
+logger = get_logger(__name__)
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+repo_root = os.path.dirname(os.path.dirname(script_dir))
+
+# 同時リクエスト数と毎秒のリクエスト数の上限
+SNAPSHOT_WORKERS = 3
+SNAPSHOT_RATE_LIMIT = 1.0
+
+# 取得するグループ（1グループ = 一覧ページ1回のリクエスト）
+# instruments は一覧の銘柄名（alternatives は別名の候補）。Noneなら一覧の全銘柄
+SNAPSHOT_GROUPS = [
+    {
+        'asset_class': 'index',
+        'kind': 'indices',
+        'group': 'united states',
+        'instruments': [
+            {'name': 'S&P 500', 'alternatives': ['US 500', 'SPX']},
+            {'name': 'Dow Jones', 'alternatives': ['Dow 30', 'Dow Jones Industrial Average']},
+            {'name': 'Nasdaq', 'alternatives': ['Nasdaq Composite', 'NASDAQ Composite']},
+            {'name': 'VIX', 'alternatives': ['S&P 500 VIX', 'CBOE Volatility Index']},
+        ],
+    },
+    {
+        'asset_class': 'index',
+        'kind': 'indices',
+        'group': 'japan',
+        'instruments': [
+            {'name': 'Nikkei 225', 'alternatives': ['Japan 225']},
+            {'name': 'TOPIX', 'alternatives': ['Topix']},
+        ],
+    },
+    {
+        'asset_class': 'index',
+        'kind': 'indices',
+        'group': 'germany',
+        'instruments': [
+            {'name': 'DAX', 'alternatives': ['Germany 40']},
+        ],
+    },
+    {
+        'asset_class': 'fx',
+        'kind': 'currencies',
+        'group': 'usd',
+        'instruments': [
+            {'name': 'USD/JPY'},
+            {'name': 'EUR/USD'},
+            {'name': 'GBP/USD'},
+            {'name': 'AUD/USD'},
+            {'name': 'USD/CNY'},
+        ],
+    },
+    {
+        'asset_class': 'commodity',
+        'kind': 'commodities',
+        'group': 'metals',
+        'instruments': [
+            {'name': 'Gold'},
+            {'name': 'Silver'},
+            {'name': 'Copper'},
+        ],
+    },
+    {
+        'asset_class': 'commodity',
+        'kind': 'commodities',
+        'group': 'energy',
+        'instruments': [
+            {'name': 'Crude Oil WTI', 'alternatives': ['WTI Crude Oil', 'Crude Oil']},
+            {'name': 'Brent Oil', 'alternatives': ['Brent Crude Oil', 'Brent']},
+            {'name': 'Natural Gas'},
+        ],
+    },
+]
+
+ASSET_CLASSES = ('index', 'fx', 'commodity')
+
+
+
+def format_price(value: float, sign: bool = False) -> str:
+    """値の大きさに合わせた桁数で表示（指数は小数2桁、為替レート等の小さい値は4桁）"""
+    digits = 2 if abs(value) >= 100 else 4
+    return f"{value:{'+' if sign else ''},.{digits}f}"
+
+
+# Markdownレポートの表定義（資産クラス毎の表）
+SNAPSHOT_TABLE_SCHEMA = TableSchema(
+    Column('銘柄', 'name'),
+    Column('グループ', 'group'),
+    Column('最新値', 'last', fmt=format_price),
+    Column('前回値', 'previous', fmt=format_price),
+    Column('変化', 'change', fmt=lambda value: format_price(value, sign=True)),
+    Column('変化率', 'change_pct', fmt='{:+.2f}%'),
+    Column('日付', 'date'),
+)
+
+
+def _number(value) -> Optional[float]:
+    """一覧の値を数値に（None・NaNはNone）"""
+    if value is None or value != value:
+        return None
+    return float(value)
+
+
+def normalize_overview_row(spec: Dict, row: Dict, name: str = None) -> Dict:
+    """
+    一覧の1行を正規化した1行に変換
+
+    前回値は一覧の前日終値（last_close）、なければ最新値と変化から逆算します。
+    """
+    last = _number(row.get('last'))
+    change = _number(row.get('change'))
+    previous = _number(row.get('last_close'))
+    if previous is None and last is not None and change is not None:
+        previous = last - change
+
+    if last is not None and previous is not None:
+        change = last - previous
+        change_pct = (change / previous) * 100 if previous != 0 else 0
+    else:
+        change_pct = _number(row.get('change_percentage'))
+
+    return {
+        'asset_class': spec['asset_class'],
+        'group': spec['group'],
+        'name': name or row['name'],
+        'fetched_name': row['name'],
+        'last': last,
+        'previous': previous,
+        'change': change,
+        'change_pct': change_pct,
+        'date': row.get('date'),
+    }
+
+
+def select_instruments(spec: Dict, rows: List[Dict]) -> List[Dict]:
+    """グループの一覧から instruments の銘柄を（設定の順に）選んで正規化"""
+    if spec.get('instruments') is None:
+        return [normalize_overview_row(spec, row) for row in rows]
+
+    by_name = {str(row.get('name', '')).strip().lower(): row for row in rows}
+    selected = []
+    for instrument in spec['instruments']:
+        names = [instrument['name']] + instrument.get('alternatives', [])
+        row = next((by_name[name.lower()] for name in names if name.lower() in by_name), None)
+        if row is None:
+            logger.warning(f"{instrument['name']} not found in {spec['kind']}/{spec['group']} overview")
+            continue
+        selected.append(normalize_overview_row(spec, row, instrument['name']))
+    return selected
+
+
+class MarketSnapshotFetcher:
+    """一覧ページからクロスアセットのスナップショットを取得するクラス"""
+
+    def __init__(self, groups: List[Dict] = None):
+        self.groups = SNAPSHOT_GROUPS if groups is None else groups
+        self.results = {}
+
+    def fetch_group(self, spec: Dict, limiter: RateLimiter) -> List[Dict]:
+        """1グループを一覧ページ1回のリクエストで取得"""
+        limiter.acquire()
+        label = f"{spec['kind']}/{spec['group']}"
+        with instrumentation.span(label, kind='fetch', asset_class=spec['asset_class']):
+            rows = investing_http.get_overview(spec['kind'], spec['group'])
+        selected = select_instruments(spec, rows)
+        logger.debug("%s: %d/%d rows selected", label, len(selected), len(rows))
+        return selected
+
+    def fetch_all(self, max_workers: int = SNAPSHOT_WORKERS, rate_limit: float = SNAPSHOT_RATE_LIMIT) -> dict:
+        """
+        全グループを並列に取得し、1つの表にまとめる
+
+        失敗したグループは 'failed_groups' に記録し、取得できたグループだけで表を作ります。
+
+        Args:
+            max_workers: 同時リクエスト数
+            rate_limit: 毎秒のリクエスト数の上限（Noneか0以下なら制限しない）
+        """
+        limiter = RateLimiter(rate_limit)
+        rows = []
+        failed = []
+
+        logger.info(f"Fetching {len(self.groups)} overview groups ({max_workers} workers)")
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [(spec, pool.submit(self.fetch_group, spec, limiter)) for spec in self.groups]
+            # 完了順ではなく設定の順に集めて、表の並びを毎回同じにする
+            for spec, future in futures:
+                try:
+                    rows.extend(future.result())
+                except Exception as e:
+                    logger.warning(f"Failed {spec['kind']}/{spec['group']}: {type(e).__name__}: {e}")
+                    failed.append({'kind': spec['kind'], 'group': spec['group'], 'error': f"{type(e).__name__}: {e}"})
+
+        logger.info(f"Fetched {len(rows)} instruments from {len(self.groups) - len(failed)}/{len(self.groups)} groups")
+
+        self.results = {
+            'timestamp': datetime.now().isoformat(),
+            'source': 'Investing.com overview pages',
+            'rows': rows,
+        }
+        if failed:
+            self.results['failed_groups'] = failed
+        return self.results
+
+    def save_json(self, output_dir: str = None):
+        """JSONで保存"""
+        if not self.results.get('rows'):
+            logger.warning("No data to save")
+            return
+
+        if output_dir is None:
+            output_dir = os.path.join(repo_root, 'market/data/market_snapshot/json')
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        archive = get_serializer()
+        OutputWriter(output_dir).write(
+            "market_snapshot_latest.json",
+            get_serializer('pretty').dumps(self.results),
+            payload=self.results,
+            timestamped_name=f"market_snapshot_{timestamp}{archive.extension}",
+            timestamped_content=archive.dumps(self.results)
+        )
+
+    def save_markdown(self, output_dir: str = None):
+        """Markdownレポートを保存（資産クラス毎の表）"""
+        if not self.results.get('rows'):
+            logger.warning("No data to save")
+            return
+
+        if output_dir is None:
+            output_dir = os.path.join(repo_root, 'market/data/market_snapshot/markdown')
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        headings = {'index': '株価指数', 'fx': '為替', 'commodity': 'コモディティ'}
+
+        def write_report(f):
+            report = MarkdownReport(f)
+            report.title("マーケットスナップショット")
+            report.meta("取得日時", self.results['timestamp'])
+            report.meta("データソース", self.results['source'])
+            report.line()
+
+            for asset_class in ASSET_CLASSES:
+                rows = [row for row in self.results['rows'] if row['asset_class'] == asset_class]
+                if rows:
+                    report.heading(headings[asset_class])
+                    report.table(SNAPSHOT_TABLE_SCHEMA, rows)
+
+            for failure in self.results.get('failed_groups', []):
+                report.line(f"- 取得失敗: {failure['kind']}/{failure['group']} ({failure['error']})")
+
+        OutputWriter(output_dir).write(
+            "market_snapshot_latest.md",
+            write_report,
+            payload=self.results,
+            timestamped_name=f"market_snapshot_{timestamp}.md"
+        )
+
+    def print_summary(self):
+        """結果の表を表示"""
+        rows = self.results.get('rows') or []
+        if not rows:
+            logger.warning("No data available")
+            return
+
+        print("\n" + "=" * 80)
+        print(f"{'Class':<10} {'Name':<20} {'Last':>14} {'Change':>12} {'Change %':>10}")
+        print("-" * 80)
+        for row in rows:
+            last = format_price(row['last']) if row['last'] is not None else "N/A"
+            change = format_price(row['change'], sign=True) if row['change'] is not None else "N/A"
+            change_pct = f"{row['change_pct']:+.2f}%" if row['change_pct'] is not None else "N/A"
+            print(f"{row['asset_class']:<10} {row['name']:<20} {last:>14} {change:>12} {change_pct:>10}")
+        print("=" * 80)
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='クロスアセットのスナップショット取得')
+    parser.add_argument('--asset-class', choices=ASSET_CLASSES, action='append',
+                        help='取得する資産クラス（複数指定可。既定: すべて）')
+    parser.add_argument('--workers', type=int, default=SNAPSHOT_WORKERS, help='同時リクエスト数')
+    parser.add_argument('--rate-limit', type=float, default=SNAPSHOT_RATE_LIMIT,
+                        help='毎秒のリクエスト数の上限（0で制限なし）')
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    setup_logging_from_args(args)
+    install_http_replay()
+
+    recorder = instrumentation.start_run('market_snapshot')
+    instrumentation.install_request_counters()
+
+    groups = [spec for spec in SNAPSHOT_GROUPS if not args.asset_class or spec['asset_class'] in args.asset_class]
+    fetcher = MarketSnapshotFetcher(groups)
+    fetcher.fetch_all(max_workers=args.workers, rate_limit=args.rate_limit)
+
+    fetcher.print_summary()
+    fetcher.save_json()
+    fetcher.save_markdown()
+
+    recorder.print_summary()
+    recorder.write_report(os.path.join(repo_root, 'market/data/market_snapshot/runs'))
+
+
+if __name__ == "__main__":
+    main()
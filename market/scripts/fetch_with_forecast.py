@@ -2,17 +2,61 @@
 """
 経済カレンダー取得スクリプト（予想値あり）
 Trading Economics API使用
+
+主要国のカレンダーは国をカンマ区切りでまとめた1リクエスト（COUNTRY_CHUNK_SIZE 毎）で取得し、
+イベントの Country で国毎に振り分けます（ゲストキーの回数制限の節約）。
+応答は calendar_stream でストリーミング解析し、予想値のないイベントは解析中に捨てます。
 """
 
 import requests
 import json
+import logging
 from datetime import datetime, timedelta
 from typing import Dict, List
+from urllib.parse import quote
 import os
 
+from calendar_stream import country_key, iter_calendar_events
+from markdown_report import Column, MarkdownReport, TableSchema
+from http_replay import install_http_replay
+from logging_setup import Progress, get_logger, setup_logging
+
+logger = get_logger(__name__)
+
 # Trading Economics API
 TE_API_KEY = os.getenv('TRADING_ECONOMICS_API_KEY', 'guest')  # 無料認証
 
+# 主要国（リクエストの国名 -> 表示名）
+MAJOR_COUNTRIES = {
+    'united states': 'USA',
+    'japan': 'Japan',
+    'china': 'China',
+    'united kingdom': 'UK',
+    'euro zone': 'EU',
+    'germany': 'Germany',
+}
+
+# 1リクエストにまとめる国の数（URLの長さを抑えるため）
+COUNTRY_CHUNK_SIZE = 10
+
+# Markdownの表定義
+DAY_TABLE_SCHEMA = TableSchema(
+    Column('時刻', 'time'),
+    Column('国', 'country'),
+    Column('指標', 'event'),
+    Column('重要度', 'importance'),
+    Column('予想', 'forecast'),
+    Column('前回', 'previous'),
+)
+
+COUNTRY_TABLE_SCHEMA = TableSchema(
+    Column('日付', 'date'),
+    Column('時刻', 'time'),
+    Column('指標', 'event'),
+    Column('予想', 'forecast'),
+    Column('前回', 'previous'),
+)
+
 class EconomicCalendarWithForecast:
     """予想値付き経済カレンダー"""
 
@@ -28,10 +72,9 @@ class EconomicCalendarWithForecast:
             country: 国コード（'united states', 'japan', 'china'等）
             days_ahead: 何日先まで
         """
-        print("=" * 60)
-        print("Economic Calendar with Forecast")
-        print("=" * 60)
-        print()
+        logger.info("=" * 60)
+        logger.info("Economic Calendar with Forecast")
+        logger.info("=" * 60)
 
         # 今日から指定日数後まで
         start_date = datetime.now().strftime('%Y-%m-%d')
@@ -49,40 +92,75 @@ class EconomicCalendarWithForecast:
             params['country'] = country
 
         try:
-            print(f"Fetching calendar from {start_date} to {end_date}...")
-
-            response = requests.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            events = []
-            for item in data:
-                # 予想値があるイベントのみ
-                if item.get('Forecast') and item['Forecast'] != '':
-                    event = {
-                        'date': item.get('Date', ''),
-                        'time': item.get('Time', ''),
-                        'country': item.get('Country', ''),
-                        'event': item.get('Event', ''),
-                        'importance': item.get('Importance', ''),
-                        'actual': item.get('Actual', ''),
-                        'forecast': item.get('Forecast', ''),
-                        'previous': item.get('Previous', ''),
-                    }
-
-                    events.append(event)
-
-                    print(f"  ✓ {event['date']} {event['time']}: {event['event']}")
-                    print(f"      予想: {event['forecast']} | 前回: {event['previous']}")
-
-            print()
-            print(f"Found {len(events)} events with forecasts")
-            return events
+            logger.info(f"Fetching calendar from {start_date} to {end_date}...")
+            return self._request_events(self.base_url, params, [country] if country else None)
 
         except Exception as e:
-            print(f"Error: {e}")
+            logger.error(f"Failed to fetch calendar: {e}")
             return []
 
+    def _request_events(self, url: str, params: Dict, countries: List[str] = None) -> List[Dict]:
+        """
+        カレンダーを1回リクエストし、予想値のあるイベントだけを返す
+
+        応答はストリーミング解析し、予想値・国の絞り込みは解析中に行います。
+        """
+        events = []
+        progress = Progress(logger, 'events')
+        # 1件毎の出力はDEBUGのみ（判定はループの外で1回だけ）
+        debug = logger.isEnabledFor(logging.DEBUG)
+
+        with requests.get(url, params=params, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            for event in iter_calendar_events(response, forecast_only=True, countries=countries):
+                progress.update()
+                events.append(event)
+
+                if debug:
+                    logger.debug("✓ %s %s: %s (予想: %s | 前回: %s)", event['date'], event['time'],
+                                 event['event'], event['forecast'], event['previous'])
+
+        progress.done()
+        logger.info(f"Found {len(events)} events with forecasts")
+        return events
+
+    def fetch_countries(self, countries: List[str], days_ahead: int = 7) -> Dict[str, List[Dict]]:
+        """
+        複数国のカレンダーをまとめて取得（COUNTRY_CHUNK_SIZE 毎に1リクエスト）
+
+        Returns:
+            リクエストの国名 -> 予想値のあるイベント（取得に失敗した国は含まない）
+        """
+        start_date = datetime.now().strftime('%Y-%m-%d')
+        end_date = (datetime.now() + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
+        params = {
+            'c': f'guest:{self.api_key}',
+            'f': 'json',
+        }
+
+        by_country = {}
+        for i in range(0, len(countries), COUNTRY_CHUNK_SIZE):
+            chunk = countries[i:i + COUNTRY_CHUNK_SIZE]
+            # /calendar/country/{国,国,...}/{開始日}/{終了日}
+            url = f"{self.base_url}/country/{quote(','.join(chunk))}/{start_date}/{end_date}"
+            logger.info(f"Fetching calendar for {len(chunk)} countries from {start_date} to {end_date}...")
+
+            try:
+                events = self._request_events(url, params, chunk)
+            except Exception as e:
+                logger.error(f"Failed to fetch calendar for {', '.join(chunk)}: {e}")
+                continue
+
+            # イベントの Country で国毎に振り分け
+            for country in chunk:
+                by_country.setdefault(country, [])
+            for event in events:
+                name = country_key(event['country'])
+                if name in by_country:
+                    by_country[name].append(event)
+
+        return by_country
+
     def fetch_today_tomorrow(self, country: str = 'united states') -> Dict:
         """今日・明日の予定を取得"""
         events = self.fetch_calendar(country=country, days_ahead=2)
@@ -99,25 +177,16 @@ class EconomicCalendarWithForecast:
         return categorized
 
     def fetch_major_countries(self) -> Dict:
-        """主要国のカレンダーを取得"""
-        countries = {
-            'united states': 'USA',
-            'japan': 'Japan',
-            'china': 'China',
-            'united kingdom': 'UK',
-            'euro zone': 'EU',
-            'germany': 'Germany',
-        }
-
+        """主要国のカレンダーを取得（全ての国をまとめたリクエスト）"""
         all_events = {
             'timestamp': datetime.now().isoformat(),
             'countries': {}
         }
 
-        for country_en, country_ja in countries.items():
-            print(f"\nFetching {country_ja}...")
+        by_country = self.fetch_countries(list(MAJOR_COUNTRIES), days_ahead=7)
 
-            events = self.fetch_calendar(country=country_en, days_ahead=7)
+        for country_en, country_ja in MAJOR_COUNTRIES.items():
+            events = by_country.get(country_en)
 
             if events:
                 all_events['countries'][country_ja] = {
@@ -132,83 +201,40 @@ class EconomicCalendarWithForecast:
         os.makedirs(os.path.dirname(filename), exist_ok=True)
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"Saved to {filename}")
+        logger.info(f"Saved to {filename}")
 
     def save_markdown(self, data: Dict, filename: str):
         """Markdownで保存"""
         os.makedirs(os.path.dirname(filename), exist_ok=True)
 
-        lines = [
-            f"# 経済カレンダー（予想値付き）",
-            f"",
-            f"**取得日時**: {data['timestamp']}",
-            f"**データソース**: Trading Economics",
-            f"",
-        ]
-
-        if 'today' in data:
-            # 今日・明日形式
-            if data['today']:
-                lines.extend([
-                    f"## 今日の予定",
-                    f"",
-                    f"| 時刻 | 国 | 指標 | 重要度 | 予想 | 前回 |",
-                    f"|------|----|----|--------|------|------|"
-                ])
-
-                for event in data['today']:
-                    lines.append(
-                        f"| {event['time']} | {event['country']} | {event['event']} | "
-                        f"{event['importance']} | {event['forecast']} | {event['previous']} |"
-                    )
-
-                lines.append("")
-
-            if data['tomorrow']:
-                lines.extend([
-                    f"## 明日の予定",
-                    f"",
-                    f"| 時刻 | 国 | 指標 | 重要度 | 予想 | 前回 |",
-                    f"|------|----|----|--------|------|------|"
-                ])
-
-                for event in data['tomorrow']:
-                    lines.append(
-                        f"| {event['time']} | {event['country']} | {event['event']} | "
-                        f"{event['importance']} | {event['forecast']} | {event['previous']} |"
-                    )
-
-        elif 'countries' in data:
-            # 各国形式
-            for country, country_data in data['countries'].items():
-                lines.extend([
-                    f"## {country} ({country_data['count']} events)",
-                    f"",
-                    f"| 日付 | 時刻 | 指標 | 予想 | 前回 |",
-                    f"|------|------|----|------|------|"
-                ])
-
-                for event in country_data['events']:
-                    lines.append(
-                        f"| {event['date']} | {event['time']} | {event['event']} | "
-                        f"{event['forecast']} | {event['previous']} |"
-                    )
-
-                lines.append("")
-
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
+            report = MarkdownReport(f)
+            report.title("経済カレンダー（予想値付き）")
+            report.meta("取得日時", data['timestamp'])
+            report.meta("データソース", "Trading Economics")
+            report.line()
+
+            if 'today' in data:
+                # 今日・明日形式
+                report.day_sections(data, {'today': DAY_TABLE_SCHEMA, 'tomorrow': DAY_TABLE_SCHEMA})
 
-        print(f"Saved to {filename}")
+            elif 'countries' in data:
+                # 各国形式
+                for country, country_data in data['countries'].items():
+                    report.heading(f"{country} ({country_data['count']} events)")
+                    report.table(COUNTRY_TABLE_SCHEMA, country_data['events'])
 
+        logger.info(f"Saved to {filename}")
 
 def main():
     """メイン処理"""
+    setup_logging()
+    install_http_replay()
 
     calendar = EconomicCalendarWithForecast()
 
     # 米国の今日・明日を取得
-    print("Fetching USA calendar...")
+    logger.info("Fetching USA calendar...")
     data = calendar.fetch_today_tomorrow(country='united states')
 
     # 保存
@@ -222,20 +248,12 @@ def main():
     calendar.save_json(data, f"{output_dir}/calendar_forecast_latest.json")
     calendar.save_markdown(data, f"{output_dir}/calendar_forecast_latest.md")
 
-    # 結果表示
-    print()
-    if data['today']:
-        print("今日の予定:")
-        for event in data['today']:
-            print(f"  {event['time']}: {event['event']}")
-            print(f"    予想: {event['forecast']} | 前回: {event['previous']}")
-
-    print()
-    if data['tomorrow']:
-        print("明日の予定:")
-        for event in data['tomorrow']:
-            print(f"  {event['time']}: {event['event']}")
-            print(f"    予想: {event['forecast']} | 前回: {event['previous']}")
+    # 結果表示（1件1行）
+    for key, label in (('today', '今日の予定'), ('tomorrow', '明日の予定')):
+        if data[key]:
+            logger.info(f"{label}:")
+            for event in data[key]:
+                logger.info(f"  {event['time']}: {event['event']} (予想: {event['forecast']} | 前回: {event['previous']})")
 
 
 if __name__ == "__main__":
@@ -2,7 +2,8 @@
 """
 イールドカーブ取得スクリプト（investpy版）
 
-investpyを使って各国の国債利回りを取得し、イールドカープを可視化します。
+Investing.comから各国の国債利回りを取得し、イールドカープを可視化します。
+取得は既定でHTTPのみのバックエンド（investing_http.py）を使い、ブラウザは不要です。
 
 対象国:
 - 日本
@@ -13,19 +14,29 @@ investpyを使って各国の国債利回りを取得し、イールドカープ
 - オーストラリア
 
 インストール:
-    pip install investpy pandas matplotlib numpy
+    pip install pandas matplotlib numpy lxml requests
+    pip install investpy  # フォールバック用（任意）
 
 注意:
-- investpyは2020年からメンテナンス停止
-- Python 3.9以下を推奨
+- investpyは2020年からメンテナンス停止（HTTPバックエンドが失敗した時のフォールバックとしてのみ使用）
+- MARKET_INVESTING_BACKEND=investpy で従来どおりinvestpyのみを使います
 - Investing.comの構造変更で動作しない可能性があります
 """
 
-import investpy as inv
+# investpyがなくても保存・描画処理は読み込めるようにする（main()で確認）
+try:
+    import investpy as inv
+except ImportError:
+    inv = None
 import pandas as pd
+import logging
 import os
 import sys
 
+from logging_setup import add_logging_arguments, get_logger, setup_logging_from_args
+
+logger = get_logger(__name__)
+
 # investpyはrequestsモジュールを使用しているため、User-Agentを上書きして最新のブラウザに見せる
 # investpy.utils.extra.random_user_agentを上書き
 def get_latest_user_agent():
@@ -36,9 +47,9 @@ def get_latest_user_agent():
 try:
     import investpy.utils.extra as extra
     extra.random_user_agent = get_latest_user_agent
-    print(f"Updated investpy User-Agent to: {get_latest_user_agent()[:50]}...")
+    logger.debug(f"Updated investpy User-Agent to: {get_latest_user_agent()[:50]}...")
 except Exception as e:
-    print(f"Warning: Could not update User-Agent: {e}")
+    logger.debug(f"Could not update User-Agent: {e}")
 
 # investpyのrequests.postをmonkey patchして、より多くのヘッダーを追加
 import requests
@@ -72,25 +83,46 @@ def enhanced_post(url, headers=None, data=None, **kwargs):
 
 # requests.postを置き換え
 requests.post = enhanced_post
-print("Enhanced requests.post with additional browser headers")
-import matplotlib
-# ヘッドレス環境（GitHub Actions）で動作させるためにAggバックエンドを使用
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+logger.debug("Enhanced requests.post with additional browser headers")
 from datetime import datetime, timedelta
-import json
+import argparse
 import os
-import numpy as np
+
+# chart_rendererの読み込み時にmatplotlibはAggバックエンド（ヘッドレス環境用）に設定される
+import matplotlib.pyplot as plt
+from chart_renderer import (
+    ChartRenderer,
+    FULL_DPI,
+    OUTPUT_FORMATS,
+    build_change_histogram_figure,
+    build_yield_curves_figure,
+)
+from markdown_report import Column, MarkdownReport, TableSchema
+from output_writer import OutputWriter
+from pipeline import Pipeline
+import instrumentation
+from http_replay import install_http_replay
+import investing_http
+import official_curves
+from serializers import get_serializer
 
 # リポジトリルートへのパスを計算（スクリプトがどこから実行されても正しく動作するように）
 script_dir = os.path.dirname(os.path.abspath(__file__))
 repo_root = os.path.dirname(os.path.dirname(script_dir))
 
-# 日本語フォント設定（matplotlibで日本語を表示するため）
-# Termux環境ではフォントが限られているため、英語で表示することを推奨
-plt.rcParams['font.family'] = 'DejaVu Sans'
-plt.rcParams['axes.unicode_minus'] = False
+# ボット対策の待機時間の倍率（ローカルのフィクスチャを再生するベンチマーク等では0にする）
+REQUEST_DELAY_SCALE = float(os.getenv('YIELD_REQUEST_DELAY_SCALE', '1'))
+
+# 取得方式
+#   overview : 国毎に国債一覧を1回取得し、足りない年限だけ個別の過去データで補う（既定）
+#   history  : 国債毎に過去データを取得する（従来の方式）
+#   official : 公的機関の一括ファイル（official_curves.py）がある国はそれを使い、
+#              足りない年限・ない国は overview と同じ方法で補う
+FETCH_MODES = ('overview', 'history', 'official')
+FETCH_MODE = os.getenv('YIELD_FETCH_MODE', 'overview').strip().lower()
+
+# Investing.com（一覧・個別の過去データ）から取得した場合のデータソース名
+INVESTING_SOURCE = 'Investing.com'
 
 # 各国の国債設定
 # investpyのbonds.get_bond_historical_data()で使用する国債名
@@ -158,11 +190,25 @@ BONDS_CONFIG = {
 }
 
 
+# Markdownレポートの表定義
+YIELD_TABLE_SCHEMA = TableSchema(
+    Column('Maturity', 'period', fmt='{}Y'),
+    Column('Yield', 'yield', fmt='{:.2f}%'),
+    Column('Change', 'change', fmt='{:+.2f}%'),
+    Column('Change %', 'change_pct', fmt='{:+.2f}%'),
+)
+
+
 class YieldCurveFetcher:
     """イールドカーブ取得クラス"""
 
-    def __init__(self):
+    def __init__(self, mode: str = None):
+        self.mode = (mode or FETCH_MODE).lower()
+        if self.mode not in FETCH_MODES:
+            raise ValueError(f"Unknown fetch mode: {self.mode} (expected one of {', '.join(FETCH_MODES)})")
         self.results = {}
+        # 直前の fetch_country_yield_curve() が Investing.com にリクエストしたか（国の間の待機の判定用）
+        self.used_investing = False
 
     def fetch_bond_yield(self, bond_config: dict, country: str = None, retry_count: int = 1) -> dict:
         """
@@ -180,32 +226,40 @@ class YieldCurveFetcher:
         alternatives = bond_config.get('alternatives', [])
         all_names = [bond_name] + alternatives  # 元の名前を優先
 
+        # 1件毎の詳細はDEBUGのみ（判定はループの外で1回だけ）
+        debug = logger.isEnabledFor(logging.DEBUG)
+
         for name_idx, current_name in enumerate(all_names):
             for attempt in range(retry_count):
                 try:
-                    if name_idx == 0:
-                        print(f"  Attempting to fetch {current_name} (attempt {attempt + 1}/{retry_count})...")
-                    else:
-                        print(f"  Trying alternative name: {current_name} (attempt {attempt + 1}/{retry_count})...")
+                    if debug:
+                        if name_idx == 0:
+                            logger.debug("Attempting to fetch %s (attempt %d/%d)...", current_name, attempt + 1, retry_count)
+                        else:
+                            logger.debug("Trying alternative name: %s (attempt %d/%d)...", current_name, attempt + 1, retry_count)
+
+                    if name_idx > 0 or attempt > 0:
+                        instrumentation.count('retries')
 
                     # Investing.comのボット対策を回避するため、ランダムな遅延を追加
-                    import time
                     import random
-                    delay = random.uniform(20, 40)  # 20〜40秒のランダムな遅延
-                    print(f"  Waiting {delay:.1f} seconds before request...")
-                    time.sleep(delay)
+                    delay = random.uniform(20, 40) * REQUEST_DELAY_SCALE  # 20〜40秒のランダムな遅延
+                    if debug:
+                        logger.debug("Waiting %.1f seconds before request...", delay)
+                    instrumentation.sleep(delay, 'request_delay')
 
                     # 最新のデータを取得
-                    data = inv.bonds.get_bond_historical_data(
-                        current_name,
-                        from_date=(datetime.now() - timedelta(days=7)).strftime('%d/%m/%Y'),
-                        to_date=datetime.now().strftime('%d/%m/%Y'),
-                        as_json=False,  # DataFrameとして取得
-                        order='ascending'  # 昇順で取得
-                    )
+                    with instrumentation.span(current_name, kind='fetch', country=country, attempt=attempt + 1):
+                        data = investing_http.get_bond_historical_data(
+                            current_name,
+                            from_date=(datetime.now() - timedelta(days=7)).strftime('%d/%m/%Y'),
+                            to_date=datetime.now().strftime('%d/%m/%Y'),
+                            order='ascending'  # 昇順で取得
+                        )
 
                     if data is not None and not data.empty:
-                        print(f"  Successfully fetched {current_name}: {len(data)} records")
+                        if debug:
+                            logger.debug("Fetched %s: %d records", current_name, len(data))
 
                         # 最新の利回り（最終行）
                         latest = data.iloc[-1]
@@ -232,38 +286,132 @@ class YieldCurveFetcher:
                             'change_pct': float(change_pct) if change_pct is not None and pd.notna(change_pct) else None,
                             'date': latest.name.strftime('%Y-%m-%d') if hasattr(latest.name, 'strftime') else str(latest.name),
                         }
-                        print(f"  Yield: {result['yield']:.2f}%")
+                        if debug:
+                            logger.debug("%s yield: %s%%", current_name, result['yield'])
                         return result
                     else:
-                        print(f"  No data for {current_name} (attempt {attempt + 1}/{retry_count})")
+                        logger.warning(f"No data for {current_name} (attempt {attempt + 1}/{retry_count})")
                         if attempt < retry_count - 1:
-                            import time
                             import random
-                            retry_delay = random.uniform(5, 10)  # 5〜10秒のランダムな遅延
-                            print(f"  Waiting {retry_delay:.1f}s before retry...")
-                            time.sleep(retry_delay)
+                            retry_delay = random.uniform(5, 10) * REQUEST_DELAY_SCALE  # 5〜10秒のランダムな遅延
+                            if debug:
+                                logger.debug("Waiting %.1fs before retry...", retry_delay)
+                            instrumentation.sleep(retry_delay, 'retry_delay')
                         continue
 
                 except Exception as e:
-                    print(f"  Error fetching {current_name} (attempt {attempt + 1}/{retry_count}): {type(e).__name__}: {e}")
+                    logger.warning(f"Error fetching {current_name} (attempt {attempt + 1}/{retry_count}): {type(e).__name__}: {e}")
                     if attempt < retry_count - 1:
-                        import time
-                        time.sleep(2)  # リトライ前に待機
+                        instrumentation.sleep(2 * REQUEST_DELAY_SCALE, 'retry_delay')  # リトライ前に待機
                         continue
                     else:
                         # 最終試行で失敗した場合、次のbond名を試す
                         if name_idx < len(all_names) - 1:
-                            print(f"  Trying next alternative name...")
+                            if debug:
+                                logger.debug("Trying next alternative name...")
                             break
                         else:
                             # 全てのbond名で失敗
-                            import traceback
-                            print(f"  All bond names failed. Final error traceback: {traceback.format_exc()}")
+                            logger.error(f"All bond names failed for {bond_name}", exc_info=True)
                             return None
 
-        print(f"  Failed to fetch bond after trying all names: {bond_name}")
+        logger.error(f"Failed to fetch bond after trying all names: {bond_name}")
         return None
 
+    def fetch_country_overview(self, country: str) -> dict:
+        """
+        国債一覧（国の全年限）を1回のリクエストで取得し、BONDS_CONFIGの年限に対応付け
+
+        一覧の行は、まず設定の国債名・候補名と、次に名前の年限（'10Y' 等）と照合します。
+
+        Args:
+            country: 国コード（'japan', 'united states'等）
+
+        Returns:
+            dict: 年限 -> 利回りデータ（fetch_bond_yield() と同じ形。取得できなければ空）
+        """
+        config = BONDS_CONFIG[country]
+
+        import random
+        delay = random.uniform(20, 40) * REQUEST_DELAY_SCALE  # 20〜40秒のランダムな遅延
+        logger.debug("Waiting %.1f seconds before overview request...", delay)
+        instrumentation.sleep(delay, 'request_delay')
+
+        try:
+            with instrumentation.span(f"{config['name']} overview", kind='fetch', country=country):
+                rows = investing_http.get_bonds_overview(country)
+        except Exception as e:
+            logger.warning(f"Could not fetch bonds overview for {config['name']}: {type(e).__name__}: {e}")
+            return {}
+
+        by_name = {str(row.get('name', '')).strip().lower(): row for row in rows}
+        by_tenor = {}
+        for row in rows:
+            by_tenor.setdefault(investing_http.parse_tenor(str(row.get('name', ''))), row)
+
+        debug = logger.isEnabledFor(logging.DEBUG)
+        fetch_date = datetime.now().strftime('%Y-%m-%d')
+        bonds = {}
+
+        for bond_config in config['bonds']:
+            names = [bond_config['name']] + bond_config.get('alternatives', [])
+            row = next((by_name[name.lower()] for name in names if name.lower() in by_name), None)
+            if row is None:
+                row = by_tenor.get(float(bond_config['period']))
+            if row is None or row.get('last') is None or pd.isna(row['last']):
+                continue
+
+            latest_yield = float(row['last'])
+            previous_yield = row.get('last_close')
+            if previous_yield is None or pd.isna(previous_yield):
+                # 前日終値がなければ前日比から逆算
+                change = row.get('change')
+                previous_yield = latest_yield - change if change is not None and pd.notna(change) else None
+
+            if previous_yield is not None:
+                previous_yield = float(previous_yield)
+                change = latest_yield - previous_yield
+                change_pct = (change / previous_yield) * 100 if previous_yield != 0 else 0
+            else:
+                change = None
+                change_pct = None
+
+            bonds[bond_config['period']] = {
+                'name': bond_config['name'],
+                'fetched_name': row['name'],
+                'period': bond_config['period'],
+                'yield': latest_yield,
+                'previous_yield': previous_yield,
+                'change': change,
+                'change_pct': change_pct,
+                'date': row.get('date') or fetch_date,
+            }
+            if debug:
+                logger.debug("%s yield: %s%% (from overview row %s)", bond_config['name'], latest_yield, row['name'])
+
+        return bonds
+
+    def fetch_country_official(self, country: str) -> dict:
+        """
+        公的機関の一括ファイルから国のカーブを取得（履歴は差分更新して保存）
+
+        Returns:
+            dict: 年限 -> 利回りデータ（fetch_bond_yield() と同じ形。取得できなければ空）
+        """
+        config = BONDS_CONFIG.get(country)
+        periods = [bond['period'] for bond in config['bonds']] if config else None
+        try:
+            bonds = official_curves.official_bonds(country, periods)
+        except Exception as e:
+            logger.warning(f"Could not load official curve for {country}: {type(e).__name__}: {e}")
+            return {}
+
+        # 設定の国債名を保持（fetched_name は一括ファイルの年限）
+        for bond_config in (config['bonds'] if config else []):
+            if bond_config['period'] in bonds:
+                bonds[bond_config['period']]['name'] = bond_config['name']
+        return bonds
+
     def fetch_country_yield_curve(self, country: str) -> dict:
         """
         国のイールドカーブ全体を取得
@@ -274,30 +422,65 @@ class YieldCurveFetcher:
         Returns:
             dict: イールドカーブデータ
         """
+        self.used_investing = False
+        official = self.mode == 'official' and country in official_curves.OFFICIAL_SOURCES
+
         if country not in BONDS_CONFIG:
-            print(f"Unknown country: {country}")
+            if official:
+                # 一括ファイルだけがある国（ユーロ圏等）は、ファイルの全年限を使う
+                official_config = official_curves.OFFICIAL_SOURCES[country]
+                return self._store_result(country, official_config,
+                                          list(self.fetch_country_official(country).values()),
+                                          official_config['label'])
+            logger.error(f"Unknown country: {country}")
             return None
 
         config = BONDS_CONFIG[country]
-        print(f"\n{'=' * 60}")
-        print(f"Fetching yield curve for {config['name_ja']} ({config['name']})")
-        print(f"{'=' * 60}")
+        logger.info('=' * 60)
+        logger.info(f"Fetching yield curve for {config['name_ja']} ({config['name']})")
+        logger.info('=' * 60)
 
-        # 最初のリクエスト前に少し待機して、ボット検出を回避
-        import time
-        import random
-        initial_delay = random.uniform(10, 20)
-        print(f"Initial delay: {initial_delay:.1f} seconds...")
-        time.sleep(initial_delay)
+        # officialモードでは一括ファイル、overviewモードでは一覧の1回のリクエストで
+        # 埋まらなかった年限だけを次の方法で取得
+        bonds = self.fetch_country_official(country) if official else {}
+        official_periods = set(bonds)
+        if bonds:
+            logger.info(f"Official source covered {len(bonds)}/{len(config['bonds'])} bonds for {config['name']}")
 
-        yields_data = []
+        if any(bond_config['period'] not in bonds for bond_config in config['bonds']):
+            self.used_investing = True
 
+            # 最初のリクエスト前に少し待機して、ボット検出を回避
+            import random
+            initial_delay = random.uniform(10, 20) * REQUEST_DELAY_SCALE
+            logger.debug("Initial delay: %.1f seconds...", initial_delay)
+            instrumentation.sleep(initial_delay, 'initial_delay')
+
+            if self.mode != 'history':
+                overview = self.fetch_country_overview(country)
+                if overview:
+                    logger.info(f"Overview covered {len(overview)}/{len(config['bonds'])} bonds for {config['name']}")
+                for period, data in overview.items():
+                    bonds.setdefault(period, data)
+
+        yields_data = []
+        sources = []
         for bond_config in config['bonds']:
-            print(f"Fetching {bond_config['name']} ({bond_config['period']}Y)...")
-            data = self.fetch_bond_yield(bond_config, country)
+            data = bonds.get(bond_config['period']) or self.fetch_bond_yield(bond_config, country)
             if data:
                 yields_data.append(data)
-
+                if bond_config['period'] in official_periods:
+                    source = official_curves.OFFICIAL_SOURCES[country]['label']
+                else:
+                    source = INVESTING_SOURCE
+                if source not in sources:
+                    sources.append(source)
+        logger.info(f"Fetched {len(yields_data)}/{len(config['bonds'])} bonds for {config['name']}")
+
+        return self._store_result(country, config, yields_data, ' + '.join(sources))
+
+    def _store_result(self, country: str, config: dict, yields_data: list, source: str) -> dict:
+        """国のカーブを results に保存（国債がなければNone）。source は取得元（複数なら ' + ' 区切り）"""
         if yields_data:
             # 期間でソート
             yields_data.sort(key=lambda x: x['period'])
@@ -306,6 +489,7 @@ class YieldCurveFetcher:
                 'country': country,
                 'country_name': config['name'],
                 'country_name_ja': config['name_ja'],
+                'source': source,
                 'fetch_date': datetime.now().isoformat(),
                 'bonds': yields_data
             }
@@ -313,311 +497,224 @@ class YieldCurveFetcher:
             self.results[country] = result
             return result
 
-        print(f"Warning: No bond data fetched for {country}")
+        logger.warning(f"No bond data fetched for {country}")
         return None
 
     def fetch_all_countries(self) -> dict:
-        """全対象国のイールドカーブを取得"""
-        for country in BONDS_CONFIG.keys():
+        """全対象国のイールドカーブを取得（officialモードでは一括ファイルだけがある国も）"""
+        countries = list(BONDS_CONFIG.keys())
+        if self.mode == 'official':
+            countries += [country for country in official_curves.OFFICIAL_SOURCES if country not in BONDS_CONFIG]
+
+        for country in countries:
             self.fetch_country_yield_curve(country)
+            if not self.used_investing:
+                continue
             # 各国の間にランダムな遅延を追加して、Investing.comのボット対策を回避
-            import time
             import random
-            delay = random.uniform(30, 60)  # 30〜60秒のランダムな遅延
-            print(f"Waiting {delay:.1f} seconds before next country...")
-            time.sleep(delay)
+            delay = random.uniform(30, 60) * REQUEST_DELAY_SCALE  # 30〜60秒のランダムな遅延
+            logger.info(f"Waiting {delay:.1f} seconds before next country...")
+            instrumentation.sleep(delay, 'country_delay')
 
         return self.results
 
-    def plot_yield_curves(self, save_path: str = None):
-        """全国のイールドカーブをプロット"""
-        if not self.results:
-            print("No data to plot")
-            return
-
-        fig, axes = plt.subplots(2, 3, figsize=(18, 12))
-        fig.suptitle(f'Government Bond Yield Curves\n{datetime.now().strftime("%Y-%m-%d")}',
-                     fontsize=16, fontweight='bold')
-
-        countries = list(BONDS_CONFIG.keys())
-        colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
-
-        for idx, country in enumerate(countries):
-            ax = axes[idx // 3, idx % 3]
-
-            if country not in self.results:
-                ax.text(0.5, 0.5, 'No Data', ha='center', va='center', transform=ax.transAxes)
-                ax.set_title(BONDS_CONFIG[country]['name_ja'])
-                continue
-
-            data = self.results[country]
-            periods = [bond['period'] for bond in data['bonds']]
-            yields = [bond['yield'] for bond in data['bonds']]
-
-            # イールドカーブ
-            ax.plot(periods, yields, marker='o', linewidth=2, markersize=8, color=colors[idx])
-            ax.fill_between(periods, 0, yields, alpha=0.2, color=colors[idx])
+    def render_charts(self, formats: tuple = ('png',), force: bool = False) -> dict:
+        """
+        イールドカーブと前日比のグラフをプロセスプールで並列に描画
 
-            # 値を表示
-            for p, y in zip(periods, yields):
-                ax.text(p, y, f'{y:.2f}%', ha='center', va='bottom', fontsize=9)
+        前回描画時から入力データが変わっていないグラフはスキップします。
 
-            ax.set_xlabel('Maturity (Years)', fontsize=11)
-            ax.set_ylabel('Yield (%)', fontsize=11)
-            ax.set_title(f"{data['country_name_ja']} ({data['country_name']})", fontsize=12, fontweight='bold')
-            ax.grid(True, alpha=0.3)
-            ax.set_xlim(0, max(periods) + 2)
+        Args:
+            formats: 出力形式（'png', 'svg', 'thumb' の組み合わせ）
+            force: Trueならデータが同じでも再描画
 
-        plt.tight_layout()
+        Returns:
+            dict: チャート種別 -> 保存したパス
+        """
+        output_dir = os.path.join(repo_root, 'market/data/yield_curves/images')
+        renderer = ChartRenderer(output_dir, formats=formats, force=force)
+        return renderer.render(self.results, self.chart_config())
 
-        if save_path:
-            plt.savefig(save_path, dpi=150, bbox_inches='tight')
-            print(f"Saved yield curve plot: {save_path}")
-        else:
+    def chart_config(self) -> dict:
+        """描画する国の設定（BONDS_CONFIG に、一括ファイルだけで取得した国（ユーロ圏等）を追加）"""
+        config = dict(BONDS_CONFIG)
+        for country, data in self.results.items():
+            config.setdefault(country, {
+                'name': data['country_name'],
+                'name_ja': data['country_name_ja'],
+                'bonds': [],
+            })
+        return config
+
+    def _save_figure(self, fig, save_path: str, default_name: str, label: str):
+        """Figureを保存（save_path未指定ならimagesディレクトリへ）"""
+        if not save_path:
             output_dir = os.path.join(repo_root, 'market/data/yield_curves/images')
             os.makedirs(output_dir, exist_ok=True)
-            save_path = os.path.join(output_dir, 'yield_curves.png')
-            plt.savefig(save_path, dpi=150, bbox_inches='tight')
-            print(f"Saved yield curve plot: {save_path}")
+            save_path = os.path.join(output_dir, default_name)
 
-        plt.close()
+        fig.savefig(save_path, dpi=FULL_DPI, bbox_inches='tight')
+        logger.info(f"Saved {label}: {save_path}")
+        plt.close(fig)
 
-    def plot_change_histogram(self, save_path: str = None):
-        """前日比のヒストグラムをプロット"""
+    def plot_yield_curves(self, save_path: str = None):
+        """全国のイールドカーブをプロット"""
         if not self.results:
-            print("No data to plot")
+            logger.warning("No data to plot")
             return
 
-        fig, axes = plt.subplots(2, 3, figsize=(18, 12))
-        fig.suptitle(f'Yield Change (Day-over-Day)\n{datetime.now().strftime("%Y-%m-%d")}',
-                     fontsize=16, fontweight='bold')
-
-        countries = list(BONDS_CONFIG.keys())
-
-        for idx, country in enumerate(countries):
-            ax = axes[idx // 3, idx % 3]
-
-            if country not in self.results:
-                ax.text(0.5, 0.5, 'No Data', ha='center', va='center', transform=ax.transAxes)
-                ax.set_title(BONDS_CONFIG[country]['name_ja'])
-                continue
-
-            data = self.results[country]
-
-            # 前日比データを抽出
-            changes = []
-            labels = []
-            colors_bar = []
-
-            for bond in data['bonds']:
-                if bond.get('change') is not None:
-                    changes.append(bond['change'])
-                    labels.append(f"{bond['period']}Y")
-                    colors_bar.append('green' if bond['change'] >= 0 else 'red')
-
-            if changes:
-                bars = ax.bar(labels, changes, color=colors_bar, alpha=0.7, edgecolor='black')
-
-                # 値を表示
-                for bar, change in zip(bars, changes):
-                    height = bar.get_height()
-                    ax.text(bar.get_x() + bar.get_width() / 2., height,
-                            f'{change:+.2f}%',
-                            ha='center', va='bottom' if height >= 0 else 'top',
-                            fontsize=9, fontweight='bold')
-
-                ax.axhline(y=0, color='black', linestyle='-', linewidth=0.8)
-                ax.set_xlabel('Maturity', fontsize=11)
-                ax.set_ylabel('Change (%)', fontsize=11)
-                ax.set_title(f"{data['country_name_ja']} ({data['country_name']})", fontsize=12, fontweight='bold')
-                ax.grid(True, alpha=0.3, axis='y')
-
-                # y軸の範囲を設定
-                y_max = max(abs(c) for c in changes) if changes else 0.1
-                ax.set_ylim(-y_max * 1.5, y_max * 1.5)
-            else:
-                ax.text(0.5, 0.5, 'No change data', ha='center', va='center', transform=ax.transAxes)
-                ax.set_title(f"{data['country_name_ja']} ({data['country_name']})", fontsize=12, fontweight='bold')
-
-        plt.tight_layout()
+        fig = build_yield_curves_figure(self.results, self.chart_config())
+        self._save_figure(fig, save_path, 'yield_curves.png', 'yield curve plot')
 
-        if save_path:
-            plt.savefig(save_path, dpi=150, bbox_inches='tight')
-            print(f"Saved change histogram: {save_path}")
-        else:
-            output_dir = os.path.join(repo_root, 'market/data/yield_curves/images')
-            os.makedirs(output_dir, exist_ok=True)
-            save_path = os.path.join(output_dir, 'yield_changes.png')
-            plt.savefig(save_path, dpi=150, bbox_inches='tight')
-            print(f"Saved change histogram: {save_path}")
+    def plot_change_histogram(self, save_path: str = None):
+        """前日比のヒストグラムをプロット"""
+        if not self.results:
+            logger.warning("No data to plot")
+            return
 
-        plt.close()
+        fig = build_change_histogram_figure(self.results, self.chart_config())
+        self._save_figure(fig, save_path, 'yield_changes.png', 'change histogram')
 
     def save_json(self, output_dir: str = None):
         """JSONで保存"""
         if not self.results:
-            print("No data to save")
+            logger.warning("No data to save")
             return
 
         if output_dir is None:
             output_dir = os.path.join(repo_root, 'market/data/yield_curves/json')
 
-        os.makedirs(output_dir, exist_ok=True)
-
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-        # タイムスタンプ付きファイル
-        timestamp_file = os.path.join(output_dir, f"yield_curve_{timestamp}.json")
-        with open(timestamp_file, 'w', encoding='utf-8') as f:
-            json.dump(self.results, f, ensure_ascii=False, indent=2)
-        print(f"Saved: {timestamp_file}")
-
-        # 最新版ファイル
-        latest_file = os.path.join(output_dir, "yield_curve_latest.json")
-        with open(latest_file, 'w', encoding='utf-8') as f:
-            json.dump(self.results, f, ensure_ascii=False, indent=2)
-        print(f"Saved: {latest_file}")
+        # 最新版（人が読む整形JSON）とタイムスタンプ付きアーカイブ（コンパクト形式）
+        # データに変更がなければどちらも書かない
+        archive = get_serializer()
+        OutputWriter(output_dir).write(
+            "yield_curve_latest.json",
+            get_serializer('pretty').dumps(self.results),
+            payload=self.results,
+            timestamped_name=f"yield_curve_{timestamp}{archive.extension}",
+            timestamped_content=archive.dumps(self.results)
+        )
 
     def save_markdown(self, output_dir: str = None):
         """Markdownレポートを保存"""
         if not self.results:
-            print("No data to save")
+            logger.warning("No data to save")
             return
 
         if output_dir is None:
             output_dir = os.path.join(repo_root, 'market/data/yield_curves/markdown')
 
-        os.makedirs(output_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-        lines = [
-            "# Government Bond Yield Curves",
-            f"",
-            f"**Fetch Date**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            f"**Data Source**: Investing.com via investpy",
-            f"",
-        ]
-
-        for country, data in self.results.items():
-            lines.extend([
-                f"## {data['country_name_ja']} ({data['country_name']})",
-                f"",
-                f"| Maturity | Yield | Change | Change % |",
-                f"|----------|-------|--------|----------|"
-            ])
-
-            for bond in data['bonds']:
-                yield_val = f"{bond['yield']:.2f}%" if bond.get('yield') is not None else "N/A"
-                change_val = f"{bond['change']:+.2f}%" if bond.get('change') is not None else "N/A"
-                change_pct_val = f"{bond['change_pct']:+.2f}%" if bond.get('change_pct') is not None else "N/A"
-                lines.append(f"| {bond['period']}Y | {yield_val} | {change_val} | {change_pct_val} |")
-
-            lines.append("")
-
-        # タイムスタンプ付きファイル
-        timestamp_file = os.path.join(output_dir, f"yield_curve_{timestamp}.md")
-        with open(timestamp_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
-        print(f"Saved: {timestamp_file}")
-
-        # 最新版ファイル
-        latest_file = os.path.join(output_dir, "yield_curve_latest.md")
-        with open(latest_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(lines))
-        print(f"Saved: {latest_file}")
+        def write_report(f):
+            report = MarkdownReport(f)
+            report.title("Government Bond Yield Curves")
+            report.meta("Fetch Date", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            sources = dict.fromkeys(
+                name for data in self.results.values() for name in data.get('source', INVESTING_SOURCE).split(' + ')
+            )
+            report.meta("Data Source", ", ".join(sources))
+            report.line()
+
+            for country, data in self.results.items():
+                report.heading(f"{data['country_name_ja']} ({data['country_name']})")
+                report.meta("Source", data.get('source', INVESTING_SOURCE))
+                report.line()
+                report.table(YIELD_TABLE_SCHEMA, data['bonds'])
+
+        # 最新版ファイルとタイムスタンプ付きファイル（データに変更がなければ書かない）
+        OutputWriter(output_dir).write(
+            "yield_curve_latest.md",
+            write_report,
+            payload=self.results,
+            timestamped_name=f"yield_curve_{timestamp}.md"
+        )
 
     def print_summary(self):
         """結果のサマリーを表示"""
         if not self.results:
-            print("No data available")
+            logger.warning("No data available")
             return
 
-        print("\n" + "=" * 80)
-        print("YIELD CURVE SUMMARY")
-        print("=" * 80)
-        print(f"Fetch Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print()
+        logger.info("=" * 80)
+        logger.info("YIELD CURVE SUMMARY")
+        logger.info("=" * 80)
+        logger.info(f"Fetch Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
         for country, data in self.results.items():
-            print(f"\n{data['country_name_ja']} ({data['country_name']})")
-            print("-" * 60)
-            print(f"{'Maturity':<12} {'Yield':<12} {'Change':<12} {'Change %':<12}")
-            print("-" * 60)
+            logger.info(f"{data['country_name_ja']} ({data['country_name']})")
+            logger.info("-" * 60)
+            logger.info(f"{'Maturity':<12} {'Yield':<12} {'Change':<12} {'Change %':<12}")
+            logger.info("-" * 60)
 
             for bond in data['bonds']:
                 yield_str = f"{bond['yield']:.2f}%" if bond.get('yield') is not None else "N/A"
                 change_str = f"{bond['change']:+.2f}%" if bond.get('change') is not None else "N/A"
                 change_pct_str = f"{bond['change_pct']:+.2f}%" if bond.get('change_pct') is not None else "N/A"
-                print(f"{bond['period']}Y{'':<8} {yield_str:<12} {change_str:<12} {change_pct_str:<12}")
+                logger.info(f"{bond['period']}Y{'':<8} {yield_str:<12} {change_str:<12} {change_pct_str:<12}")
 
-        print("\n" + "=" * 80)
+        logger.info("=" * 80)
 
 
 def main():
     """メイン処理"""
-    print("=" * 80)
-    print("イールドカーブ取得（investpy版）")
-    print("=" * 80)
-    print()
-
-    # investpyのバージョン確認
-    try:
-        import investpy
-        print(f"investpy version: {investpy.__version__}")
-    except ImportError:
-        print("investpy not installed!")
-        print("Install with: pip install investpy pandas matplotlib numpy")
+    parser = argparse.ArgumentParser(description='イールドカーブ取得')
+    parser.add_argument('--chart-formats', type=str, default='png',
+                        help=f"グラフの出力形式（カンマ区切り: {', '.join(OUTPUT_FORMATS)}）")
+    parser.add_argument('--force-render', action='store_true',
+                        help='データが変わっていなくてもグラフを再描画')
+    parser.add_argument('--fetch-mode', choices=FETCH_MODES, default=FETCH_MODE,
+                        help='overview: 国毎に国債一覧を1回取得し足りない年限だけ個別取得 / history: 国債毎に取得 / '
+                             'official: 公的機関の一括ファイルを使い足りない分をoverviewで補う'
+                             '（既定: 環境変数 YIELD_FETCH_MODE または overview）')
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    setup_logging_from_args(args)
+    install_http_replay()
+    chart_formats = tuple(fmt.strip() for fmt in args.chart_formats.split(',') if fmt.strip())
+
+    logger.info("=" * 80)
+    logger.info("イールドカーブ取得（investpy版）")
+    logger.info("=" * 80)
+
+    # 取得バックエンドの確認（investpyはフォールバック用で、なくても取得できる）
+    logger.info(f"Backend: {investing_http.BACKEND} (fetch mode: {args.fetch_mode})")
+    if inv is not None:
+        logger.info(f"investpy version: {inv.__version__}")
+    elif investing_http.BACKEND == 'investpy':
+        logger.error("investpy not installed! Install with: pip install investpy")
         return
 
-    print()
+    # 取得・待機・描画・書き込みの時間とリクエスト数を記録
+    recorder = instrumentation.start_run('yield_curve')
+    instrumentation.install_request_counters()
 
     # フェッチャーを作成
-    fetcher = YieldCurveFetcher()
-
-    # 全国のデータを取得
-    fetcher.fetch_all_countries()
-
-    # サマリーを表示
-    fetcher.print_summary()
-
-    # グラフを保存
-    fetcher.plot_yield_curves()
-    fetcher.plot_change_histogram()
-
-    # JSONを保存
-    fetcher.save_json()
-
-    # Markdownを保存
-    fetcher.save_markdown()
-
-    print("\nDone!")
-
-    # デバッグ: 実際に保存されたファイルを確認
-    print("\n" + "=" * 80)
-    print("DEBUG: Checking saved files...")
-    print("=" * 80)
-
-    import os
-    json_dir = os.path.join(repo_root, 'market/data/yield_curves/json')
-    images_dir = os.path.join(repo_root, 'market/data/yield_curves/images')
-    markdown_dir = os.path.join(repo_root, 'market/data/yield_curves/markdown')
-
-    print(f"\nrepo_root: {repo_root}")
-    print(f"Current working directory: {os.getcwd()}")
-
-    for dirname, dirpath in [('JSON', json_dir), ('Images', images_dir), ('Markdown', markdown_dir)]:
-        print(f"\n{dirname} directory: {dirpath}")
-        if os.path.exists(dirpath):
-            files = os.listdir(dirpath)
-            print(f"  Files found: {len(files)}")
-            for f in files:
-                filepath = os.path.join(dirpath, f)
-                size = os.path.getsize(filepath)
-                print(f"    - {f} ({size} bytes)")
-        else:
-            print(f"  Directory does not exist!")
-
-    print("\n" + "=" * 80)
+    fetcher = YieldCurveFetcher(mode=args.fetch_mode)
+
+    # 取得 → サマリー / グラフ / JSON / Markdown をDAGとして宣言
+    # 取得後の各ステージは互いに独立なので並列に実行される
+    # 描画・保存はファイルを書く副作用があるためメモ化しない
+    # （データが前回と同じかは ChartRenderer / OutputWriter が出力の有無も含めて判定する）
+    pipeline = Pipeline(max_workers=4)
+    pipeline.add('fetch_yields', fetcher.fetch_all_countries, kind='fetch')
+    pipeline.add('print_summary', lambda _: fetcher.print_summary(), deps=['fetch_yields'], kind='transform')
+    # グラフはプロセスプールで並列に描画（データに変更がなければスキップ）
+    pipeline.add('render_charts', lambda _: fetcher.render_charts(chart_formats, args.force_render),
+                 deps=['fetch_yields'], kind='render')
+    pipeline.add('save_json', lambda _: fetcher.save_json(), deps=['fetch_yields'], kind='persist')
+    pipeline.add('save_markdown', lambda _: fetcher.save_markdown(), deps=['fetch_yields'], kind='persist')
+    pipeline.run()
+    pipeline.print_report()
+
+    # 実行レポート（スパン・カウンター）をデータの隣に保存
+    recorder.set_info('pipeline', pipeline.summary())
+    recorder.print_summary()
+    recorder.write_report(os.path.join(repo_root, 'market/data/yield_curves/runs'))
+
+    logger.info("Done!")
 
 
 if __name__ == "__main__":
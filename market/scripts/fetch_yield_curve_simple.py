@@ -22,6 +22,11 @@ import json
 import os
 from datetime import datetime, timedelta
 
+from http_replay import install_http_replay
+from logging_setup import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
 
 # 各国の国債ティッカー設定（TradingView/Economic Data API）
 BONDS_CONFIG = {
@@ -98,10 +103,10 @@ def fetch_url(url: str, timeout: int = 30) -> str:
         with urllib.request.urlopen(req, timeout=timeout) as response:
             return response.read().decode('utf-8')
     except urllib.error.URLError as e:
-        print(f"  URL Error: {e}")
+        logger.warning(f"URL Error: {e}")
         return None
     except Exception as e:
-        print(f"  Error: {e}")
+        logger.warning(f"Failed to fetch {url}: {e}")
         return None
 
 
@@ -152,7 +157,7 @@ def fetch_yields_from_tradingview() -> dict:
             result = json.loads(response.read().decode('utf-8'))
             return result
     except Exception as e:
-        print(f"Error fetching from TradingView: {e}")
+        logger.error(f"Error fetching from TradingView: {e}")
         return None
 
 
@@ -228,12 +233,13 @@ def parse_tradingview_data(data: dict) -> dict:
 
 def main():
     """メイン処理"""
-    print("=" * 80)
-    print("イールドカーブ取得（標準ライブラリ版）")
-    print("=" * 80)
-    print()
+    setup_logging()
+    install_http_replay()
+    logger.info("=" * 80)
+    logger.info("イールドカーブ取得（標準ライブラリ版）")
+    logger.info("=" * 80)
 
-    print("Fetching bond yields from TradingView...")
+    logger.info("Fetching bond yields from TradingView...")
     tv_data = fetch_yields_from_tradingview()
 
     if tv_data:
@@ -288,13 +294,13 @@ def main():
             timestamp_file = os.path.join(output_dir, f"yield_curve_{timestamp}.json")
             with open(timestamp_file, 'w', encoding='utf-8') as f:
                 json.dump(results, f, ensure_ascii=False, indent=2)
-            print(f"\nSaved: {timestamp_file}")
+            logger.info(f"Saved: {timestamp_file}")
 
             # 最新版ファイル
             latest_file = os.path.join(output_dir, "yield_curve_latest.json")
             with open(latest_file, 'w', encoding='utf-8') as f:
                 json.dump(results, f, ensure_ascii=False, indent=2)
-            print(f"Saved: {latest_file}")
+            logger.info(f"Saved: {latest_file}")
 
             # 簡易テキストレポート
             report_lines = [
@@ -324,16 +330,18 @@ def main():
             report_file = os.path.join(output_dir, f"yield_curve_{timestamp}.md")
             with open(report_file, 'w', encoding='utf-8') as f:
                 f.write('\n'.join(report_lines))
-            print(f"Saved report: {report_file}")
+            logger.info(f"Saved report: {report_file}")
 
         print("\n" + "=" * 80)
-        print("Done!")
+        logger.info("Done!")
     else:
-        print("Failed to fetch data from TradingView")
-        print("\nAlternative: Try using one of these methods:")
-        print("1. Install investpy (requires Python 3.9 or lower)")
-        print("2. Install yfinance (requires internet and package installation)")
-        print("3. Use FRED API with an API key")
+        logger.error(
+            "Failed to fetch data from TradingView\n"
+            "Alternative: Try using one of these methods:\n"
+            "1. Install investpy (requires Python 3.9 or lower)\n"
+            "2. Install yfinance (requires internet and package installation)\n"
+            "3. Use FRED API with an API key"
+        )
 
 
 if __name__ == "__main__":
@@ -19,10 +19,16 @@
 import urllib.request
 import urllib.error
 import json
+import logging
 import re
 import os
 from datetime import datetime, timedelta
 
+from http_replay import install_http_replay
+from logging_setup import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
 
 # 各国の国債ティッカー設定（Yahoo Finance）
 BONDS_CONFIG = {
@@ -155,7 +161,7 @@ def fetch_yahoo_quote(symbol: str) -> dict:
             'date': latest_date
         }
     except Exception as e:
-        print(f"  Parse error for {symbol}: {e}")
+        logger.warning(f"Parse error for {symbol}: {e}")
         return None
 
 
@@ -186,27 +192,30 @@ def fetch_yahoo_summary(symbol: str) -> dict:
             'date': datetime.fromtimestamp(quote.get('regularMarketTime', 0)).strftime('%Y-%m-%d') if quote.get('regularMarketTime') else None
         }
     except Exception as e:
-        print(f"  Parse error for {symbol}: {e}")
+        logger.warning(f"Parse error for {symbol}: {e}")
         return None
 
 
 def main():
     """メイン処理"""
-    print("=" * 80)
-    print("イールドカーブ取得（Yahoo Finance API版）")
-    print("=" * 80)
-    print()
+    setup_logging()
+    install_http_replay()
+    logger.info("=" * 80)
+    logger.info("イールドカーブ取得（Yahoo Finance API版）")
+    logger.info("=" * 80)
 
     results = {}
+    # 1件毎の詳細はDEBUGのみ（判定はループの外で1回だけ）
+    debug = logger.isEnabledFor(logging.DEBUG)
 
     for country, config in BONDS_CONFIG.items():
-        print(f"\nFetching {config['name_ja']} ({config['name']})...")
-        print("-" * 60)
+        logger.info(f"Fetching {config['name_ja']} ({config['name']})...")
 
         yields_data = []
 
         for bond in config['tickers']:
-            print(f"  Fetching {bond['name']} ({bond['symbol']})...")
+            if debug:
+                logger.debug("Fetching %s (%s)...", bond['name'], bond['symbol'])
 
             # まずクエリAPIを試す
             data = fetch_yahoo_quote(bond['symbol'])
@@ -228,10 +237,8 @@ def main():
                 }
                 yields_data.append(bond_data)
 
-                # 結果を表示
-                yield_str = f"{bond_data['yield']:.2f}%" if bond_data.get('yield') is not None else "N/A"
-                change_str = f"{bond_data['change']:+.2f}%" if bond_data.get('change') is not None else "N/A"
-                print(f"    Yield: {yield_str}, Change: {change_str}")
+                if debug:
+                    logger.debug("%s yield: %s, change: %s", bond['name'], bond_data['yield'], bond_data['change'])
 
         if yields_data:
             # 期間でソート
@@ -275,13 +282,13 @@ def main():
         timestamp_file = os.path.join(output_dir, f"yield_curve_{timestamp}.json")
         with open(timestamp_file, 'w', encoding='utf-8') as f:
             json.dump(results, f, ensure_ascii=False, indent=2)
-        print(f"\nSaved: {timestamp_file}")
+        logger.info(f"Saved: {timestamp_file}")
 
         # 最新版ファイル
         latest_file = os.path.join(output_dir, "yield_curve_latest.json")
         with open(latest_file, 'w', encoding='utf-8') as f:
             json.dump(results, f, ensure_ascii=False, indent=2)
-        print(f"Saved: {latest_file}")
+        logger.info(f"Saved: {latest_file}")
 
         # Markdownレポート
         report_lines = [
@@ -311,7 +318,7 @@ def main():
         report_file = os.path.join(output_dir, f"yield_curve_{timestamp}.md")
         with open(report_file, 'w', encoding='utf-8') as f:
             f.write('\n'.join(report_lines))
-        print(f"Saved report: {report_file}")
+        logger.info(f"Saved report: {report_file}")
 
         # 簡易グラフデータ（テキスト版）
         print("\n" + "=" * 80)
@@ -331,12 +338,14 @@ def main():
                     print(f"  {bond['period']:2d}Y: {bond['yield']:5.2f}% {bar} {change_mark}")
 
         print("\n" + "=" * 80)
-        print("Done!")
+        logger.info("Done!")
     else:
-        print("\nNo data retrieved. Please check:")
-        print("1. Internet connection")
-        print("2. Yahoo Finance API availability")
-        print("3. Symbol validity")
+        logger.error(
+            "No data retrieved. Please check:\n"
+            "1. Internet connection\n"
+            "2. Yahoo Finance API availability\n"
+            "3. Symbol validity"
+        )
 
 
 if __name__ == "__main__":
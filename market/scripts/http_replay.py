@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+HTTPの記録・再生（オフラインでのベンチマーク用）
+
+各取得スクリプトは Investing.com（investpy）, FRED, OECD, World Bank, Yahoo, Trading Economics 等の
+外部サービスに直接アクセスするため、ネットワークなしでは取得処理の性能を測れません。
+
+このモジュールは
+- 記録モード: 実際のレスポンスをフィクスチャ（1リクエスト1ファイルのJSON）として保存
+- 再生モード: リクエストをローカルの代替サーバーに送り、記録済みのレスポンスを返す
+- 代替サーバー: 遅延・エラー率・429（レート制限）を設定して再生
+を提供します。requests（investpy含む）と urllib.request.urlopen の両方に対応しています。
+
+各スクリプトは main() の最初で install_http_replay() を呼ぶため、環境変数だけで切り替えられます:
+    MARKET_HTTP_MODE       : '' (通常) / 'record' / 'replay'
+    MARKET_HTTP_FIXTURES   : フィクスチャのディレクトリ（既定: market/fixtures/http）
+    MARKET_HTTP_REPLAY_URL : 代替サーバーのURL（既定: http://127.0.0.1:8765）
+
+使用例:
+  # 1. 記録（通常どおりネットワークにアクセスし、レスポンスを保存）
+  MARKET_HTTP_MODE=record python3 fetch_global_indicators.py
+
+  # 2. 代替サーバーを起動（200ms±50msの遅延、エラー率2%、毎秒5リクエストを超えると429）
+  python3 http_replay.py serve --latency 0.2 --jitter 0.05 --error-rate 0.02 --rate-limit 5
+
+  # 3. 再生（別のターミナルで）
+  MARKET_HTTP_MODE=replay python3 fetch_global_indicators.py
+
+注意:
+- APIキー等（REDACTED_PARAMS）はフィクスチャのキー計算と保存URLから除外します
+- yfinance は独自のHTTPクライアント（curl_cffi）を使うため対象外です
+"""
+
+import argparse
+import base64
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import urllib.response
+from datetime import datetime
+from glob import glob
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from logging_setup import get_logger
+from output_writer import atomic_write
+from rate_limit import TokenBucket
+
+logger = get_logger(__name__)
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+repo_root = os.path.dirname(os.path.dirname(script_dir))
+
+DEFAULT_FIXTURE_DIR = os.path.join(repo_root, 'market/fixtures/http')
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+HTTP_MODE = os.getenv('MARKET_HTTP_MODE', '').strip().lower()
+FIXTURE_DIR = os.getenv('MARKET_HTTP_FIXTURES', DEFAULT_FIXTURE_DIR)
+REPLAY_URL = os.getenv('MARKET_HTTP_REPLAY_URL', f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+
+MODES = ('record', 'replay')
+
+# 元のURLを代替サーバーに伝えるヘッダー
+ORIGINAL_URL_HEADER = 'X-Replay-Url'
+
+# キー計算・保存URLから除外するクエリパラメータ（APIキー等）
+REDACTED_PARAMS = ('api_key', 'apikey', 'key', 'token', 'c')
+
+# フィクスチャに保存するレスポンスヘッダー
+KEPT_HEADERS = ('Content-Type', 'Content-Encoding', 'Retry-After')
+
+# 代替サーバーがランダムエラーで返すステータス
+ERROR_STATUSES = (500, 502, 503)
+
+
+# ============ フィクスチャ =============
+
+def redact_url(url: str) -> str:
+    """APIキー等を取り除き、クエリをソートしたURL"""
+    parts = urlsplit(url)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in REDACTED_PARAMS
+    )
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path or '/', urlencode(query), ''))
+
+
+def _to_bytes(body: Union[str, bytes, None]) -> bytes:
+    if body is None:
+        return b''
+    if isinstance(body, str):
+        return body.encode('utf-8')
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    # ファイルオブジェクト等（ストリーミング送信）はキー計算に使わない
+    return b''
+
+
+def fixture_key(method: str, url: str, body: Union[str, bytes, None] = None) -> str:
+    """(メソッド, URL, ボディ) からフィクスチャのキーを計算"""
+    digest = hashlib.sha256()
+    digest.update(method.upper().encode('utf-8'))
+    digest.update(b'\n')
+    digest.update(redact_url(url).encode('utf-8'))
+    digest.update(b'\n')
+    digest.update(_to_bytes(body))
+    return digest.hexdigest()[:24]
+
+
+def fixture_path(fixture_dir: str, method: str, url: str, body: Union[str, bytes, None] = None) -> str:
+    """フィクスチャのパス（ホスト名ごとのディレクトリに分ける）"""
+    host = urlsplit(url).netloc.lower().replace(':', '_') or 'unknown'
+    return os.path.join(fixture_dir, host, f"{fixture_key(method, url, body)}.json")
+
+
+def save_fixture(
+    fixture_dir: str,
+    method: str,
+    url: str,
+    body: Union[str, bytes, None],
+    status: int,
+    headers: Dict[str, str],
+    content: bytes
+) -> str:
+    """レスポンスを1ファイルのフィクスチャとして保存し、パスを返す"""
+    try:
+        text = content.decode('utf-8')
+        encoding = 'utf-8'
+    except UnicodeDecodeError:
+        text = base64.b64encode(content).decode('ascii')
+        encoding = 'base64'
+
+    lowered = {k.lower(): v for k, v in headers.items()}
+    fixture = {
+        'key': fixture_key(method, url, body),
+        'method': method.upper(),
+        'url': redact_url(url),
+        'status': status,
+        'headers': {k: lowered[k.lower()] for k in KEPT_HEADERS if lowered.get(k.lower())},
+        'body_encoding': encoding,
+        'body': text,
+        'recorded_at': datetime.now().isoformat(),
+    }
+
+    path = fixture_path(fixture_dir, method, url, body)
+    atomic_write(path, json.dumps(fixture, ensure_ascii=False, indent=2))
+    return path
+
+
+def fixture_body(fixture: Dict) -> bytes:
+    """フィクスチャのボディをバイト列に戻す"""
+    if fixture.get('body_encoding') == 'base64':
+        return base64.b64decode(fixture['body'])
+    return fixture.get('body', '').encode('utf-8')
+
+
+def load_fixtures(fixture_dir: str) -> Dict[str, Dict]:
+    """ディレクトリ内の全フィクスチャを {キー: フィクスチャ} で読み込む"""
+    fixtures = {}
+    for path in sorted(glob(os.path.join(fixture_dir, '*', '*.json'))):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                fixture = json.load(f)
+        except Exception as e:
+            logger.warning(f"Skipped unreadable fixture {path}: {e}")
+            continue
+        fixtures[fixture.get('key') or os.path.splitext(os.path.basename(path))[0]] = fixture
+    return fixtures
+
+
+# ============ クライアント側（requests / urllib の差し替え） =============
+
+_original_session_request = None
+_original_urlopen = None
+_installed_mode = ''
+
+
+def _record_session_request(self, method, url, params=None, data=None, headers=None, **kwargs):
+    response = _original_session_request(self, method, url, params=params, data=data, headers=headers, **kwargs)
+    request = response.request
+    # requestsはボディを展開済み（gzip等は解凍済み）なので Content-Encoding は保存しない
+    response_headers = {k: v for k, v in response.headers.items() if k.lower() != 'content-encoding'}
+    save_fixture(FIXTURE_DIR, request.method, request.url, request.body,
+                 response.status_code, response_headers, response.content)
+    return response
+
+
+def _replay_session_request(self, method, url, params=None, data=None, headers=None, **kwargs):
+    import requests
+
+    prepared = requests.models.PreparedRequest()
+    prepared.prepare_url(url, params)
+
+    replay_headers = dict(headers or {})
+    replay_headers[ORIGINAL_URL_HEADER] = prepared.url
+    return _original_session_request(self, method, f"{REPLAY_URL}/replay", data=data, headers=replay_headers, **kwargs)
+
+
+def _record_urlopen(url, data=None, timeout=None, *args, **kwargs):
+    request = url if isinstance(url, urllib.request.Request) else urllib.request.Request(url, data=data)
+    body = data if data is not None else request.data
+    call_kwargs = {'timeout': timeout} if timeout is not None else {}
+
+    try:
+        response = _original_urlopen(url, data, *args, **call_kwargs, **kwargs)
+    except urllib.error.HTTPError as e:
+        content = e.read()
+        save_fixture(FIXTURE_DIR, request.get_method(), request.full_url, body, e.code, dict(e.headers), content)
+        raise urllib.error.HTTPError(e.url, e.code, e.msg, e.headers, io.BytesIO(content))
+
+    with response:
+        content = response.read()
+        save_fixture(FIXTURE_DIR, request.get_method(), request.full_url, body,
+                     response.status, dict(response.headers), content)
+        # 読み込み済みのボディを呼び出し元でもう一度読めるようにする
+        return urllib.response.addinfourl(io.BytesIO(content), response.headers, response.url, response.status)
+
+
+def _replay_urlopen(url, data=None, timeout=None, *args, **kwargs):
+    request = url if isinstance(url, urllib.request.Request) else urllib.request.Request(url, data=data)
+    body = data if data is not None else request.data
+
+    target = urllib.request.Request(
+        f"{REPLAY_URL}/replay",
+        data=body,
+        headers=dict(request.header_items()),
+        method=request.get_method()
+    )
+    target.add_header(ORIGINAL_URL_HEADER, request.full_url)
+    call_kwargs = {'timeout': timeout} if timeout is not None else {}
+    return _original_urlopen(target, *args, **call_kwargs, **kwargs)
+
+
+def install_http_replay(mode: str = None) -> str:
+    """
+    requests と urllib.request.urlopen を記録・再生用に差し替える
+
+    各取得スクリプトの main() の最初で呼びます。モードが空なら何もしません。
+
+    Args:
+        mode: 'record', 'replay', ''（Noneなら環境変数 MARKET_HTTP_MODE）
+
+    Returns:
+        str: 有効になったモード（''なら通常動作）
+    """
+    global _original_session_request, _original_urlopen, _installed_mode
+
+    mode = HTTP_MODE if mode is None else mode.strip().lower()
+    if not mode:
+        return ''
+    if mode not in MODES:
+        raise ValueError(f"Unknown MARKET_HTTP_MODE: {mode} (expected one of {', '.join(MODES)})")
+    if _installed_mode:
+        return _installed_mode
+
+    _original_urlopen = urllib.request.urlopen
+    urllib.request.urlopen = _record_urlopen if mode == 'record' else _replay_urlopen
+
+    try:
+        import requests
+    except ImportError:
+        requests = None
+
+    if requests is not None:
+        # requests.get/post（investpy含む）は全て Session.request を経由する
+        _original_session_request = requests.Session.request
+        requests.Session.request = _record_session_request if mode == 'record' else _replay_session_request
+
+    _installed_mode = mode
+    if mode == 'record':
+        logger.info(f"HTTP record mode: saving responses to {FIXTURE_DIR}")
+    else:
+        logger.info(f"HTTP replay mode: sending requests to {REPLAY_URL}")
+    return mode
+
+
+def uninstall_http_replay():
+    """install_http_replay() の差し替えを元に戻す"""
+    global _original_session_request, _original_urlopen, _installed_mode
+
+    if _original_urlopen is not None:
+        urllib.request.urlopen = _original_urlopen
+    if _original_session_request is not None:
+        import requests
+        requests.Session.request = _original_session_request
+
+    _original_session_request = None
+    _original_urlopen = None
+    _installed_mode = ''
+
+
+# ============ 代替サーバー =============
+
+class ReplayServer:
+    """フィクスチャを返すローカルHTTPサーバー（遅延・エラー・429を再現）"""
+
+    def __init__(
+        self,
+        fixture_dir: str = FIXTURE_DIR,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: float = None,
+        burst: int = None,
+        seed: int = None,
+        verbose: bool = False
+    ):
+        """
+        Args:
+            fixture_dir: フィクスチャのディレクトリ
+            host, port: 待ち受けるアドレス（port=0なら空いているポート）
+            latency: 1リクエストあたりの遅延（秒）
+            jitter: 遅延に加える 0〜jitter 秒のランダムな揺らぎ
+            error_rate: ランダムに 5xx を返す確率（0〜1）
+            rate_limit: 毎秒のリクエスト上限（超えると 429 + Retry-After）。Noneなら無制限
+            burst: レート制限のバースト許容数
+            seed: 乱数シード（同じシードなら同じ順序でエラー・揺らぎが発生）
+            verbose: リクエスト毎にログを出すか
+        """
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.verbose = verbose
+        self.fixtures = load_fixtures(fixture_dir)
+        self.bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+        self.stats = {'requests': 0, 'hits': 0, 'misses': 0, 'errors': 0, 'throttled': 0}
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _decide(self):
+        """このリクエストの (遅延秒, 429までの待ち秒, エラーにするか) を決める"""
+        with self._lock:
+            self.stats['requests'] += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            retry_after = self.bucket.take() if self.bucket else 0.0
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        return delay, retry_after, fail
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _send(self, status: int, body: bytes, headers: Dict[str, str] = None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, status: int, payload: Dict, headers: Dict[str, str] = None):
+                headers = dict(headers or {}, **{'Content-Type': 'application/json'})
+                self._send(status, json.dumps(payload, ensure_ascii=False).encode('utf-8'), headers)
+
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                original_url = self.headers.get(ORIGINAL_URL_HEADER)
+
+                if not original_url:
+                    self._send_json(400, {'error': f"missing {ORIGINAL_URL_HEADER} header"})
+                    return
+
+                delay, retry_after, fail = server._decide()
+                if delay:
+                    time.sleep(delay)
+
+                if retry_after:
+                    server._count('throttled')
+                    self._send_json(429, {'error': 'rate limited'},
+                                    {'Retry-After': str(max(1, math.ceil(retry_after)))})
+                    return
+
+                if fail:
+                    server._count('errors')
+                    status = server._rng.choice(ERROR_STATUSES)
+                    self._send_json(status, {'error': 'injected failure'})
+                    return
+
+                fixture = server.fixtures.get(fixture_key(self.command, original_url, body))
+                if fixture is None:
+                    server._count('misses')
+                    logger.warning(f"Replay miss: {self.command} {redact_url(original_url)}")
+                    self._send_json(404, {'error': 'no fixture', 'url': redact_url(original_url)})
+                    return
+
+                server._count('hits')
+                self._send(fixture.get('status', 200), fixture_body(fixture), fixture.get('headers'))
+
+            do_GET = _handle
+            do_POST = _handle
+            do_PUT = _handle
+            do_DELETE = _handle
+            do_HEAD = _handle
+
+            def log_message(self, format, *args):
+                if server.verbose:
+                    logger.info("%s - %s", self.address_string(), format % args)
+
+        return Handler
+
+    def serve_forever(self):
+        logger.info(f"Replaying {len(self.fixtures)} fixture(s) from {self.fixture_dir} at {self.url}")
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.httpd.server_close()
+            self.print_stats()
+
+    def start(self) -> str:
+        """バックグラウンドのスレッドで起動し、URLを返す（ベンチマーク等から使う）"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def print_stats(self):
+        logger.info(", ".join(f"{name}: {count}" for name, count in self.stats.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTPレスポンスの記録・再生')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve = subparsers.add_parser('serve', help='記録済みのレスポンスを返す代替サーバーを起動')
+    serve.add_argument('--fixtures', type=str, default=FIXTURE_DIR, help='フィクスチャのディレクトリ')
+    serve.add_argument('--host', type=str, default=DEFAULT_HOST)
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--latency', type=float, default=0.0, help='1リクエストあたりの遅延（秒）')
+    serve.add_argument('--jitter', type=float, default=0.0, help='遅延の揺らぎの最大値（秒）')
+    serve.add_argument('--error-rate', type=float, default=0.0, help='ランダムに5xxを返す確率（0〜1）')
+    serve.add_argument('--rate-limit', type=float, help='毎秒のリクエスト上限（超えると429）')
+    serve.add_argument('--burst', type=int, help='レート制限のバースト許容数')
+    serve.add_argument('--seed', type=int, default=0, help='乱数シード')
+    serve.add_argument('--verbose', action='store_true', help='リクエスト毎にログを出す')
+
+    listing = subparsers.add_parser('list', help='記録済みのフィクスチャを一覧表示')
+    listing.add_argument('--fixtures', type=str, default=FIXTURE_DIR, help='フィクスチャのディレクトリ')
+
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        fixtures = load_fixtures(args.fixtures)
+        for fixture in sorted(fixtures.values(), key=lambda f: f.get('url', '')):
+            print(f"{fixture.get('status')} {fixture.get('method')} {fixture.get('url')}")
+        print(f"{len(fixtures)} fixture(s)")
+        return
+
+    server = ReplayServer(
+        fixture_dir=args.fixtures,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        seed=args.seed,
+        verbose=args.verbose
+    )
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+実行時間の計測（スパン）とカウンター
+
+取得・待機・解析・描画・書き込みの各処理をスパンとして記録し、
+リクエスト数・バイト数・リトライ数・キャッシュヒット数をカウンターで数えます。
+実行の最後に、データの隣（例: market/data/yield_curves/runs/）へ構造化されたJSONの実行レポートを書き出すため、
+1回の実行の所要時間がどこに使われたか（待機なのか取得なのか）を後から追跡できます。
+
+スパンの種類（kind）:
+    'stage'   : パイプラインのステージ（中の他のスパン以外の時間がこの種類に数えられる）
+    'fetch'   : 外部サービスからの取得（1回の取得関数の呼び出し）
+    'request' : 1回のHTTPリクエスト（install_request_counters() で自動記録）
+    'sleep'   : ボット対策・リトライ前の待機
+    'parse'   : 取得結果の解析・正規化
+    'render'  : グラフ描画
+    'write'   : ファイル書き込み
+
+使用例:
+    recorder = start_run('yield_curve')
+    install_request_counters()
+
+    with span('Japan 10Y', kind='fetch', country='japan'):
+        data = fetch(...)
+    sleep(30, 'bot_avoidance')
+    count('retries')
+
+    recorder.write_report('market/data/yield_curves/runs')
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List
+from urllib.parse import urlsplit
+
+from logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+SPAN_KINDS = ('stage', 'fetch', 'request', 'sleep', 'parse', 'render', 'write', 'task')
+REPORT_VERSION = 1
+
+
+class RunRecorder:
+    """1回の実行のスパンとカウンターを記録（スレッドセーフ）"""
+
+    def __init__(self, name: str = 'run'):
+        self.name = name
+        self.started_at = datetime.now()
+        self.spans: List[Dict[str, Any]] = []
+        self.counters: Dict[str, float] = {}
+        self.info: Dict[str, Any] = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[int]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str, kind: str = 'task', **attrs):
+        """with ブロックの実行時間を1つのスパンとして記録"""
+        if kind not in SPAN_KINDS:
+            raise ValueError(f"Unknown span kind: {kind} (expected one of {SPAN_KINDS})")
+
+        stack = self._stack()
+        record = {
+            'id': None,
+            'name': name,
+            'kind': kind,
+            'thread': threading.current_thread().name,
+            'parent': stack[-1] if stack else None,
+            'start_s': time.perf_counter() - self._origin,
+            'duration_s': None,
+            'status': 'ok',
+        }
+        if attrs:
+            record['attrs'] = attrs
+
+        with self._lock:
+            record['id'] = len(self.spans)
+            self.spans.append(record)
+
+        stack.append(record['id'])
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record['status'] = 'error'
+            record['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record['duration_s'] = time.perf_counter() - started
+            stack.pop()
+
+    def count(self, name: str, value: float = 1):
+        """カウンターを加算"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def sleep(self, seconds: float, reason: str = 'delay'):
+        """待機して 'sleep' スパンとして記録"""
+        if seconds <= 0:
+            return
+        with self.span(reason, kind='sleep', seconds=round(seconds, 3)):
+            time.sleep(seconds)
+
+    def set_info(self, key: str, value: Any):
+        """レポートに含める付加情報（パイプラインのクリティカルパス等）"""
+        with self._lock:
+            self.info[key] = value
+
+    def totals_by_kind(self) -> Dict[str, float]:
+        """
+        種類毎の合計時間
+
+        入れ子のスパン（例: fetch の中の request）の時間は内側の種類にだけ数えるため、
+        単一スレッドなら合計は実行時間を超えません。
+        """
+        spans = [record for record in self.spans if record['duration_s'] is not None]
+        children = {}
+        for record in spans:
+            if record['parent'] is not None:
+                children[record['parent']] = children.get(record['parent'], 0.0) + record['duration_s']
+
+        totals = {}
+        for record in spans:
+            own = max(0.0, record['duration_s'] - children.get(record['id'], 0.0))
+            totals[record['kind']] = totals.get(record['kind'], 0.0) + own
+        return totals
+
+    def report(self) -> Dict[str, Any]:
+        """実行レポート（JSON化できる辞書）"""
+        finished_at = datetime.now()
+        errors = sum(1 for record in self.spans if record['status'] == 'error')
+
+        spans = []
+        for record in self.spans:
+            span = dict(record)
+            span['start_s'] = round(span['start_s'], 6)
+            if span['duration_s'] is not None:
+                span['duration_s'] = round(span['duration_s'], 6)
+            spans.append(span)
+
+        return {
+            'version': REPORT_VERSION,
+            'run': self.name,
+            'started_at': self.started_at.isoformat(),
+            'finished_at': finished_at.isoformat(),
+            'duration_s': round(time.perf_counter() - self._origin, 6),
+            'span_errors': errors,
+            'counters': dict(self.counters),
+            'totals_by_kind': {k: round(v, 6) for k, v in sorted(self.totals_by_kind().items())},
+            'info': dict(self.info),
+            'spans': spans,
+        }
+
+    def write_report(self, directory: str, timestamp: str = None) -> str:
+        """実行レポートを <directory>/<name>_run_<timestamp>.json に書き出し、パスを返す"""
+        # output_writer は本モジュールを使うため、循環importを避けてここで読み込む
+        import os
+        from output_writer import atomic_write
+        from serializers import get_serializer
+
+        timestamp = timestamp or self.started_at.strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(directory, f"{self.name}_run_{timestamp}.json")
+        atomic_write(path, get_serializer('pretty').dumps(self.report()))
+        logger.info(f"Saved run report: {path}")
+        return path
+
+    def print_summary(self):
+        """種類毎の合計時間とカウンターを表示"""
+        logger.info("=" * 60)
+        logger.info(f"RUN SUMMARY: {self.name} ({time.perf_counter() - self._origin:.1f}s)")
+        logger.info("=" * 60)
+        for kind, seconds in sorted(self.totals_by_kind().items(), key=lambda item: -item[1]):
+            calls = sum(1 for record in self.spans if record['kind'] == kind)
+            logger.info(f"{kind:<12} {seconds:>10.2f}s  ({calls} spans)")
+        if self.counters:
+            logger.info("-" * 60)
+            for name, value in sorted(self.counters.items()):
+                logger.info(f"{name:<24} {value:>12,.0f}")
+        logger.info("=" * 60)
+
+
+# ============ 現在の実行（モジュール関数から使う） =============
+
+_current = RunRecorder()
+
+
+def get_recorder() -> RunRecorder:
+    return _current
+
+
+def start_run(name: str) -> RunRecorder:
+    """新しい実行を開始し、以降のspan()/count()/sleep()の記録先にする"""
+    global _current
+    _current = RunRecorder(name)
+    return _current
+
+
+def span(name: str, kind: str = 'task', **attrs):
+    return _current.span(name, kind, **attrs)
+
+
+def count(name: str, value: float = 1):
+    _current.count(name, value)
+
+
+def sleep(seconds: float, reason: str = 'delay'):
+    _current.sleep(seconds, reason)
+
+
+# ============ HTTPリクエストの自動計測 =============
+
+_original_session_request = None
+_original_urlopen = None
+
+
+def _counted_session_request(self, method, url, *args, **kwargs):
+    host = urlsplit(url).netloc
+    with span(f"{method.upper()} {host}", kind='request', host=host) as record:
+        response = _original_session_request(self, method, url, *args, **kwargs)
+        record['attrs']['status'] = response.status_code
+
+    count('requests')
+    if kwargs.get('stream'):
+        # stream=True のボディは読んだ分だけ数える（.content に触れると全体を読み込んでしまう）
+        _count_streamed_bytes(response)
+    else:
+        count('bytes', len(response.content))
+    if response.status_code == 429:
+        count('throttled')
+    elif response.status_code >= 400:
+        count('request_errors')
+    return response
+
+
+def _count_streamed_bytes(response):
+    """レスポンスの iter_content を包み、読み出したチャンクの大きさを 'bytes' に加える"""
+    iter_content = response.iter_content
+
+    def counted_iter_content(*args, **kwargs):
+        for chunk in iter_content(*args, **kwargs):
+            count('bytes', len(chunk))
+            yield chunk
+
+    response.iter_content = counted_iter_content
+
+
+def _counted_urlopen(url, *args, **kwargs):
+    import urllib.error
+
+    full_url = url.full_url if hasattr(url, 'full_url') else url
+    host = urlsplit(full_url).netloc
+    count('requests')
+    try:
+        with span(f"{'POST' if args and args[0] is not None else 'GET'} {host}", kind='request', host=host):
+            response = _original_urlopen(url, *args, **kwargs)
+    except urllib.error.HTTPError as e:
+        count('throttled' if e.code == 429 else 'request_errors')
+        raise
+
+    length = response.headers.get('Content-Length')
+    if length and length.isdigit():
+        count('bytes', int(length))
+    return response
+
+
+def install_request_counters():
+    """requests（investpy含む）と urllib.request.urlopen のリクエストをスパン・カウンターで記録"""
+    global _original_session_request, _original_urlopen
+    import urllib.request
+
+    if _original_urlopen is None:
+        _original_urlopen = urllib.request.urlopen
+        urllib.request.urlopen = _counted_urlopen
+
+    try:
+        import requests
+    except ImportError:
+        return
+
+    if _original_session_request is None:
+        _original_session_request = requests.Session.request
+        requests.Session.request = _counted_session_request
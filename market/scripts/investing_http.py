@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+Investing.com のHTTPのみの取得バックエンド
+
+経済カレンダーと国債の過去データを、ブラウザ（Chromium/chromedriver）もinvestpyも使わずに
+requestsだけで取得します。economic_calendar.EconomicCalendarScraper のセッション
+（ブラウザと同じUser-Agentを付けたrequests.Session）をそのまま使います。
+
+戻り値はinvestpyと同じ形なので、呼び出し側は置き換えるだけで使えます:
+    economic_calendar()         : investpy.economic_calendar() と同じ列の辞書のリスト
+    get_bond_historical_data()  : investpy.bonds.get_bond_historical_data() と同じ
+                                  Open/High/Low/Close 列・Date索引のDataFrame
+    get_bonds_overview()        : investpy.bonds.get_bonds_overview() と同じ列の辞書のリスト
+                                  （1回のリクエストで国の全年限の国債）
+    get_overview()              : 国債・株価指数・コモディティ・通貨ペアの一覧ページ
+                                  （1回のリクエストでグループの全銘柄）
+
+バックエンドの切り替え（環境変数）:
+    MARKET_INVESTING_BACKEND=http     : HTTPのみ（既定）。失敗時にinvestpyがあればフォールバック
+    MARKET_INVESTING_BACKEND=investpy : 従来どおりinvestpyを使う
+
+使用例:
+    from investing_http import economic_calendar, get_bond_historical_data
+
+    rows = economic_calendar(['japan'], '01/02/2026', '03/02/2026', time_zone='GMT +9:00')
+    df = get_bond_historical_data('Japan 10Y', '01/02/2026', '08/02/2026')
+    bonds = get_bonds_overview('japan')
+"""
+
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import lxml.html
+import pandas as pd
+
+from economic_calendar import EconomicCalendarScraper
+from logging_setup import get_logger
+
+# investpyはフォールバック用（なくても動く）
+try:
+    import investpy
+except ImportError:
+    investpy = None
+
+logger = get_logger(__name__)
+
+BACKENDS = ('http', 'investpy')
+BACKEND = os.getenv('MARKET_INVESTING_BACKEND', 'http').strip().lower()
+
+CALENDAR_URL = "https://www.investing.com/economic-calendar/Service/getCalendarFilteredData"
+SEARCH_URL = "https://api.investing.com/api/search/v2/search"
+HISTORY_URL = "https://api.investing.com/api/financialdata/historical/{id}"
+
+# 一覧ページ（銘柄の種類 -> URL）。どれも同じ形の表（<table id="cr1">）で、1回のリクエストでグループの全銘柄が取れる
+#   bonds       : 国の国債（group は国名）
+#   indices     : 国の株価指数（group は国名）
+#   commodities : コモディティ（group は 'metals', 'energy', 'grains', 'softs', 'meats'）
+#   currencies  : 通貨ペア（group は基準通貨 'usd', 'jpy' 等）
+OVERVIEW_URLS = {
+    'bonds': "https://www.investing.com/rates-bonds/{slug}-government-bonds",
+    'indices': "https://www.investing.com/indices/{slug}-indices",
+    'commodities': "https://www.investing.com/commodities/{slug}",
+    'currencies': "https://www.investing.com/currencies/single-currency-crosses?currency={slug}",
+}
+
+# 一覧ページのURLで国名と異なる表記の国（それ以外は空白をハイフンにした国名）
+OVERVIEW_SLUGS = {
+    'united states': 'usa',
+    'united kingdom': 'uk',
+}
+
+# Investing.comのカレンダーで使う国ID（investpyと同じ）
+COUNTRY_IDS = {
+    'united states': 5,
+    'japan': 35,
+    'united kingdom': 4,
+    'euro zone': 72,
+    'germany': 17,
+    'france': 22,
+    'italy': 10,
+    'spain': 26,
+    'china': 37,
+    'australia': 25,
+    'canada': 6,
+    'switzerland': 12,
+    'new zealand': 43,
+}
+
+IMPORTANCE_LEVELS = {'1': 'low', '2': 'medium', '3': 'high'}
+TIME_FILTERS = {'time_only': 'timeOnly', 'time_remaining': 'timeRemain'}
+
+# カレンダーは常にGMTで取得し、時刻の変換は手元で行う（タイムゾーンIDの対応表が不要になる）。
+# 現地の日付とGMTの日付は最大1日ずれるため、GMTでは前後 CALENDAR_MARGIN_DAYS 日広く取得して
+# 変換後の現地の日付で絞り込む
+GMT_TIMEZONE_ID = 55
+CALENDAR_MARGIN_DAYS = 1
+TIME_ZONE_PATTERN = re.compile(r'^GMT\s*([+-])\s*(\d{1,2}):(\d{2})$')
+TIME_PATTERN = re.compile(r'^\d{1,2}:\d{2}$')
+
+# 国債名の年限（'Japan 10Y' -> 10年、'U.S. 3M' -> 0.25年）
+TENOR_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(Y|M)(?:ear|onth)?s?\b', re.IGNORECASE)
+
+MAX_CALENDAR_PAGES = 50
+
+
+class InvestingHttpClient(EconomicCalendarScraper):
+    """EconomicCalendarScraper のセッションで Investing.com の内部APIを呼ぶクライアント"""
+
+    def __init__(self):
+        super().__init__()
+        self.session.headers.update({
+            'Accept-Language': 'en-US,en;q=0.9',
+            'X-Requested-With': 'XMLHttpRequest',
+        })
+        self._bond_ids: Dict[str, int] = {}
+
+    # ============ 経済カレンダー =============
+
+    def economic_calendar(
+        self,
+        countries: List[str],
+        from_date: str,
+        to_date: str,
+        time_zone: str = None,
+        time_filter: str = 'time_only',
+        importances: List[str] = None
+    ) -> List[Dict]:
+        """
+        経済カレンダーを取得（investpy.economic_calendar() と同じ引数・列）
+
+        Args:
+            countries: 国名のリスト（'japan', 'united states'等）
+            from_date: 開始日 (dd/mm/YYYY)
+            to_date: 終了日 (dd/mm/YYYY)
+            time_zone: 'GMT +9:00' 形式（NoneならGMT）
+            time_filter: 'time_only' または 'time_remaining'
+            importances: 'low' / 'medium' / 'high' のリスト（Noneなら全て）
+        """
+        unknown = [country for country in countries if country.lower() not in COUNTRY_IDS]
+        if unknown:
+            raise ValueError(f"Unknown country: {', '.join(unknown)}")
+        if time_filter not in TIME_FILTERS:
+            raise ValueError(f"Unknown time_filter: {time_filter} (expected one of {', '.join(TIME_FILTERS)})")
+
+        offset = parse_time_zone(time_zone)
+        start = datetime.strptime(from_date, '%d/%m/%Y')
+        end = datetime.strptime(to_date, '%d/%m/%Y')
+        margin = timedelta(days=CALENDAR_MARGIN_DAYS) if offset else timedelta(0)
+        levels = {name: level for level, name in IMPORTANCE_LEVELS.items()}
+
+        # 同じキー（country[] 等）を複数送るため、辞書ではなくタプルのリストで渡す
+        filters = [('country[]', COUNTRY_IDS[country.lower()]) for country in countries]
+        if importances:
+            filters += [('importance[]', levels[importance]) for importance in importances]
+        fields = {
+            'dateFrom': (start - margin).strftime('%Y-%m-%d'),
+            'dateTo': (end + margin).strftime('%Y-%m-%d'),
+            'timeZone': GMT_TIMEZONE_ID,
+            'timeFilter': TIME_FILTERS[time_filter],
+            'currentTab': 'custom',
+            'submitFilters': 1,
+            'limit_from': 0,
+        }
+
+        # 件数が多いと続きを bind_scroll_handler で知らせてくるので、ページ送りで全件取得
+        rows = []
+        for page in range(MAX_CALENDAR_PAGES):
+            fields['limit_from'] = page
+            response = self.session.post(CALENDAR_URL, data=filters + list(fields.items()),
+                                         headers={'Referer': self.BASE_URL}, timeout=30)
+            response.raise_for_status()
+            payload = response.json()
+
+            rows.extend(parse_calendar_rows(payload.get('data', ''), offset))
+            if not payload.get('bind_scroll_handler') or not payload.get('data'):
+                break
+            fields['last_time_scope'] = payload.get('last_time_scope')
+
+        if margin:
+            # 前後に広げた分を、現地の日付で指定の期間に戻す
+            rows = [
+                row for row in rows
+                if row['date'] is not None and start <= datetime.strptime(row['date'], '%d/%m/%Y') <= end
+            ]
+        return rows
+
+    # ============ 国債の過去データ =============
+
+    def search_bond(self, name: str) -> int:
+        """国債名（investpyの名前: 'Japan 10Y' 等）から Investing.com の銘柄IDを検索"""
+        if name in self._bond_ids:
+            return self._bond_ids[name]
+
+        response = self.session.get(SEARCH_URL, params={'q': name}, headers={'domain-id': 'www'}, timeout=30)
+        response.raise_for_status()
+        quotes = response.json().get('quotes', [])
+
+        bonds = [quote for quote in quotes if 'bond' in str(quote.get('type', '')).lower()]
+        if not bonds:
+            raise LookupError(f"Bond not found: {name}")
+
+        self._bond_ids[name] = int(bonds[0]['id'])
+        return self._bond_ids[name]
+
+    def get_bond_historical_data(
+        self,
+        bond: str,
+        from_date: str,
+        to_date: str,
+        order: str = 'ascending'
+    ) -> pd.DataFrame:
+        """
+        国債の日次データを取得（investpy.bonds.get_bond_historical_data() と同じ形）
+
+        Args:
+            bond: 国債名（'Japan 10Y' 等）
+            from_date: 開始日 (dd/mm/YYYY)
+            to_date: 終了日 (dd/mm/YYYY)
+            order: 'ascending' または 'descending'
+        """
+        bond_id = self.search_bond(bond)
+        params = {
+            'start-date': datetime.strptime(from_date, '%d/%m/%Y').strftime('%Y-%m-%d'),
+            'end-date': datetime.strptime(to_date, '%d/%m/%Y').strftime('%Y-%m-%d'),
+            'time-frame': 'Daily',
+            'add-missing-rows': 'false',
+        }
+        response = self.session.get(HISTORY_URL.format(id=bond_id), params=params,
+                                    headers={'domain-id': 'www'}, timeout=30)
+        response.raise_for_status()
+
+        records = [
+            {
+                'Date': pd.Timestamp(row['rowDateTimestamp'][:10]),
+                'Open': row.get('last_openRaw'),
+                'High': row.get('last_maxRaw'),
+                'Low': row.get('last_minRaw'),
+                'Close': row.get('last_closeRaw'),
+            }
+            for row in response.json().get('data') or []
+        ]
+        if not records:
+            return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close'])
+
+        df = pd.DataFrame.from_records(records, index='Date').astype(float)
+        return df.sort_index(ascending=(order == 'ascending'))
+
+    # ============ 一覧（グループの全銘柄） =============
+
+    def get_overview(self, kind: str, group: str) -> List[Dict]:
+        """
+        一覧ページを1回のリクエストで取得
+
+        Args:
+            kind: 'bonds', 'indices', 'commodities', 'currencies'
+            group: 国名（bonds, indices）・コモディティの分類・基準通貨
+
+        Returns:
+            list: name, last, last_close, high, low, change, change_percentage, date の辞書のリスト
+        """
+        if kind not in OVERVIEW_URLS:
+            raise ValueError(f"Unknown overview kind: {kind} (expected one of {', '.join(OVERVIEW_URLS)})")
+
+        group = group.lower()
+        slug = OVERVIEW_SLUGS.get(group, group.replace(' ', '-'))
+        response = self.session.get(OVERVIEW_URLS[kind].format(slug=slug),
+                                    headers={'Referer': self.BASE_URL}, timeout=30)
+        response.raise_for_status()
+
+        rows = parse_overview_table(response.content)
+        if not rows:
+            raise LookupError(f"Overview table not found: {kind}/{group}")
+        for row in rows:
+            row['group'] = group
+        return rows
+
+    def get_bonds_overview(self, country: str) -> List[Dict]:
+        """国の国債一覧を1回のリクエストで取得（investpy.bonds.get_bonds_overview() と同じ列）"""
+        rows = self.get_overview('bonds', country)
+        for row in rows:
+            row['country'] = row['group']
+        return rows
+
+
+def parse_time_zone(time_zone: Optional[str]) -> timedelta:
+    """'GMT +9:00' 形式をGMTからの差に変換（Noneや'GMT'は0）"""
+    if not time_zone or time_zone.strip().upper() == 'GMT':
+        return timedelta(0)
+
+    match = TIME_ZONE_PATTERN.match(time_zone.strip())
+    if not match:
+        raise ValueError(f"Unknown time_zone: {time_zone} (expected 'GMT +9:00' format)")
+
+    sign, hours, minutes = match.groups()
+    offset = timedelta(hours=int(hours), minutes=int(minutes))
+    return -offset if sign == '-' else offset
+
+
+def parse_calendar_rows(html: str, offset: timedelta = timedelta(0)) -> List[Dict]:
+    """
+    getCalendarFilteredData が返すHTML（<tr>の並び）をinvestpyと同じ列の辞書に変換
+
+    日付は日付行（theDay<UNIX時刻>）から取り、時刻付きのイベントはGMTから offset だけずらします
+    （日付をまたぐ場合は日付も変わります）。
+    """
+    if not html or not html.strip():
+        return []
+
+    root = lxml.html.fragment_fromstring(f"<table>{html}</table>")
+    rows = []
+    current_date = None
+
+    for tr in root.iter('tr'):
+        row_id = tr.get('id') or ''
+        if not row_id.startswith('eventRowId_'):
+            day = tr.find('td')
+            day_id = day.get('id', '') if day is not None else ''
+            if day_id.startswith('theDay'):
+                current_date = datetime.fromtimestamp(int(day_id[len('theDay'):]), timezone.utc).replace(tzinfo=None)
+            continue
+
+        event_id = row_id[len('eventRowId_'):]
+        event = {
+            'id': event_id, 'date': None, 'time': None, 'zone': None, 'currency': None,
+            'importance': None, 'event': None, 'actual': None, 'forecast': None, 'previous': None,
+        }
+
+        for td in tr.iterfind('td'):
+            classes = (td.get('class') or '').split()
+            cell_id = td.get('id') or ''
+            text = td.text_content().strip() or None
+
+            if 'first' in classes and 'time' in classes:
+                event['time'] = text
+            elif 'flagCur' in classes:
+                flag = td.find('span')
+                event['zone'] = flag.get('title', '').lower() if flag is not None else None
+                event['currency'] = text
+            elif 'sentiment' in classes:
+                key = (td.get('data-img_key') or '').replace('bull', '')
+                event['importance'] = IMPORTANCE_LEVELS.get(key)
+            elif 'event' in classes:
+                event['event'] = text
+            elif cell_id == f"eventActual_{event_id}":
+                event['actual'] = text
+            elif cell_id == f"eventForecast_{event_id}":
+                event['forecast'] = text
+            elif cell_id == f"eventPrevious_{event_id}":
+                event['previous'] = text
+
+        event_date = current_date
+        if event_date is not None and event['time'] and TIME_PATTERN.match(event['time']):
+            hours, minutes = event['time'].split(':')
+            local = event_date.replace(hour=int(hours), minute=int(minutes)) + offset
+            event_date = local
+            event['time'] = local.strftime('%H:%M')
+        event['date'] = event_date.strftime('%d/%m/%Y') if event_date is not None else None
+
+        rows.append(event)
+
+    return rows
+
+
+def _to_float(text: Optional[str]) -> Optional[float]:
+    """'1,234.5' / '+0.012' / '-0.45%' を数値に（空や '-' はNone）"""
+    text = (text or '').strip().replace(',', '').rstrip('%')
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def parse_overview_table(content) -> List[Dict]:
+    """
+    一覧ページ（国債・株価指数・コモディティ・通貨ペア）の表を辞書のリストに変換
+
+    各行の数値セルは pid-<銘柄ID>-last 等のクラスで見分けます（investpyと同じ）。
+    表が見つからなければ空のリストを返します。
+    """
+    root = lxml.html.fromstring(content)
+    rows = []
+
+    for tr in root.xpath(".//table[@id='cr1']/tbody/tr"):
+        pair_id = (tr.get('id') or '').replace('pair_', '')
+        name = tr.xpath(".//td[contains(@class, 'elp')]/a")
+        if not pair_id or not name:
+            continue
+
+        cells = {}
+        for td in tr.iterfind('td'):
+            for cls in (td.get('class') or '').split():
+                if cls.startswith(f"pid-{pair_id}-"):
+                    cells[cls[len(f"pid-{pair_id}-"):]] = td.text_content()
+
+        date = None
+        time_cell = tr.xpath(".//td[contains(@class, 'time')]")
+        if time_cell and (time_cell[0].get('data-value') or '').isdigit():
+            date = datetime.fromtimestamp(int(time_cell[0].get('data-value')), timezone.utc).strftime('%Y-%m-%d')
+
+        rows.append({
+            'name': name[0].text_content().strip(),
+            # 通貨ペアの一覧は last の代わりに bid の列
+            'last': _to_float(cells.get('last') or cells.get('bid')),
+            'last_close': _to_float(cells.get('last_close')),
+            'high': _to_float(cells.get('high')),
+            'low': _to_float(cells.get('low')),
+            'change': _to_float(cells.get('pc')),
+            'change_percentage': _to_float(cells.get('pcp')),
+            'date': date,
+        })
+
+    return rows
+
+
+def parse_tenor(name: str) -> Optional[float]:
+    """国債名から年限（年）を取り出す（'Japan 10Y' -> 10、'U.S. 6M' -> 0.5、なければNone）"""
+    match = TENOR_PATTERN.search(name or '')
+    if not match:
+        return None
+    value, unit = float(match.group(1)), match.group(2).upper()
+    return value / 12 if unit == 'M' else value
+
+
+# ============ バックエンドの切り替え =============
+
+_local = threading.local()
+
+
+def get_client() -> InvestingHttpClient:
+    """スレッド毎のクライアント（国別の並列取得でもセッションを共有しない）"""
+    if not hasattr(_local, 'client'):
+        _local.client = InvestingHttpClient()
+    return _local.client
+
+
+def _use_investpy() -> bool:
+    if BACKEND not in BACKENDS:
+        raise ValueError(f"Unknown MARKET_INVESTING_BACKEND: {BACKEND} (expected one of {', '.join(BACKENDS)})")
+    if BACKEND == 'investpy' and investpy is None:
+        raise ImportError("MARKET_INVESTING_BACKEND=investpy but investpy is not installed")
+    return BACKEND == 'investpy'
+
+
+def _investpy_calendar(countries, from_date, to_date, time_zone, time_filter):
+    return investpy.economic_calendar(countries=countries, from_date=from_date, to_date=to_date,
+                                      time_filter=time_filter, time_zone=time_zone).to_dict('records')
+
+
+def economic_calendar(countries, from_date, to_date, time_zone=None, time_filter='time_only'):
+    """
+    経済カレンダーを選択中のバックエンドで取得（HTTPで失敗したらinvestpyにフォールバック）
+
+    どのバックエンドでも辞書のリストを返します（investpyのDataFrameも変換）。
+    """
+    if _use_investpy():
+        return _investpy_calendar(countries, from_date, to_date, time_zone, time_filter)
+    try:
+        return get_client().economic_calendar(countries, from_date, to_date, time_zone, time_filter)
+    except Exception as e:
+        if investpy is None:
+            raise
+        logger.warning(f"HTTP backend failed ({type(e).__name__}: {e}), falling back to investpy")
+        return _investpy_calendar(countries, from_date, to_date, time_zone, time_filter)
+
+
+def get_bond_historical_data(bond, from_date, to_date, order='ascending'):
+    """国債の過去データを選択中のバックエンドで取得（HTTPで失敗したらinvestpyにフォールバック）"""
+    if _use_investpy():
+        return investpy.bonds.get_bond_historical_data(bond, from_date=from_date, to_date=to_date,
+                                                       as_json=False, order=order)
+    try:
+        return get_client().get_bond_historical_data(bond, from_date, to_date, order)
+    except Exception as e:
+        if investpy is None:
+            raise
+        logger.warning(f"HTTP backend failed for {bond} ({type(e).__name__}: {e}), falling back to investpy")
+        return investpy.bonds.get_bond_historical_data(bond, from_date=from_date, to_date=to_date,
+                                                       as_json=False, order=order)
+
+
+# 一覧の種類 -> investpyの対応する関数（フォールバック用）
+_INVESTPY_OVERVIEWS = {
+    'bonds': lambda group: investpy.bonds.get_bonds_overview(group, as_json=False),
+    'indices': lambda group: investpy.indices.get_indices_overview(group, as_json=False),
+    'commodities': lambda group: investpy.commodities.get_commodities_overview(group, as_json=False),
+    'currencies': lambda group: investpy.currency_crosses.get_currency_crosses_overview(group.upper(), as_json=False),
+}
+
+
+def _investpy_overview(kind, group):
+    rows = _INVESTPY_OVERVIEWS[kind](group).to_dict('records')
+    for row in rows:
+        row['group'] = group.lower()
+    return rows
+
+
+def get_overview(kind, group):
+    """一覧ページを選択中のバックエンドで取得（HTTPで失敗したらinvestpyにフォールバック）"""
+    if _use_investpy():
+        return _investpy_overview(kind, group)
+    try:
+        return get_client().get_overview(kind, group)
+    except Exception as e:
+        if investpy is None or kind not in _INVESTPY_OVERVIEWS:
+            raise
+        logger.warning(f"HTTP backend failed for {kind}/{group} ({type(e).__name__}: {e}), falling back to investpy")
+        return _investpy_overview(kind, group)
+
+
+def get_bonds_overview(country):
+    """国の国債一覧を選択中のバックエンドで取得（HTTPで失敗したらinvestpyにフォールバック）"""
+    return get_overview('bonds', country)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+共通のログ設定
+
+各スクリプトの進捗表示（print）をレベル付きのloggingに置き換えるための共通設定です。
+
+- レベル: DEBUG（1件毎の詳細）/ INFO（進捗）/ WARNING / ERROR
+- 形式: 'text'（INFOはメッセージのみ、それ以外はレベル付き）または 'json'（1行1レコード）
+- Progress: 大量のループでも一定間隔（既定5秒）でしか出力しない進捗表示
+- quiet: WARNING以上のみ。無効なレベルのログはフォーマットされないため、
+  ホットループでは `if debug:`（isEnabledForを事前に評価した値）で囲めばコストはほぼゼロ
+
+設定は環境変数またはコマンドライン引数で変更できます:
+    MARKET_LOG_LEVEL  : DEBUG / INFO / WARNING / ERROR（既定: INFO）
+    MARKET_LOG_FORMAT : text / json（既定: text）
+    MARKET_QUIET      : 1 ならWARNING以上のみ
+
+使用例:
+    logger = get_logger(__name__)
+
+    def main():
+        parser = argparse.ArgumentParser()
+        add_logging_arguments(parser)
+        args = parser.parse_args()
+        setup_logging_from_args(args)
+
+        progress = Progress(logger, 'events', total=len(events))
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for event in events:
+            if debug:
+                logger.debug("event %s: %s", event['time'], event['event'])
+            progress.update()
+        progress.done()
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Optional
+
+ROOT_LOGGER = 'market'
+LOG_LEVEL = os.getenv('MARKET_LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('MARKET_LOG_FORMAT', 'text').lower()
+QUIET = os.getenv('MARKET_QUIET', '').lower() in ('1', 'true', 'yes')
+
+LOG_FORMATS = ('text', 'json')
+PROGRESS_INTERVAL = 5.0
+
+# LogRecordの標準属性（これ以外は extra= で渡された構造化フィールドとしてJSONに含める）
+_STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class TextFormatter(logging.Formatter):
+    """INFOはメッセージのみ（従来のprintと同じ見た目）、それ以外はレベルを付ける"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        if record.levelno == logging.INFO:
+            return message
+        return f"{record.levelname}: {message}"
+
+
+class JsonFormatter(logging.Formatter):
+    """1行1レコードのJSON（extra= で渡したフィールドも含める）"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class StdoutHandler(logging.StreamHandler):
+    """出力時点の sys.stdout に書くハンドラー（redirect_stdout でもprintと同じように捕捉される）"""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    'market' 配下のロガー（get_logger(__name__) で使う）
+
+    setup_logging() がまだ呼ばれていなければ環境変数の設定で初期化するため、
+    ライブラリとして読み込まれた場合もINFOの進捗は従来どおり標準出力に出ます。
+    """
+    if not logging.getLogger(ROOT_LOGGER).handlers:
+        setup_logging()
+    name = name.rsplit('.', 1)[-1]
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def setup_logging(level: str = None, fmt: str = None, quiet: bool = None, stream=None) -> logging.Logger:
+    """
+    'market' ロガーにハンドラーを設定（何度呼んでも1つだけ）
+
+    Args:
+        level: ログレベル（Noneなら MARKET_LOG_LEVEL）
+        fmt: 'text' または 'json'（Noneなら MARKET_LOG_FORMAT）
+        quiet: TrueならWARNING以上のみ（Noneなら MARKET_QUIET）
+        stream: 出力先（Noneなら標準出力。従来のprintと同じ）
+    """
+    fmt = (fmt or LOG_FORMAT).lower()
+    if fmt not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format: {fmt} (expected one of {', '.join(LOG_FORMATS)})")
+
+    quiet = QUIET if quiet is None else quiet
+    level = 'WARNING' if quiet else (level or LOG_LEVEL).upper()
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(level)
+    logger.propagate = False
+
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream) if stream is not None else StdoutHandler()
+    handler.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter('%(message)s'))
+    logger.addHandler(handler)
+    return logger
+
+
+def describe_error(e: BaseException) -> str:
+    """
+    例外をログ用の短い文字列に（例外の種類とHTTPの状態だけ）
+
+    requestsの例外のメッセージにはURL（クエリのAPIキーを含む）が入るため、メッセージ自体は出しません。
+    """
+    status = getattr(getattr(e, 'response', None), 'status_code', None)
+    return f"{type(e).__name__}{f' (HTTP {status})' if status else ''}"
+
+
+def add_logging_arguments(parser):
+    """--log-level, --log-format, --quiet を argparse に追加"""
+    group = parser.add_argument_group('logging')
+    group.add_argument('--log-level', type=str.upper, default=None,
+                       choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], help='ログレベル（既定: INFO）')
+    group.add_argument('--log-format', type=str.lower, default=None, choices=LOG_FORMATS,
+                       help='ログ形式（既定: text）')
+    group.add_argument('-q', '--quiet', action='store_true', default=None, help='WARNING以上のみ表示')
+
+
+def setup_logging_from_args(args) -> logging.Logger:
+    """add_logging_arguments() で追加した引数からログを設定"""
+    return setup_logging(
+        level=getattr(args, 'log_level', None),
+        fmt=getattr(args, 'log_format', None),
+        quiet=getattr(args, 'quiet', None)
+    )
+
+
+class Progress:
+    """
+    レート制限付きの進捗表示
+
+    update() は件数を数えるだけで、前回の出力から interval 秒以上経った時だけログを出します。
+    ロガーのレベルで無効になっている場合は時刻も取得しません。
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        label: str,
+        total: Optional[int] = None,
+        interval: float = PROGRESS_INTERVAL,
+        level: int = logging.INFO
+    ):
+        self.logger = logger
+        self.label = label
+        self.total = total
+        self.interval = interval
+        self.level = level
+        self.count = 0
+        self.enabled = logger.isEnabledFor(level)
+        self._started = time.monotonic() if self.enabled else 0.0
+        self._last = self._started
+
+    def update(self, n: int = 1):
+        self.count += n
+        if not self.enabled:
+            return
+
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            self._log(now)
+
+    def _log(self, now: float, final: bool = False):
+        elapsed = now - self._started
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        total = f"/{self.total}" if self.total is not None else ''
+        state = 'done' if final else 'progress'
+        self.logger.log(
+            self.level,
+            "%s %s: %d%s (%.1fs, %.1f/s)", self.label, state, self.count, total, elapsed, rate,
+            extra={'progress': self.label, 'count': self.count, 'total': self.total, 'elapsed_s': round(elapsed, 3)}
+        )
+
+    def done(self):
+        """最終的な件数を出力"""
+        if self.enabled:
+            self._log(time.monotonic(), final=True)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Markdownレポート共通レンダラー
+
+各スクリプトのsave_markdownで手書きしていた表（list.append + f-string）を共通化します。
+
+- TableSchema: 列定義から、ヘッダー行・区切り行・行フォーマッタを一度だけ組み立てる
+  （ヘッダーと区切りの列数は常に一致する）
+- MarkdownReport: ファイルオブジェクトに1行ずつ直接書き出す（行リストを溜め込まない）
+- day_sections: 昨日・今日・明日の予定ブロックの共通実装
+
+使用例:
+    schema = TableSchema(
+        Column('時刻', 'time'),
+        Column('指標', 'event'),
+        Column('予想', 'forecast'),
+    )
+    with open(filename, 'w', encoding='utf-8') as f:
+        report = MarkdownReport(f)
+        report.title('経済カレンダー')
+        report.table(schema, events)
+"""
+
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterable, TextIO, Union
+
+# 予定ブロックのキー -> (見出しラベル, 今日からの日数。Noneなら日付を表示しない)
+DAY_LABELS = {
+    'yesterday': ('昨日', -1),
+    'today': ('今日', 0),
+    'tomorrow': ('明日', 1),
+    'this_week': ('今週', None),
+}
+
+
+def _escape_cell(text: str) -> str:
+    """表のセルを壊す文字をエスケープ"""
+    if '|' in text:
+        text = text.replace('|', '\\|')
+    if '\n' in text:
+        text = text.replace('\n', ' ')
+    return text
+
+
+class Column:
+    """表の列定義"""
+
+    __slots__ = ('header', 'key', 'fmt', 'default')
+
+    def __init__(
+        self,
+        header: str,
+        key: Union[str, Callable[[Any], Any]],
+        fmt: Union[str, Callable[[Any], str]] = None,
+        default: str = 'N/A'
+    ):
+        """
+        Args:
+            header: 見出し
+            key: 行(dict)のキー、または行から値を取り出す関数
+            fmt: 書式（'{:.2f}%' のようなformat文字列、または値を文字列にする関数）
+            default: 値がない（None）場合の表示
+        """
+        self.header = header
+        self.key = key
+        self.fmt = fmt
+        self.default = default
+
+    def compile(self) -> Callable[[Any], str]:
+        """行 -> セル文字列 の関数を組み立てる"""
+        key = self.key
+        getter = key if callable(key) else (lambda row: row.get(key))
+
+        if self.fmt is None:
+            formatter = str
+        elif isinstance(self.fmt, str):
+            formatter = self.fmt.format
+        else:
+            formatter = self.fmt
+
+        default = self.default
+
+        def cell(row) -> str:
+            value = getter(row)
+            if value is None:
+                return default
+            return _escape_cell(formatter(value))
+
+        return cell
+
+
+class TableSchema:
+    """列定義から組み立てた表フォーマッタ"""
+
+    def __init__(self, *columns: Column):
+        if not columns:
+            raise ValueError("TableSchema needs at least one column")
+
+        self.columns = columns
+        self.header_line = '| ' + ' | '.join(c.header for c in columns) + ' |\n'
+        self.separator_line = '|' + '|'.join('-' * max(3, len(c.header) + 2) for c in columns) + '|\n'
+        self._cells = tuple(c.compile() for c in columns)
+
+    def format_row(self, row) -> str:
+        """1行分のMarkdownを返す"""
+        return '| ' + ' | '.join([cell(row) for cell in self._cells]) + ' |\n'
+
+    def write(self, f: TextIO, rows: Iterable) -> int:
+        """表（ヘッダー + 行）を書き出し、行数を返す"""
+        f.write(self.header_line)
+        f.write(self.separator_line)
+
+        count = 0
+        format_row = self.format_row
+        for row in rows:
+            f.write(format_row(row))
+            count += 1
+        return count
+
+
+class MarkdownReport:
+    """ファイルオブジェクトに直接書き出すMarkdownレポート"""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+
+    def line(self, text: str = ''):
+        self.f.write(f"{text}\n")
+
+    def title(self, text: str):
+        self.heading(text, level=1)
+
+    def heading(self, text: str, level: int = 2):
+        self.f.write(f"{'#' * level} {text}\n\n")
+
+    def meta(self, label: str, value: Any):
+        """**ラベル**: 値 の行"""
+        self.f.write(f"**{label}**: {value}\n")
+
+    def table(self, schema: TableSchema, rows: Iterable) -> int:
+        """表と後続の空行を書き出し、行数を返す"""
+        count = schema.write(self.f, rows)
+        self.f.write('\n')
+        return count
+
+    def grouped_tables(
+        self,
+        schema: TableSchema,
+        rows: Iterable[Dict],
+        key: str,
+        level: int = 2
+    ) -> int:
+        """
+        key の値が連続する行ごとに見出し付きの表を書き出す
+
+        rows は key の順に並んでいる必要があります（1パス・追加メモリなしで処理するため）。
+        """
+        total = 0
+        for value, group in groupby(rows, key=lambda row: row.get(key)):
+            self.heading(value, level)
+            total += self.table(schema, group)
+        return total
+
+    def day_sections(
+        self,
+        data: Dict,
+        schemas: Dict[str, TableSchema],
+        level: int = 2,
+        show_date: bool = False,
+        show_count: bool = False,
+        empty_text: str = None,
+        base_date: datetime = None
+    ):
+        """
+        昨日・今日・明日（・今週）の予定ブロックを書き出す
+
+        Args:
+            data: 'yesterday', 'today', 'tomorrow', 'this_week' をキーに持つ辞書
+            schemas: 出力するキー -> 表の定義（この順で出力）
+            level: 見出しレベル
+            show_date: 見出しに日付を付けるか
+            show_count: 見出しに件数を付けるか
+            empty_text: 予定がない場合の表示（Noneならブロックごと省略）
+            base_date: 日付計算の基準（Noneなら現在時刻）
+        """
+        base_date = base_date or datetime.now()
+
+        for key, schema in schemas.items():
+            if key not in data:
+                continue
+
+            events = data[key] or []
+            if not events and empty_text is None:
+                continue
+
+            label, offset = DAY_LABELS[key]
+            heading = f"{label}の予定"
+            if show_count:
+                heading += f" ({len(events)}件)"
+            if show_date and offset is not None:
+                heading += f" ({(base_date + timedelta(days=offset)).strftime('%Y-%m-%d')})"
+            self.heading(heading, level)
+
+            if events:
+                self.table(schema, events)
+            else:
+                self.line(empty_text)
+                self.line()
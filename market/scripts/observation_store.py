@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+経済指標の観測値のローカル保存（系列毎・追記のみ）
+
+系列毎に <store_dir>/<source>/<series_id>.csv（date,value）へ観測値を追記していき、
+読み出し時に日付をキーにまとめます（同じ日付が複数あれば後から追記した値＝改定後の値）。
+FREDからは保存済みの最終日を observation_start にして差分だけを取得するため、
+2回目以降のレスポンスは数行になり、前回比・前年比・長期の推移は手元の履歴から計算できます。
+
+改定される系列（GDP, PAYEMS等）は VintageStore に (系列, 観測日, realtime_start) をキーにした
+改定履歴（ALFREDのビンテージ）としても保存できます。値が変わった時だけ行を追記するため小さく、
+まだ取り込んでいないビンテージだけを取得し、「ある日の時点で分かっていた値」は
+再ダウンロードせずに手元の索引から答えます（自前の履歴でのバックテスト用）。
+
+使用例:
+    store = ObservationStore()
+    pull_fred(store, 'UNRATE', api_key)           # 初回は全期間、以降は最終日以降だけ
+    latest, previous = store.latest('fred', 'UNRATE', 2)
+    yoy = store.yoy('fred', 'UNRATE')
+
+    vintages = VintageStore()
+    pull_fred_vintages(vintages, 'PAYEMS', api_key)   # 新しいビンテージだけ
+    known = vintages.as_of('fred', 'PAYEMS', '2024-03-01')  # 2024-03-01時点の系列
+
+    python3 observation_store.py as-of PAYEMS 2024-03-01 --pull
+    python3 observation_store.py releases GDP 2023-10-01
+
+環境変数:
+    MARKET_OBSERVATION_DIR : 保存先（既定: market/data/observations）
+"""
+
+import argparse
+import bisect
+import csv
+import os
+import threading
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+import instrumentation
+from http_replay import install_http_replay
+from logging_setup import add_logging_arguments, get_logger, setup_logging_from_args
+
+logger = get_logger(__name__)
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+repo_root = os.path.dirname(os.path.dirname(script_dir))
+
+STORE_DIR = os.getenv('MARKET_OBSERVATION_DIR', os.path.join(repo_root, 'market/data/observations'))
+
+FRED_URL = "https://api.stlouisfed.org/fred/series/observations"
+FRED_VINTAGE_DATES_URL = "https://api.stlouisfed.org/fred/series/vintagedates"
+
+# FREDのリアルタイム期間の端（全ビンテージ）
+REALTIME_MIN = '1776-07-04'
+REALTIME_MAX = '9999-12-31'
+# 1回のリクエストの最大件数（FREDの上限）
+FRED_OBSERVATION_LIMIT = 100000
+FRED_VINTAGE_LIMIT = 10000
+
+# FREDの欠損値
+MISSING_VALUES = ('', '.')
+
+Observation = Tuple[str, str]  # (日付 'YYYY-MM-DD', 値の文字列。欠損は '')
+
+
+def to_float(value: str) -> Optional[float]:
+    """保存した値の文字列を数値に（欠損はNone）"""
+    if value in MISSING_VALUES:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class ObservationStore:
+    """系列毎の観測値の追記のみのCSV（スレッドセーフ）"""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or STORE_DIR
+        self._cache: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, source: str, series_id: str) -> str:
+        return os.path.join(self.directory, source, f"{series_id}.csv")
+
+    def _load(self, source: str, series_id: str) -> Dict[str, str]:
+        """日付 -> 値（後の行が優先）"""
+        key = (source, series_id)
+        if key not in self._cache:
+            rows = {}
+            path = self.path(source, series_id)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    for row in csv.DictReader(f):
+                        rows[row['date']] = row['value']
+            self._cache[key] = rows
+        return self._cache[key]
+
+    def last_date(self, source: str, series_id: str) -> Optional[str]:
+        """保存済みの最終日（なければNone）"""
+        with self._lock:
+            rows = self._load(source, series_id)
+            return max(rows) if rows else None
+
+    def append(self, source: str, series_id: str, observations: List[Observation]) -> int:
+        """
+        新しい観測値・改定された観測値だけを追記し、追記した行数を返す
+
+        保存済みと同じ値の観測値は書きません。
+        """
+        with self._lock:
+            rows = self._load(source, series_id)
+            new = [(day, value) for day, value in observations if rows.get(day) != value]
+            if not new:
+                return 0
+
+            path = self.path(source, series_id)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            is_new = not os.path.exists(path)
+            with open(path, 'a', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f, lineterminator='\n')
+                if is_new:
+                    writer.writerow(['date', 'value'])
+                writer.writerows(new)
+
+            rows.update(new)
+            return len(new)
+
+    def observations(self, source: str, series_id: str, since: str = None) -> List[Tuple[str, Optional[float]]]:
+        """日付順の (日付, 値) のリスト（since 以降のみ、欠損の値はNone）"""
+        with self._lock:
+            rows = dict(self._load(source, series_id))
+        return [(day, to_float(value)) for day, value in sorted(rows.items()) if since is None or day >= since]
+
+    def latest(self, source: str, series_id: str, count: int = 2) -> List[Dict]:
+        """値のある直近 count 件（新しい順の {'date', 'value'}。value は保存した文字列）"""
+        with self._lock:
+            rows = self._load(source, series_id)
+            days = sorted((day for day, value in rows.items() if value not in MISSING_VALUES), reverse=True)
+            return [{'date': day, 'value': rows[day]} for day in days[:count]]
+
+    def lookback(self, source: str, series_id: str, days: int) -> List[Tuple[str, Optional[float]]]:
+        """保存済みの最終日から days 日分の (日付, 値)"""
+        last = self.last_date(source, series_id)
+        if last is None:
+            return []
+        since = (date.fromisoformat(last) - timedelta(days=days)).isoformat()
+        return self.observations(source, series_id, since)
+
+    def yoy(self, source: str, series_id: str) -> Optional[float]:
+        """前年比（%）: 最新値と、その1年前の日付以前で最も新しい観測値の比較"""
+        latest = self.latest(source, series_id, 1)
+        if not latest:
+            return None
+        latest_day = date.fromisoformat(latest[0]['date'])
+        try:
+            year_ago = latest_day.replace(year=latest_day.year - 1).isoformat()
+        except ValueError:  # 2月29日
+            year_ago = (latest_day - timedelta(days=365)).isoformat()
+
+        base = None
+        for day, value in self.observations(source, series_id):
+            if day > year_ago:
+                break
+            if value is not None:
+                base = value
+        current = to_float(latest[0]['value'])
+        if base is None or current is None or base == 0:
+            return None
+        return (current - base) / base * 100
+
+
+def pull_fred(store: ObservationStore, series_id: str, api_key: str,
+              session: requests.Session = None, timeout: int = 30) -> int:
+    """
+    FREDの観測値を差分取得して保存し、追記した行数を返す
+
+    保存済みの最終日を observation_start にするため、2回目以降は数行だけ取得します
+    （最終日も取り直して、その日の改定を反映）。初回は全期間を取得します。
+    """
+    params = {
+        'series_id': series_id,
+        'api_key': api_key,
+        'file_type': 'json',
+        'sort_order': 'asc',
+    }
+    last = store.last_date('fred', series_id)
+    if last:
+        params['observation_start'] = last
+
+    response = (session or requests).get(FRED_URL, params=params, timeout=timeout)
+    response.raise_for_status()
+    observations = response.json().get('observations', [])
+    instrumentation.count('observations_fetched', len(observations))
+
+    appended = store.append('fred', series_id, [
+        (obs['date'], '' if obs.get('value') in MISSING_VALUES else obs['value'])
+        for obs in observations
+    ])
+    logger.debug("%s: %d observations fetched (%s), %d appended",
+                 series_id, len(observations), f"since {last}" if last else 'full history', appended)
+    return appended
+
+
+# ============ 改定履歴（ビンテージ） =============
+
+Vintage = Tuple[str, str, str]  # (観測日, realtime_start, 値の文字列。欠損は '')
+
+
+class VintageStore:
+    """
+    (系列, 観測日, realtime_start) をキーにした改定履歴（追記のみ・スレッドセーフ）
+
+    <store_dir>/<source>/<series_id>.vintages.csv      : date,realtime_start,value（値が変わった時だけ）
+    <store_dir>/<source>/<series_id>.vintage_dates     : 取り込み済みのビンテージ日（1行1日）
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or STORE_DIR
+        # (source, series_id) -> 観測日 -> realtime_start 順の [(realtime_start, 値)]
+        self._index: Dict[Tuple[str, str], Dict[str, List[Tuple[str, str]]]] = {}
+        self._vintage_dates: Dict[Tuple[str, str], List[str]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, source: str, series_id: str, suffix: str = 'vintages.csv') -> str:
+        return os.path.join(self.directory, source, f"{series_id}.{suffix}")
+
+    def _load(self, source: str, series_id: str) -> Dict[str, List[Tuple[str, str]]]:
+        key = (source, series_id)
+        if key not in self._index:
+            index = {}
+            path = self.path(source, series_id)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    for row in csv.DictReader(f):
+                        bisect.insort(index.setdefault(row['date'], []), (row['realtime_start'], row['value']))
+            self._index[key] = index
+
+            dates_path = self.path(source, series_id, 'vintage_dates')
+            if os.path.exists(dates_path):
+                with open(dates_path, 'r', encoding='utf-8') as f:
+                    self._vintage_dates[key] = sorted(line.strip() for line in f if line.strip())
+            else:
+                self._vintage_dates[key] = []
+        return self._index[key]
+
+    def vintage_dates(self, source: str, series_id: str) -> List[str]:
+        """取り込み済みのビンテージ日（古い順）"""
+        with self._lock:
+            self._load(source, series_id)
+            return list(self._vintage_dates[(source, series_id)])
+
+    def append(self, source: str, series_id: str, rows: List[Vintage], vintage_dates: List[str] = ()) -> int:
+        """
+        改定履歴を追記し、追記した行数を返す
+
+        その realtime_start の時点で既に分かっていた値と同じ行は書きません（値が変わった時だけ残す）。
+        vintage_dates は取り込み済みとして記録するビンテージ日です。
+        """
+        with self._lock:
+            index = self._load(source, series_id)
+            new = []
+            for day, realtime_start, value in rows:
+                releases = index.setdefault(day, [])
+                position = bisect.bisect_right(releases, (realtime_start, '\uffff'))
+                if position and releases[position - 1][1] == value:
+                    continue
+                releases.insert(position, (realtime_start, value))
+                new.append((day, realtime_start, value))
+
+            if new:
+                path = self.path(source, series_id)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                is_new = not os.path.exists(path)
+                with open(path, 'a', encoding='utf-8', newline='') as f:
+                    writer = csv.writer(f, lineterminator='\n')
+                    if is_new:
+                        writer.writerow(['date', 'realtime_start', 'value'])
+                    writer.writerows(new)
+
+            known = self._vintage_dates[(source, series_id)]
+            added = sorted(set(vintage_dates) - set(known))
+            if added:
+                os.makedirs(os.path.dirname(self.path(source, series_id)), exist_ok=True)
+                with open(self.path(source, series_id, 'vintage_dates'), 'a', encoding='utf-8') as f:
+                    f.writelines(f"{day}\n" for day in added)
+                known[:] = sorted(known + added)
+
+            return len(new)
+
+    def as_of(self, source: str, series_id: str, when: str) -> List[Tuple[str, Optional[float]]]:
+        """
+        when（'YYYY-MM-DD'）の時点で分かっていた系列（日付順の (観測日, 値)）
+
+        その時点でまだ発表されていない観測日は含みません。
+        """
+        with self._lock:
+            index = self._load(source, series_id)
+            known = []
+            for day in sorted(index):
+                releases = index[day]
+                position = bisect.bisect_right(releases, (when, '\uffff'))
+                if position:
+                    known.append((day, to_float(releases[position - 1][1])))
+        return known
+
+    def value_as_of(self, source: str, series_id: str, day: str, when: str) -> Optional[float]:
+        """観測日 day の値として when の時点で分かっていた値（未発表ならNone）"""
+        with self._lock:
+            releases = self._load(source, series_id).get(day, [])
+            position = bisect.bisect_right(releases, (when, '\uffff'))
+            return to_float(releases[position - 1][1]) if position else None
+
+    def releases(self, source: str, series_id: str, day: str) -> List[Tuple[str, Optional[float]]]:
+        """観測日 day の発表・改定の履歴（(realtime_start, 値) の古い順。最初が速報値）"""
+        with self._lock:
+            return [(start, to_float(value)) for start, value in self._load(source, series_id).get(day, [])]
+
+
+def _fred_pages(url: str, params: Dict, key: str, limit: int, session, timeout: int) -> List[Dict]:
+    """FREDのページ送り（offset）で全件を取得"""
+    items, offset = [], 0
+    while True:
+        response = (session or requests).get(url, params=dict(params, limit=limit, offset=offset), timeout=timeout)
+        response.raise_for_status()
+        payload = response.json()
+        page = payload.get(key, [])
+        items.extend(page)
+        offset += len(page)
+        if not page or offset >= int(payload.get('count', offset)):
+            return items
+
+
+def pull_fred_vintages(store: VintageStore, series_id: str, api_key: str,
+                       session: requests.Session = None, timeout: int = 60) -> int:
+    """
+    FRED（ALFRED）の新しいビンテージだけを取得して改定履歴に追記し、追記した行数を返す
+
+    まず取り込み済みの最後のビンテージより後のビンテージ日を調べ（小さなリクエスト）、
+    新しいビンテージがあれば、その最初の日以降のリアルタイム期間の観測値だけを取得します。
+    """
+    known = store.vintage_dates('fred', series_id)
+    start = (date.fromisoformat(known[-1]) + timedelta(days=1)).isoformat() if known else REALTIME_MIN
+    base = {'series_id': series_id, 'api_key': api_key, 'file_type': 'json'}
+
+    new_dates = _fred_pages(FRED_VINTAGE_DATES_URL, dict(base, realtime_start=start, realtime_end=REALTIME_MAX),
+                            'vintage_dates', FRED_VINTAGE_LIMIT, session, timeout)
+    if not new_dates:
+        logger.debug("%s: no new vintages since %s", series_id, known[-1] if known else '-')
+        return 0
+
+    observations = _fred_pages(
+        FRED_URL,
+        dict(base, realtime_start=new_dates[0], realtime_end=REALTIME_MAX, output_type=1, sort_order='asc'),
+        'observations', FRED_OBSERVATION_LIMIT, session, timeout
+    )
+    instrumentation.count('observations_fetched', len(observations))
+
+    appended = store.append('fred', series_id, [
+        (obs['date'], obs['realtime_start'], '' if obs.get('value') in MISSING_VALUES else obs['value'])
+        for obs in observations
+    ], vintage_dates=new_dates)
+    logger.debug("%s: %d new vintages (%s..%s), %d observations fetched, %d appended",
+                 series_id, len(new_dates), new_dates[0], new_dates[-1], len(observations), appended)
+    return appended
+
+
+def main():
+    """改定履歴の時点指定の照会"""
+    install_http_replay()
+
+    parser = argparse.ArgumentParser(description='観測値の改定履歴の照会')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    as_of = subparsers.add_parser('as-of', help='指定日の時点で分かっていた系列を表示')
+    as_of.add_argument('series_id')
+    as_of.add_argument('when', help='時点 (YYYY-MM-DD)')
+    as_of.add_argument('--tail', type=int, default=12, help='表示する直近の件数')
+
+    releases = subparsers.add_parser('releases', help='観測日の発表・改定の履歴を表示')
+    releases.add_argument('series_id')
+    releases.add_argument('date', help='観測日 (YYYY-MM-DD)')
+
+    for subparser in (as_of, releases):
+        subparser.add_argument('--pull', action='store_true', help='照会の前に新しいビンテージを取得')
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    setup_logging_from_args(args)
+
+    store = VintageStore()
+    if args.pull:
+        pull_fred_vintages(store, args.series_id, os.getenv('FRED_API_KEY', 'guest'))
+
+    if args.command == 'as-of':
+        for day, value in store.as_of('fred', args.series_id, args.when)[-args.tail:]:
+            print(f"{day}  {value if value is not None else 'N/A'}")
+    else:
+        for realtime_start, value in store.releases('fred', args.series_id, args.date):
+            print(f"{realtime_start}  {value if value is not None else 'N/A'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+公的機関のイールドカーブ一括ファイルの読み込み
+
+発行体が公開している「全年限・全期間」の一括ファイルを、国毎に1回のダウンロードで取得し、
+1パスのストリーミング（1行ずつCSVを読む）で日付 -> 年限 -> 利回りの履歴にします。
+
+    united states  : 米財務省 Daily Treasury Par Yield Curve Rates（CSV、年毎）
+    japan          : 財務省 国債金利情報（jgbcm_all.csv / 当月分 jgbcm.csv、Shift_JIS・和暦）
+    united kingdom : イングランド銀行 統計データベース（名目パー利回り 5・10・20年）
+    euro area      : ECB Data Portal（AAA格ユーロ圏国債のスポットレート）
+
+履歴は market/data/yield_curves/official/<source>.csv に保存し、2回目以降は保存済みの最終日
+（から REFRESH_OVERLAP_DAYS 日前）以降だけを取得して追記します（直近の訂正も取り込む）。
+最新日と前日の値から YieldCurveFetcher.results と同じ形の国債データを作ります。
+
+使用例:
+    history = refresh_history('united states')          # 差分だけ取得して保存
+    bonds = official_bonds('united states', periods=[2, 5, 10, 30])
+
+    python3 official_curves.py                  # 全ソースを更新して最新のカーブを表示
+    python3 official_curves.py --country japan --full
+"""
+
+import argparse
+import csv
+import os
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+import instrumentation
+from http_replay import install_http_replay
+from investing_http import parse_tenor
+from logging_setup import add_logging_arguments, get_logger, setup_logging_from_args
+from output_writer import atomic_open
+
+logger = get_logger(__name__)
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+repo_root = os.path.dirname(os.path.dirname(script_dir))
+
+STORE_DIR = os.path.join(repo_root, 'market/data/yield_curves/official')
+
+# 差分取得で保存済みの最終日より何日前から取り直すか（発表後の訂正を取り込むため）
+REFRESH_OVERLAP_DAYS = 7
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+
+US_TREASURY_URL = ("https://home.treasury.gov/resource-center/data-chart-center/interest-rates/"
+                   "daily-treasury-rates.csv/{year}/all")
+MOF_JGB_ALL_URL = "https://www.mof.go.jp/jgbs/reference/interest_rate/historical/jgbcm_all.csv"
+MOF_JGB_CURRENT_URL = "https://www.mof.go.jp/jgbs/reference/interest_rate/jgbcm.csv"
+BOE_IADB_URL = "https://www.bankofengland.co.uk/boeapps/database/_iadb-fromshowcolumns.asp"
+ECB_YC_URL = "https://data-api.ecb.europa.eu/service/data/YC/B.U2.EUR.4F.G_N_A.SV_C_YM.{tenors}"
+
+# 米財務省CSVの列名（'1 Mo', '1.5 Month', '10 Yr'）
+US_COLUMN_PATTERN = re.compile(r'^([\d.]+)\s*(Mo|Month|Yr)', re.IGNORECASE)
+# 財務省CSVの列名（'10年'）
+MOF_COLUMN_PATTERN = re.compile(r'^(\d+)年$')
+# 和暦の日付（'R7.10.17', 'S49.9.24'）
+WAREKI_PATTERN = re.compile(r'^([MTSHR])(\d+)\.(\d+)\.(\d+)$')
+WAREKI_ERAS = {'M': 1867, 'T': 1911, 'S': 1925, 'H': 1988, 'R': 2018}
+
+# イングランド銀行の系列コード -> 年限（名目パー利回り）
+BOE_SERIES = {
+    'IUDSNPY': '5Y',
+    'IUDMNPY': '10Y',
+    'IUDLNPY': '20Y',
+}
+BOE_START_DATE = date(1979, 1, 1)
+
+# ECBのスポットレートで取得する年限
+ECB_TENORS = ('1Y', '2Y', '3Y', '5Y', '7Y', '10Y', '20Y', '30Y')
+
+Row = Tuple[date, Dict[str, float]]
+
+
+def _value(text: str) -> Optional[float]:
+    """セルの値を数値に（空・'-'・'N/A' はNone）"""
+    text = (text or '').strip()
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _row_values(row: List[str], columns: List[Tuple[int, str]]) -> Dict[str, float]:
+    """(列番号, 年限ラベル) の列の値（空の値は除く）"""
+    values = {}
+    for index, label in columns:
+        value = _value(row[index]) if index < len(row) else None
+        if value is not None:
+            values[label] = value
+    return values
+
+
+def _stream_csv(session: requests.Session, url: str, encoding: str = 'utf-8-sig', **kwargs) -> Iterator[List[str]]:
+    """CSVを1行ずつ読む（レスポンス全体を文字列にしない）"""
+    with instrumentation.span(url.split('?')[0], kind='fetch'):
+        response = session.get(url, stream=True, timeout=60, **kwargs)
+        response.raise_for_status()
+        response.encoding = encoding
+        yield from csv.reader(response.iter_lines(decode_unicode=True))
+
+
+# ============ 各ソースの読み込み（since 以降の (日付, 年限 -> 利回り) を順に返す） =============
+
+def load_us_treasury(session: requests.Session, since: Optional[date]) -> Iterator[Row]:
+    """米財務省 Daily Treasury Par Yield Curve Rates（初回は全期間、以降は since の年から1年1ファイル）"""
+    years = ['all'] if since is None else [str(year) for year in range(since.year, date.today().year + 1)]
+
+    for year in years:
+        params = {'type': 'daily_treasury_yield_curve', 'field_tdr_date_value': year, 'page': '', '_format': 'csv'}
+        rows = _stream_csv(session, US_TREASURY_URL.format(year=year), params=params)
+        header = next(rows, None)
+        if not header:
+            continue
+
+        columns = []
+        for index, name in enumerate(header[1:], start=1):
+            match = US_COLUMN_PATTERN.match(name.strip())
+            if match:
+                unit = 'Y' if match.group(2).lower() == 'yr' else 'M'
+                columns.append((index, f"{match.group(1)}{unit}"))
+
+        for row in rows:
+            if not row or not row[0].strip():
+                continue
+            day = datetime.strptime(row[0].strip(), '%m/%d/%Y').date()
+            if since is not None and day < since:
+                continue
+            yield day, _row_values(row, columns)
+
+
+def parse_wareki(text: str) -> date:
+    """財務省CSVの日付（和暦 'R7.10.17' または西暦 '2025/10/17'）"""
+    match = WAREKI_PATTERN.match(text.strip())
+    if not match:
+        return datetime.strptime(text.strip(), '%Y/%m/%d').date()
+    era, year, month, day = match.groups()
+    return date(WAREKI_ERAS[era] + int(year), int(month), int(day))
+
+
+def load_mof_jgb(session: requests.Session, since: Optional[date]) -> Iterator[Row]:
+    """財務省 国債金利情報（since が当月なら当月分のファイル、そうでなければ全期間のファイル）"""
+    month_start = date.today().replace(day=1)
+    url = MOF_JGB_CURRENT_URL if since is not None and since >= month_start else MOF_JGB_ALL_URL
+
+    columns = None
+    for row in _stream_csv(session, url, encoding='cp932'):
+        if not row:
+            continue
+        # 1行目はタイトル（国債金利情報）、'基準日' で始まる行が見出し
+        if columns is None:
+            if row[0].strip() == '基準日':
+                columns = [(index, f"{name.strip()[:-1]}Y") for index, name in enumerate(row)
+                           if MOF_COLUMN_PATTERN.match(name.strip())]
+            continue
+
+        try:
+            day = parse_wareki(row[0])
+        except ValueError:
+            continue
+        if since is not None and day < since:
+            continue
+        yield day, _row_values(row, columns)
+
+
+def load_boe(session: requests.Session, since: Optional[date]) -> Iterator[Row]:
+    """イングランド銀行 統計データベース（全系列を1回のリクエストで、Datefrom 以降）"""
+    params = {
+        'csv.x': 'yes',
+        'Datefrom': (since or BOE_START_DATE).strftime('%d/%b/%Y'),
+        'Dateto': 'now',
+        'SeriesCodes': ','.join(BOE_SERIES),
+        'CSVF': 'TN',
+        'UsingCodes': 'Y',
+        'VPD': 'Y',
+        'VFD': 'N',
+    }
+    rows = _stream_csv(session, BOE_IADB_URL, params=params)
+    header = next(rows, None)
+    if not header:
+        return
+    columns = [(index, BOE_SERIES[name.strip()]) for index, name in enumerate(header) if name.strip() in BOE_SERIES]
+
+    for row in rows:
+        if not row or not row[0].strip():
+            continue
+        day = datetime.strptime(row[0].strip(), '%d %b %Y').date()
+        yield day, _row_values(row, columns)
+
+
+def load_ecb(session: requests.Session, since: Optional[date]) -> Iterator[Row]:
+    """ECB Data Portal のユーロ圏AAAスポットレート（全年限を1回のリクエストで、startPeriod 以降）"""
+    tenors = '+'.join(f"SR_{tenor}" for tenor in ECB_TENORS)
+    params = {'format': 'csvdata'}
+    if since is not None:
+        params['startPeriod'] = since.isoformat()
+
+    rows = _stream_csv(session, ECB_YC_URL.format(tenors=tenors), params=params)
+    header = next(rows, None)
+    if not header:
+        return
+    index = {name: position for position, name in enumerate(header)}
+    tenor_col, date_col, value_col = index['DATA_TYPE_FM'], index['TIME_PERIOD'], index['OBS_VALUE']
+
+    # 系列（年限）毎に並んでいるので、1観測ずつ返して呼び出し側で日付毎にまとめる
+    for row in rows:
+        if len(row) <= max(tenor_col, date_col, value_col):
+            continue
+        value = _value(row[value_col])
+        if value is None:
+            continue
+        yield date.fromisoformat(row[date_col]), {row[tenor_col].replace('SR_', ''): value}
+
+
+# 国 -> 一括ファイルの設定
+OFFICIAL_SOURCES = {
+    'united states': {
+        'source': 'us_treasury',
+        'name': 'United States',
+        'name_ja': '米国',
+        'label': 'U.S. Treasury',
+        'loader': load_us_treasury,
+    },
+    'japan': {
+        'source': 'mof_jgb',
+        'name': 'Japan',
+        'name_ja': '日本',
+        'label': 'MoF JGB',
+        'loader': load_mof_jgb,
+    },
+    'united kingdom': {
+        'source': 'boe',
+        'name': 'United Kingdom',
+        'name_ja': 'イギリス',
+        'label': 'BoE',
+        'loader': load_boe,
+    },
+    'euro area': {
+        'source': 'ecb',
+        'name': 'Euro Area',
+        'name_ja': 'ユーロ圏',
+        'label': 'ECB AAA',
+        'loader': load_ecb,
+    },
+}
+
+
+# ============ 履歴の保存と差分更新 =============
+
+class CurveHistory:
+    """日付 -> 年限ラベル（'3M', '10Y'）-> 利回り の履歴（CSVに保存）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows: Dict[date, Dict[str, float]] = {}
+
+    @property
+    def last_date(self) -> Optional[date]:
+        return max(self.rows) if self.rows else None
+
+    def tenors(self) -> List[str]:
+        """年限ラベルを年限の短い順に"""
+        labels = {label for values in self.rows.values() for label in values}
+        return sorted(labels, key=lambda label: parse_tenor(label) or 0)
+
+    def read(self) -> 'CurveHistory':
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                day = date.fromisoformat(row.pop('date'))
+                self.rows[day] = {label: float(value) for label, value in row.items() if value}
+        return self
+
+    def update(self, rows: Iterable[Row]) -> int:
+        """取得した行で上書き・追記し、更新した日数を返す"""
+        updated = set()
+        for day, values in rows:
+            if values:
+                self.rows.setdefault(day, {}).update(values)
+                updated.add(day)
+        return len(updated)
+
+    def write(self):
+        tenors = self.tenors()
+        with atomic_open(self.path, 'w') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(['date'] + tenors)
+            for day in sorted(self.rows):
+                values = self.rows[day]
+                writer.writerow([day.isoformat()] + [values.get(label, '') for label in tenors])
+
+
+def refresh_history(country: str, store_dir: str = None, full: bool = False,
+                    session: requests.Session = None) -> CurveHistory:
+    """
+    国の履歴を差分更新して保存
+
+    Args:
+        country: OFFICIAL_SOURCES の国
+        store_dir: 保存先（Noneなら STORE_DIR）
+        full: Trueなら保存済みの履歴を無視して全期間を取り直す
+        session: 使い回すセッション
+    """
+    config = OFFICIAL_SOURCES[country]
+    history = CurveHistory(os.path.join(store_dir or STORE_DIR, f"{config['source']}.csv"))
+    if not full:
+        history.read()
+
+    since = history.last_date - timedelta(days=REFRESH_OVERLAP_DAYS) if history.last_date else None
+    if session is None:
+        session = requests.Session()
+        session.headers['User-Agent'] = USER_AGENT
+
+    updated = history.update(config['loader'](session, since))
+    logger.info(f"{config['label']}: {updated} days updated "
+                f"({'since ' + since.isoformat() if since else 'full history'}), {len(history.rows)} days stored")
+    if updated:
+        history.write()
+    return history
+
+
+def latest_bonds(history: CurveHistory, periods: Iterable[float] = None, label: str = '') -> Dict[float, dict]:
+    """
+    履歴の最新日と前日の値から国債データを作成（YieldCurveFetcher.fetch_bond_yield() と同じ形）
+
+    Args:
+        history: 履歴
+        periods: 取り出す年限（年）。Noneなら1年以上の整数年の全年限
+        label: fetched_name の接頭辞（'U.S. Treasury' 等）
+
+    Returns:
+        dict: 年限 -> 国債データ
+    """
+    by_period = {parse_tenor(tenor): tenor for tenor in history.tenors()}
+    if periods is None:
+        periods = [period for period in by_period if period >= 1 and float(period).is_integer()]
+
+    days = sorted(history.rows, reverse=True)
+    bonds = {}
+    for period in periods:
+        tenor = by_period.get(float(period))
+        if tenor is None:
+            continue
+
+        # 値のある直近2日（年限によっては休止期間がある）
+        observed = []
+        for day in days:
+            if tenor in history.rows[day]:
+                observed.append((day, history.rows[day][tenor]))
+                if len(observed) == 2:
+                    break
+        if not observed:
+            continue
+
+        latest_day, latest_yield = observed[0]
+        previous_yield = observed[1][1] if len(observed) > 1 else None
+        change = latest_yield - previous_yield if previous_yield is not None else None
+        change_pct = ((change / previous_yield) * 100 if previous_yield != 0 else 0) if change is not None else None
+
+        period = int(period) if float(period).is_integer() else period
+        bonds[period] = {
+            'name': f"{label} {tenor}".strip(),
+            'fetched_name': f"{label} {tenor}".strip(),
+            'period': period,
+            'yield': latest_yield,
+            'previous_yield': previous_yield,
+            'change': change,
+            'change_pct': change_pct,
+            'date': latest_day.isoformat(),
+        }
+    return bonds
+
+
+def official_bonds(country: str, periods: Iterable[float] = None, store_dir: str = None,
+                   refresh: bool = True) -> Dict[float, dict]:
+    """国の最新カーブ（年限 -> 国債データ）。refresh=Falseなら保存済みの履歴だけを使う"""
+    config = OFFICIAL_SOURCES[country]
+    if refresh:
+        history = refresh_history(country, store_dir)
+    else:
+        history = CurveHistory(os.path.join(store_dir or STORE_DIR, f"{config['source']}.csv")).read()
+    return latest_bonds(history, periods, config['label'])
+
+
+def main():
+    """全ソース（または指定した国）の履歴を更新して最新のカーブを表示"""
+    parser = argparse.ArgumentParser(description='公的機関のイールドカーブ一括ファイルの取得')
+    parser.add_argument('--country', choices=list(OFFICIAL_SOURCES), action='append',
+                        help='更新する国（複数指定可。既定: すべて）')
+    parser.add_argument('--full', action='store_true', help='保存済みの履歴を無視して全期間を取り直す')
+    parser.add_argument('--store-dir', type=str, default=STORE_DIR, help='履歴の保存先')
+    add_logging_arguments(parser)
+    args = parser.parse_args()
+    setup_logging_from_args(args)
+    install_http_replay()
+
+    session = requests.Session()
+    session.headers['User-Agent'] = USER_AGENT
+
+    for country in args.country or list(OFFICIAL_SOURCES):
+        config = OFFICIAL_SOURCES[country]
+        try:
+            history = refresh_history(country, args.store_dir, args.full, session)
+        except Exception as e:
+            logger.error(f"{config['label']}: {type(e).__name__}: {e}")
+            continue
+
+        print(f"\n{config['name_ja']} ({config['name']}) - {config['label']}")
+        print("-" * 60)
+        for bond in latest_bonds(history, label=config['label']).values():
+            change = f"{bond['change']:+.3f}" if bond['change'] is not None else "N/A"
+            print(f"{bond['period']}Y{'':<8} {bond['yield']:>8.3f}%  {change:>8}  {bond['date']}")
+
+
+if __name__ == "__main__":
+    main()
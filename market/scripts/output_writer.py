@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+出力ファイル書き込みモジュール
+
+データに変更がない日（週末など）でも毎回 *_latest.* とタイムスタンプ付きコピーを
+書き出すと、ワークフローが同じ内容を毎回コミットしてしまいます。
+
+OutputWriterは
+- 取得時刻などの揮発的なキーを除いたペイロードのハッシュをディレクトリ毎の
+  output_hashes.json に記録し、前回と同じなら latest もタイムスタンプ付きコピーも書かない
+- 一時ファイルに書いてから os.replace で置き換える（読み手が書きかけの latest を見ることがない）
+
+使用例:
+    writer = OutputWriter('market/data/yield_curves/json')
+    writer.write('yield_curve_latest.json', text, payload=results,
+                 timestamped_name=f'yield_curve_{timestamp}.json')
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Union
+
+import instrumentation
+from logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+# ハッシュ計算時に無視するキー（実行毎に変わるがデータの中身ではないもの）
+VOLATILE_KEYS = ('fetch_date', 'timestamp')
+MANIFEST_NAME = 'output_hashes.json'
+
+
+def normalize_payload(value: Any, volatile_keys: Iterable[str] = VOLATILE_KEYS) -> Any:
+    """揮発的なキーを再帰的に取り除く"""
+    volatile_keys = tuple(volatile_keys)
+    if isinstance(value, dict):
+        return {k: normalize_payload(v, volatile_keys) for k, v in value.items() if k not in volatile_keys}
+    if isinstance(value, (list, tuple)):
+        return [normalize_payload(v, volatile_keys) for v in value]
+    return value
+
+
+def payload_hash(value: Any, volatile_keys: Iterable[str] = VOLATILE_KEYS) -> str:
+    """正規化したペイロードのSHA-256"""
+    if isinstance(value, bytes):
+        data = value
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+    else:
+        normalized = normalize_payload(value, volatile_keys)
+        data = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = 'w', encoding: str = 'utf-8'):
+    """
+    一時ファイルに書き込み、正常終了時に path へアトミックに置き換える
+
+    例外が発生した場合は一時ファイルを削除し、元のファイルはそのまま残ります。
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+
+    try:
+        if 'b' in mode:
+            f = os.fdopen(fd, mode)
+        else:
+            f = os.fdopen(fd, mode, encoding=encoding)
+        with f:
+            yield f
+        # mkstempは0600で作成するため、通常のファイルと同じ権限に戻す
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write(path: str, content: Union[str, bytes, Callable]):
+    """content（文字列・バイト列・ファイルに書き込む関数）をアトミックに書き込む"""
+    mode = 'wb' if isinstance(content, bytes) else 'w'
+    with atomic_open(path, mode) as f:
+        if callable(content):
+            content(f)
+        else:
+            f.write(content)
+
+
+def atomic_copy(src: str, dst: str):
+    """src を dst にアトミックにコピー"""
+    with atomic_open(dst, 'wb') as f, open(src, 'rb') as src_f:
+        shutil.copyfileobj(src_f, f)
+
+
+class OutputWriter:
+    """内容ハッシュで変更を検出し、変更がある時だけアトミックに書き込む"""
+
+    def __init__(self, output_dir: str, volatile_keys: Iterable[str] = VOLATILE_KEYS, force: bool = False):
+        """
+        Args:
+            output_dir: 出力ディレクトリ
+            volatile_keys: ハッシュ計算で無視するキー
+            force: Trueならハッシュが同じでも書き込む
+        """
+        self.output_dir = output_dir
+        self.volatile_keys = tuple(volatile_keys)
+        self.force = force
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+
+    def _load_manifest(self) -> dict:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read {self.manifest_path}: {e}")
+            return {}
+
+    def _save_manifest(self, manifest: dict):
+        atomic_write(self.manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True))
+
+    def is_unchanged(self, name: str, payload: Any) -> bool:
+        """name の前回書き込み時とペイロードが同じか"""
+        latest_path = os.path.join(self.output_dir, name)
+        if self.force or not os.path.exists(latest_path):
+            return False
+        return self._load_manifest().get(name) == payload_hash(payload, self.volatile_keys)
+
+    def write(
+        self,
+        name: str,
+        content: Union[str, bytes, Callable],
+        payload: Any = None,
+        timestamped_name: str = None,
+        timestamped_content: Union[str, bytes, Callable] = None
+    ) -> bool:
+        """
+        latest ファイル（と任意でタイムスタンプ付きコピー）を書き込む
+
+        Args:
+            name: latest ファイル名（例: 'yield_curve_latest.json'）
+            content: 書き込む内容（文字列・バイト列・ファイルオブジェクトを受け取る関数）
+            payload: 変更検出に使うデータ（Noneなら content 自体。関数の場合は必須）
+            timestamped_name: タイムスタンプ付きコピーのファイル名
+            timestamped_content: タイムスタンプ付きコピーの内容（Noneなら latest と同じ内容をコピー）
+
+        Returns:
+            bool: 書き込んだ場合True、変更がなくスキップした場合False
+        """
+        if payload is None:
+            if callable(content):
+                raise ValueError("payload is required when content is a callable")
+            payload = content
+
+        latest_path = os.path.join(self.output_dir, name)
+        digest = payload_hash(payload, self.volatile_keys)
+        manifest = self._load_manifest()
+
+        if not self.force and manifest.get(name) == digest and os.path.exists(latest_path):
+            logger.info(f"Unchanged, skipped: {latest_path}")
+            instrumentation.count('cache_hits')
+            instrumentation.count('outputs_skipped')
+            return False
+
+        with instrumentation.span(name, kind='write', path=latest_path):
+            atomic_write(latest_path, content)
+            logger.info(f"Saved: {latest_path}")
+
+            if timestamped_name:
+                timestamp_path = os.path.join(self.output_dir, timestamped_name)
+                if timestamped_content is None:
+                    atomic_copy(latest_path, timestamp_path)
+                else:
+                    atomic_write(timestamp_path, timestamped_content)
+                logger.info(f"Saved: {timestamp_path}")
+
+            manifest[name] = digest
+            self._save_manifest(manifest)
+
+        instrumentation.count('outputs_written')
+        return True
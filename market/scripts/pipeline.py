@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+日次パイプライン用の軽量DAG実行エンジン
+
+取得（fetch）→ 変換（transform）→ 描画（render）→ 保存（persist）の各ステージを
+依存関係つきで宣言し、依存のないステージはスレッドプールで並列に実行します。
+パイプライン全体の所要時間は全ステップの合計ではなく、クリティカルパスで決まります。
+
+使用例:
+    pipeline = Pipeline(max_workers=4)
+    pipeline.add('fetch', fetcher.fetch_all_countries, kind='fetch')
+    pipeline.add('save_json', save_json, deps=['fetch'], kind='persist')
+    pipeline.add('save_markdown', save_markdown, deps=['fetch'], kind='persist')
+    results = pipeline.run()
+
+メモ化:
+    memoize=True のステージは、上流ステージの結果のハッシュが前回と同じであれば
+    再実行せずに前回の結果を返します。cache_dir を指定するとディスクにも保存され、
+    プロセスをまたいで（例: 週末の同一データ）再利用されます。
+    取得結果に取得日時などが含まれる場合は、output_writer.payload_hash で
+    それらを除いたハッシュを求めるステージを挟み、下流はそのハッシュに依存させます。
+    メモ化にヒットするとステージ自体が実行されないため、対象は結果だけを返す変換ステージに限ります。
+    ファイルを書く描画・保存ステージをメモ化すると、出力が消えても書き直されません
+    （変更の有無は OutputWriter / ChartRenderer が出力の有無も含めて判定します）。
+
+    環境変数 MARKET_PIPELINE_CACHE=0 でメモ化を無効にできます（全ステージを実行）。
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import instrumentation
+from logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+STAGE_KINDS = ('fetch', 'transform', 'render', 'persist')
+
+# メモ化の有効/無効
+CACHE_ENABLED = os.getenv('MARKET_PIPELINE_CACHE', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+class Stage:
+    """パイプラインの1ステージ"""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        deps: Iterable[str] = (),
+        kind: str = 'transform',
+        memoize: bool = False
+    ):
+        if kind not in STAGE_KINDS:
+            raise ValueError(f"Unknown stage kind: {kind} (expected one of {STAGE_KINDS})")
+
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.kind = kind
+        self.memoize = memoize
+
+
+def fingerprint(value: Any) -> str:
+    """値の内容ハッシュを計算（JSON化できない値はpickleで代用）"""
+    try:
+        payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    except (TypeError, ValueError):
+        payload = pickle.dumps(value)
+    return hashlib.sha256(payload).hexdigest()
+
+
+class Pipeline:
+    """依存関係つきステージを並列実行するDAG実行エンジン"""
+
+    def __init__(self, max_workers: int = 4, cache_dir: str = None):
+        """
+        Args:
+            max_workers: 同時に実行するステージ数の上限
+            cache_dir: メモ化結果の保存先（Noneならメモリ内のみ）
+        """
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.stages: Dict[str, Stage] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.timings: Dict[str, float] = {}
+        self.cache_hits: List[str] = []
+        self.skipped: List[str] = []
+        self._memo: Dict[str, Any] = {}
+
+    def add(
+        self,
+        name: str,
+        func: Callable,
+        deps: Iterable[str] = (),
+        kind: str = 'transform',
+        memoize: bool = False
+    ) -> Stage:
+        """
+        ステージを追加
+
+        Args:
+            name: ステージ名（一意）
+            func: 実行する関数。依存ステージの結果が deps の順で位置引数として渡される
+            deps: 依存するステージ名のリスト
+            kind: 'fetch', 'transform', 'render', 'persist' のいずれか
+            memoize: 上流の結果が変わらなければ前回の結果を再利用するか
+
+        Returns:
+            追加したStage
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage name: {name}")
+
+        stage = Stage(name, func, deps, kind, memoize)
+        self.stages[name] = stage
+        return stage
+
+    def stage(self, name: str, deps: Iterable[str] = (), kind: str = 'transform', memoize: bool = False):
+        """add() のデコレータ版"""
+        def decorator(func: Callable) -> Callable:
+            self.add(name, func, deps, kind, memoize)
+            return func
+        return decorator
+
+    def _resolve(self, targets: Optional[Iterable[str]]) -> List[str]:
+        """実行対象ステージを依存込みで列挙し、循環や未定義の依存を検出"""
+        order = []
+        state = {}  # name -> 'visiting' | 'done'
+
+        def visit(name: str, path: List[str]):
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage: {name} (required by {' -> '.join(path) or 'run'})")
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Cycle detected: {' -> '.join(path + [name])}")
+
+            state[name] = 'visiting'
+            for dep in self.stages[name].deps:
+                visit(dep, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for name in (targets or list(self.stages.keys())):
+            visit(name, [])
+
+        return order
+
+    def _memo_key(self, stage: Stage, args: List[Any]) -> str:
+        return fingerprint([stage.name, stage.kind, [fingerprint(arg) for arg in args]])
+
+    def _load_memo(self, key: str):
+        if key in self._memo:
+            return True, self._memo[key]
+
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, f"{key}.pkl")
+            if os.path.exists(path):
+                try:
+                    with open(path, 'rb') as f:
+                        value = pickle.load(f)
+                    self._memo[key] = value
+                    return True, value
+                except Exception as e:
+                    logger.warning(f"Could not load stage cache {path}: {e}")
+
+        return False, None
+
+    def _store_memo(self, key: str, value: Any):
+        self._memo[key] = value
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = os.path.join(self.cache_dir, f"{key}.pkl")
+            tmp_path = f"{path}.tmp"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(value, f)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logger.warning(f"Could not save stage cache {path}: {e}")
+
+    def _execute(self, stage: Stage, args: List[Any]) -> Any:
+        """1ステージを実行（メモ化を含む）"""
+        memoize = stage.memoize and CACHE_ENABLED
+        key = None
+        if memoize:
+            key = self._memo_key(stage, args)
+            hit, value = self._load_memo(key)
+            if hit:
+                self.cache_hits.append(stage.name)
+                instrumentation.count('cache_hits')
+                logger.info(f"[pipeline] {stage.name}: unchanged input, reused memoized result")
+                return value
+
+        started = time.perf_counter()
+        try:
+            with instrumentation.span(stage.name, kind='stage', stage_kind=stage.kind):
+                value = stage.func(*args)
+        finally:
+            self.timings[stage.name] = time.perf_counter() - started
+
+        if memoize:
+            self._store_memo(key, value)
+
+        return value
+
+    def run(self, targets: Iterable[str] = None) -> Dict[str, Any]:
+        """
+        パイプラインを実行
+
+        失敗したステージの下流ステージはスキップされ、無関係なステージは継続します。
+
+        Args:
+            targets: 実行したいステージ名（Noneなら全ステージ）。依存ステージも自動で実行
+
+        Returns:
+            dict: ステージ名 -> 結果
+        """
+        order = self._resolve(targets)
+        pending = list(order)
+        running = {}
+        self.results = {}
+        self.errors = {}
+        self.timings = {}
+        self.cache_hits = []
+        self.skipped = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                for name in list(pending):
+                    stage = self.stages[name]
+                    failed_deps = [d for d in stage.deps if d in self.errors]
+                    if failed_deps:
+                        pending.remove(name)
+                        self.skipped.append(name)
+                        self.errors[name] = RuntimeError(f"Skipped: upstream stage failed ({', '.join(failed_deps)})")
+                        logger.warning(f"[pipeline] {name}: skipped (upstream failed: {', '.join(failed_deps)})")
+                        continue
+
+                    if all(d in self.results for d in stage.deps):
+                        pending.remove(name)
+                        args = [self.results[d] for d in stage.deps]
+                        running[executor.submit(self._execute, stage, args)] = name
+
+                if not running:
+                    continue
+
+                done, _ = wait(list(running.keys()), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception as e:
+                        self.errors[name] = e
+                        logger.error(f"[pipeline] {name}: failed: {type(e).__name__}: {e}")
+
+        return self.results
+
+    def critical_path(self) -> List[str]:
+        """直前の実行で最も時間のかかった依存チェーンを返す"""
+        finish = {}
+        best_prev = {}
+
+        for name in self._resolve([n for n in self.stages if n in self.timings]):
+            stage = self.stages[name]
+            prev = max(stage.deps, key=lambda d: finish.get(d, 0.0), default=None)
+            finish[name] = finish.get(prev, 0.0) + self.timings.get(name, 0.0)
+            best_prev[name] = prev
+
+        if not finish:
+            return []
+
+        path = []
+        node = max(finish, key=finish.get)
+        while node is not None:
+            path.append(node)
+            node = best_prev.get(node)
+        return list(reversed(path))
+
+    def status(self, name: str) -> Optional[str]:
+        """直前の実行でのステージの状態（'ok', 'cached', 'failed', 'skipped'。未実行ならNone）"""
+        if name in self.skipped:
+            return 'skipped'
+        if name in self.errors:
+            return 'failed'
+        if name in self.cache_hits:
+            return 'cached'
+        if name in self.results:
+            return 'ok'
+        return None
+
+    def summary(self) -> Dict[str, Any]:
+        """直前の実行結果（実行レポート用のJSON化できる辞書）"""
+        stages = {}
+        for name, stage in self.stages.items():
+            status = self.status(name)
+            if status is None:
+                continue
+            stages[name] = {
+                'kind': stage.kind,
+                'status': status,
+                'seconds': round(self.timings.get(name, 0.0), 6),
+            }
+            if name in self.errors and status == 'failed':
+                stages[name]['error'] = f"{type(self.errors[name]).__name__}: {self.errors[name]}"
+
+        return {'stages': stages, 'critical_path': self.critical_path()}
+
+    def print_report(self):
+        """ステージ毎の所要時間とクリティカルパスを表示"""
+        logger.info("=" * 60)
+        logger.info("PIPELINE REPORT")
+        logger.info("=" * 60)
+        logger.info(f"{'Stage':<24} {'Kind':<10} {'Status':<10} {'Time (s)':>10}")
+        logger.info("-" * 60)
+
+        for name, stage in self.stages.items():
+            status = self.status(name)
+            if status is None:
+                continue
+            logger.info(f"{name:<24} {stage.kind:<10} {status:<10} {self.timings.get(name, 0.0):>10.2f}")
+
+        path = self.critical_path()
+        if path:
+            total = sum(self.timings.get(n, 0.0) for n in path)
+            logger.info("-" * 60)
+            logger.info(f"Critical path ({total:.2f}s): {' -> '.join(path)}")
+        logger.info("=" * 60)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+レート制限
+
+並列取得で同じサイトにリクエストを送る時に、毎秒のリクエスト数を抑えるための共通部品です。
+
+    TokenBucket    : 毎秒 rate 個補充・最大 burst 個のトークンバケット（待ち時間を返すだけ）
+    RateLimiter    : TokenBucket をスレッド間で共有し、トークンが取れるまで待機する
+    HostConcurrency: ホスト毎の同時リクエスト数の上限（別ホストへのリクエストは互いに待たない）
+
+使用例:
+    limiter = RateLimiter(2.0)  # 毎秒2リクエストまで
+
+    def fetch(day):
+        limiter.acquire()
+        return session.get(...)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(fetch, days))
+
+    hosts = HostConcurrency({'stats.oecd.org': 1}, default=2)
+    with hosts.slot(url):
+        response = session.get(url)
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+from urllib.parse import urlsplit
+
+import instrumentation
+
+
+class TokenBucket:
+    """毎秒 rate 個補充・最大 burst 個のトークンバケット"""
+
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.capacity = float(burst or max(1, math.ceil(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """トークンを1つ取る。取れなければ次に取れるまでの秒数を返す（取れたら0）"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """スレッド間で共有するブロッキングのレート制限（rateがNoneか0以下なら制限しない）"""
+
+    def __init__(self, rate: float = None, burst: int = None):
+        self.bucket = TokenBucket(rate, burst) if rate and rate > 0 else None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """トークンが取れるまで待機（待機時間は 'rate_limit' の sleep スパンとして記録）"""
+        if self.bucket is None:
+            return
+
+        while True:
+            with self._lock:
+                wait = self.bucket.take()
+            if wait <= 0:
+                return
+            instrumentation.sleep(wait, 'rate_limit')
+
+
+class HostConcurrency:
+    """ホスト毎の同時リクエスト数の上限（スレッド間で共有）"""
+
+    def __init__(self, limits: Dict[str, int] = None, default: int = 2):
+        """
+        Args:
+            limits: ホスト名 -> 同時リクエスト数
+            default: limits にないホストの同時リクエスト数
+        """
+        self.limits = dict(limits or {})
+        self.default = default
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(max(1, self.limits.get(host, self.default)))
+            return self._semaphores[host]
+
+    @contextmanager
+    def slot(self, url: str):
+        """url（またはホスト名）のホストの枠が空くまで待ち、with ブロックの間その枠を使う"""
+        host = urlsplit(url).netloc or url
+        semaphore = self._semaphore(host)
+        started = time.perf_counter()
+        with semaphore:
+            waited = time.perf_counter() - started
+            if waited > 0.001:
+                instrumentation.count('host_wait_s', waited)
+            yield
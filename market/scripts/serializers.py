@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+スナップショットのシリアライザ
+
+人が読む *_latest.json は従来どおり整形JSON（indent=2）のまま、
+タイムスタンプ付きのアーカイブは機械向けのコンパクトな形式で保存します。
+
+形式:
+    'pretty'       : 整形JSON（indent=2, ensure_ascii=False）           .json
+    'compact'      : インデントなしJSON（orjsonがあれば使用）           .json
+    'msgpack'      : MessagePack（pip install msgpack）                 .msgpack
+    'compact+zstd' : コンパクトJSONをzstd圧縮（pip install zstandard）   .json.zst
+    'msgpack+zstd' : MessagePackをzstd圧縮                              .msgpack.zst
+
+アーカイブ形式は環境変数 MARKET_ARCHIVE_FORMAT で変更できます（既定: compact）。
+読み込み側（load_snapshot）は拡張子から形式を判別するため、形式が混在していても読めます。
+"""
+
+import json
+import os
+from glob import glob
+from typing import Any, Iterator, List, Tuple
+
+# オプション依存（インストールされていなければ標準ライブラリで代替 or エラー）
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_FORMAT = os.getenv('MARKET_ARCHIVE_FORMAT', 'compact')
+ZSTD_LEVEL = 10
+
+
+def _json_default(value: Any):
+    """JSON化できない値（datetime, numpy型等）は文字列にする"""
+    return str(value)
+
+
+class Serializer:
+    """シリアライザの基底クラス"""
+
+    name = ''
+    extension = ''
+    binary = True
+
+    def dumps(self, data: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, payload: bytes) -> Any:
+        raise NotImplementedError
+
+
+class PrettyJsonSerializer(Serializer):
+    """人が読むための整形JSON"""
+
+    name = 'pretty'
+    extension = '.json'
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, indent=2, default=_json_default).encode('utf-8')
+
+    def loads(self, payload: bytes) -> Any:
+        return _loads_json(payload)
+
+
+class CompactJsonSerializer(Serializer):
+    """インデント・空白なしのJSON（orjsonがあれば使用）"""
+
+    name = 'compact'
+    extension = '.json'
+
+    def dumps(self, data: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(data, default=_json_default)
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+    def loads(self, payload: bytes) -> Any:
+        return _loads_json(payload)
+
+
+class MsgpackSerializer(Serializer):
+    """MessagePack"""
+
+    name = 'msgpack'
+    extension = '.msgpack'
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("msgpack is not installed. Install with: pip install msgpack")
+
+    def dumps(self, data: Any) -> bytes:
+        return msgpack.packb(data, use_bin_type=True, default=_json_default)
+
+    def loads(self, payload: bytes) -> Any:
+        return msgpack.unpackb(payload, raw=False)
+
+
+class ZstdSerializer(Serializer):
+    """別のシリアライザの出力をzstdで圧縮"""
+
+    def __init__(self, inner: Serializer, level: int = ZSTD_LEVEL):
+        if zstandard is None:
+            raise ImportError("zstandard is not installed. Install with: pip install zstandard")
+        self.inner = inner
+        self.level = level
+        self.name = f"{inner.name}+zstd"
+        self.extension = f"{inner.extension}.zst"
+
+    def dumps(self, data: Any) -> bytes:
+        return zstandard.ZstdCompressor(level=self.level).compress(self.inner.dumps(data))
+
+    def loads(self, payload: bytes) -> Any:
+        return self.inner.loads(zstandard.ZstdDecompressor().decompress(payload))
+
+
+def _loads_json(payload: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload.decode('utf-8'))
+
+
+_BASE_SERIALIZERS = {
+    'pretty': PrettyJsonSerializer,
+    'compact': CompactJsonSerializer,
+    'msgpack': MsgpackSerializer,
+}
+
+
+def get_serializer(name: str = None) -> Serializer:
+    """
+    名前からシリアライザを取得
+
+    Args:
+        name: 'pretty', 'compact', 'msgpack', 'compact+zstd', 'msgpack+zstd'（Noneならアーカイブ形式）
+    """
+    name = name or ARCHIVE_FORMAT
+    base, _, compression = name.partition('+')
+
+    if base not in _BASE_SERIALIZERS:
+        raise ValueError(f"Unknown serializer: {name} (expected one of {', '.join(_BASE_SERIALIZERS)} with optional +zstd)")
+
+    serializer = _BASE_SERIALIZERS[base]()
+
+    if compression == 'zstd':
+        serializer = ZstdSerializer(serializer)
+    elif compression:
+        raise ValueError(f"Unknown compression: {compression} (expected zstd)")
+
+    return serializer
+
+
+def serializer_for_path(path: str) -> Serializer:
+    """ファイル名の拡張子から読み込み用のシリアライザを判別"""
+    if path.endswith('.msgpack.zst'):
+        return get_serializer('msgpack+zstd')
+    if path.endswith('.json.zst'):
+        return get_serializer('compact+zstd')
+    if path.endswith('.msgpack'):
+        return get_serializer('msgpack')
+    if path.endswith('.json'):
+        return get_serializer('compact')
+    raise ValueError(f"Unknown snapshot format: {path}")
+
+
+def load_snapshot(path: str) -> Any:
+    """スナップショットを1つ読み込む（形式は拡張子から判別）"""
+    with open(path, 'rb') as f:
+        return serializer_for_path(path).loads(f.read())
+
+
+def snapshot_paths(directory: str, prefix: str) -> List[str]:
+    """
+    ディレクトリ内のタイムスタンプ付きスナップショットを古い順に列挙
+
+    *_latest.* は除外し、同じタイムスタンプで複数形式がある場合はすべて返します。
+    """
+    patterns = ['.json', '.msgpack', '.json.zst', '.msgpack.zst']
+    paths = []
+    for ext in patterns:
+        paths.extend(glob(os.path.join(directory, f"{prefix}*{ext}")))
+
+    return sorted(p for p in set(paths) if '_latest' not in os.path.basename(p))
+
+
+def iter_snapshots(directory: str, prefix: str) -> Iterator[Tuple[str, Any]]:
+    """(パス, データ) を古い順に1つずつ読み込んで返す"""
+    for path in snapshot_paths(directory, prefix):
+        yield path, load_snapshot(path)
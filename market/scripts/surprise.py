@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+経済指標のサプライズ・スコア計算
+
+カレンダーの actual / forecast / previous は "-145.8K", "2.8%", "51.10" のような文字列で
+保存されているため、そのままでは数値分析ができません。
+
+このモジュールは
+- 文字列の列をpandasの文字列演算でまとめて数値化（単位 K/M/B/T のスケール、%、通貨記号）
+- サプライズ = 実績 - 予想 を計算し、指標ごとに過去のサプライズの標準偏差で割って標準化
+  （z = (actual - forecast) / std(actual - forecast)）
+を、アーカイブ全体に対して1回のバッチ処理で行います。
+
+イベントは calendar_query.CalendarIndex（索引）から読み込みます。
+
+使用例:
+  # 米国の全指標のサプライズ（直近30件）
+  python3 surprise.py --country us --limit 30
+
+  # CPI系の指標、3回以上の履歴があるものだけ
+  python3 surprise.py --event CPI --min-count 3
+"""
+
+import argparse
+import sys
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+from calendar_query import MAX_CHAR, CalendarIndex
+from markdown_report import Column, MarkdownReport, TableSchema
+
+# 値の文字列: 任意の通貨記号等 + 数値（カンマ区切り可） + 任意の単位
+VALUE_PATTERN = r'^\s*(?P<prefix>[^\d+\-.]*?)\s*(?P<number>[+\-]?(?:\d[\d,]*)?\.?\d+)\s*(?P<unit>[KMBT%]?)\s*$'
+
+UNIT_SCALES = {
+    '': 1.0,
+    '%': 1.0,
+    'K': 1e3,
+    'M': 1e6,
+    'B': 1e9,
+    'T': 1e12,
+}
+
+# 指標名の末尾の対象月・四半期（例: "CPI (MoM)  (Apr)", "GDP (QoQ)  (Q4)"）は同じ指標としてまとめる
+PERIOD_SUFFIX_PATTERN = r'\s+\((?:[A-Za-z]{3}|Q[1-4])\)$'
+
+VALUE_FIELDS = ('actual', 'forecast', 'previous')
+
+RESULT_SCHEMA = TableSchema(
+    Column('日時', 'datetime'),
+    Column('国', 'country'),
+    Column('指標', 'event'),
+    Column('予想', 'forecast'),
+    Column('実績', 'actual'),
+    Column('サプライズ', 'surprise', fmt='{:+.4g}'),
+    Column('Zスコア', 'surprise_z', fmt='{:+.2f}'),
+    Column('件数', 'history_count', fmt='{:.0f}'),
+)
+
+
+def parse_values(values: pd.Series) -> pd.DataFrame:
+    """
+    値の文字列の列をまとめて数値化
+
+    Args:
+        values: "-145.8K", "2.8%", "51.10", None 等の列
+
+    Returns:
+        DataFrame: value（スケール適用後の数値）, unit（'', '%', 'K', ...）, is_percent
+    """
+    text = values.astype('string')
+    parts = text.str.extract(VALUE_PATTERN)
+
+    number = pd.to_numeric(parts['number'].str.replace(',', '', regex=False), errors='coerce')
+    unit = parts['unit'].fillna('')
+    scale = unit.map(UNIT_SCALES).astype(float)
+
+    return pd.DataFrame({
+        'value': (number * scale).astype(float),
+        'unit': unit.where(number.notna(), None),
+        'is_percent': unit.eq('%') & number.notna(),
+    }, index=values.index)
+
+
+def events_frame(records: Iterable[Dict]) -> pd.DataFrame:
+    """イベントのリストをDataFrameにし、数値列を追加"""
+    df = pd.DataFrame.from_records(list(records))
+    if df.empty:
+        return df
+
+    for field in VALUE_FIELDS:
+        if field not in df.columns:
+            df[field] = None
+        parsed = parse_values(df[field])
+        df[f"{field}_value"] = parsed['value']
+        df[f"{field}_unit"] = parsed['unit']
+
+    df['event_key'] = df['event'].str.replace(PERIOD_SUFFIX_PATTERN, '', regex=True).str.strip()
+    return df
+
+
+def compute_surprises(df: pd.DataFrame, min_count: int = 2) -> pd.DataFrame:
+    """
+    サプライズと標準化スコアを計算
+
+    値は K/M/B/T のスケール適用後で比較します（例: 1.2M と 950K）。
+    一方だけが % の行は比較できないため NaN になります。
+
+    Args:
+        df: events_frame() の結果
+        min_count: 標準化に必要な同一指標のサプライズ件数
+
+    Returns:
+        DataFrame: surprise, surprise_z, history_count 列を追加したもの（日時順）
+    """
+    if df.empty:
+        return df.assign(surprise=[], surprise_z=[], history_count=[])
+
+    actual_unit = df['actual_unit']
+    forecast_unit = df['forecast_unit']
+    comparable = (
+        actual_unit.notna() & forecast_unit.notna()
+        & actual_unit.eq('%').eq(forecast_unit.eq('%'))
+    )
+    df = df.assign(surprise=np.where(comparable, df['actual_value'] - df['forecast_value'], np.nan))
+
+    groups = df.groupby(['country', 'event_key'], sort=False)['surprise']
+    count = groups.transform('count')
+    std = groups.transform('std').replace(0.0, np.nan)
+
+    df = df.assign(
+        history_count=count,
+        surprise_z=(df['surprise'] / std).where(count >= min_count),
+    )
+    return df.sort_values('datetime', kind='stable').reset_index(drop=True)
+
+
+def surprise_scores(
+    index: CalendarIndex,
+    country: str = None,
+    event_prefix: str = None,
+    start: str = None,
+    end: str = None,
+    min_count: int = 2
+) -> pd.DataFrame:
+    """
+    索引からイベントを読み込み、サプライズ・スコアを計算
+
+    標準化は絞り込み前の全履歴で行い、その後で国・指標名・期間で絞り込みます。
+    """
+    scored = compute_surprises(events_frame(index.query(country=country)), min_count=min_count)
+    if scored.empty:
+        return scored
+
+    mask = scored['surprise'].notna()
+    if event_prefix:
+        mask &= scored['event'].str.casefold().str.startswith(event_prefix.casefold())
+    if start:
+        mask &= scored['datetime'] >= start
+    if end:
+        mask &= scored['datetime'] <= f"{end}{MAX_CHAR}"
+
+    return scored[mask].reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='経済指標のサプライズ・スコア')
+    parser.add_argument('--country', type=str, help='国コード（jp, us, uk）または国名')
+    parser.add_argument('--event', type=str, help='指標名の前方一致')
+    parser.add_argument('--start', type=str, help='開始日 (YYYY-MM-DD)')
+    parser.add_argument('--end', type=str, help='終了日 (YYYY-MM-DD)')
+    parser.add_argument('--min-count', type=int, default=2, help='標準化に必要な履歴件数')
+    parser.add_argument('--limit', type=int, help='直近N件のみ表示')
+    parser.add_argument('--csv', type=str, help='結果をCSVで保存するパス')
+
+    args = parser.parse_args()
+
+    index = CalendarIndex()
+    index.refresh()
+
+    scored = surprise_scores(index, args.country, args.event, args.start, args.end, args.min_count)
+
+    if args.csv:
+        scored.to_csv(args.csv, index=False)
+        print(f"Saved to {args.csv}")
+
+    rows = scored.tail(args.limit) if args.limit else scored
+    rows = rows.astype(object).where(rows.notna(), None)
+    MarkdownReport(sys.stdout).table(RESULT_SCHEMA, rows.to_dict('records'))
+    print(f"{len(rows)} events with surprises")
+
+
+if __name__ == "__main__":
+    main()
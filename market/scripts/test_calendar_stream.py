@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+calendar_stream.iter_json_array のテストスクリプト
+
+チャンクの境目で値（特に数値）が切れても、一括で json.loads した結果と同じ要素が
+返ることを確認します。
+
+    python market/scripts/test_calendar_stream.py
+"""
+
+import json
+
+from calendar_stream import iter_json_array
+
+
+def split_chunks(text: str, size: int):
+    """text を UTF-8 にして size バイトずつに分割"""
+    data = text.encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def assert_same(text: str):
+    expected = json.loads(text)
+    for size in range(1, len(text.encode('utf-8')) + 1):
+        actual = list(iter_json_array(split_chunks(text, size)))
+        assert actual == expected, f"chunk size {size}: {actual!r} != {expected!r}"
+
+
+def test_number_split_at_chunk_boundary():
+    assert_same('[45.5]')
+    assert_same('[45.5, -1.25e3 ,7]')
+    assert_same('[ 1 , 22 , 333 ]')
+
+
+def test_mixed_values_split_at_chunk_boundary():
+    assert_same('[{"Country": "Japan", "Forecast": "0.2%"}, "café", true, null, 3.0]')
+    assert_same('[[1, 2], {"a": [3.5]}, 10]')
+
+
+def test_truncated_array():
+    for text in ('[45.5', '[{"a": 1}'):
+        try:
+            list(iter_json_array(split_chunks(text, 2)))
+        except ValueError:
+            continue
+        raise AssertionError(f"{text!r} should raise ValueError")
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"OK: {name}")
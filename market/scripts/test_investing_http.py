@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+investing_http.economic_calendar のバックエンド切り替えのテストスクリプト
+
+investpy を使う経路（MARKET_INVESTING_BACKEND=investpy と、HTTPが失敗した時のフォールバック）でも、
+HTTPクライアントと同じ辞書のリストが返ることを確認します。investpy はテスト内の偽物に差し替えます。
+
+    python market/scripts/test_investing_http.py
+"""
+
+import pandas as pd
+
+import investing_http
+
+ROWS = [
+    {'id': '1', 'date': '01/02/2026', 'time': '08:30', 'zone': 'japan', 'currency': 'JPY',
+     'importance': 'high', 'event': 'National CPI (YoY)', 'actual': '2.1%', 'forecast': '2.0%', 'previous': '1.9%'},
+]
+
+
+class FakeInvestpy:
+    @staticmethod
+    def economic_calendar(countries, from_date, to_date, time_filter, time_zone):
+        return pd.DataFrame(ROWS)
+
+
+class FailingClient:
+    def economic_calendar(self, *args):
+        raise ConnectionError("blocked")
+
+
+def call_with(backend: str, client=None):
+    saved = investing_http.BACKEND, investing_http.investpy, investing_http.get_client
+    investing_http.BACKEND = backend
+    investing_http.investpy = FakeInvestpy
+    if client is not None:
+        investing_http.get_client = lambda: client
+    try:
+        return investing_http.economic_calendar(['japan'], '01/02/2026', '01/02/2026')
+    finally:
+        investing_http.BACKEND, investing_http.investpy, investing_http.get_client = saved
+
+
+def test_investpy_backend_returns_records():
+    rows = call_with('investpy')
+    assert rows == ROWS, rows
+    assert rows[0].get('event') == 'National CPI (YoY)'
+
+
+def test_http_failure_falls_back_to_records():
+    rows = call_with('http', FailingClient())
+    assert rows == ROWS, rows
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith('test_'):
+            func()
+            print(f"OK: {name}")